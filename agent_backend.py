@@ -46,7 +46,7 @@ from langchain_mcp_adapters.tools import load_mcp_tools
 #     sys.exit(1) # Thoát nếu thành phần cốt lõi bị thiếu
 
 try:
-    from rag_service import initialize_rag_retriever, safe_get_url, rewrite_query, CHROMA_PATH
+    from rag_service import initialize_rag_retriever, safe_get_url, rewrite_query, match_sign_term, rewrite_cache_stats, retrieval_cache_stats, CHROMA_PATH
     from config import MODEL_NAME, OPTIMIZED_QUERY_PROMPT # Vẫn cần CONFIG_PATH và PROMPT
 except ImportError as e:
     logger.critical("LỖI: Không thể import 'initialize_rag_retriever' và 'rewrite_query' từ rag_service.py.")
@@ -102,23 +102,29 @@ def search_sign_language_knowledge(query: str) -> str:
     Dùng công cụ này để tìm kiếm TẤT CẢ thông tin về Ngôn ngữ Ký hiệu Việt Nam (VSL).
     Luôn gọi tool này khi người dùng hỏi về kiến thức VSL, cách ký hiệu, hoặc lộ trình học.
     """
-    if RAG_RETRIEVER is None or LLM_QUERY_REWRITER is None:
-        return json.dumps({"text_content": "Lỗi: DB chưa sẵn sàng.", "media": None})
-
-    # 1. Rewrite Query
-    try:
-        # prompt = OPTIMIZED_QUERY_PROMPT.format(query=query)
-        # resp = LLM_QUERY_REWRITER.invoke([HumanMessage(content=prompt)])
-        # optimized_query = resp.content.strip() or query
-        optimized_query = rewrite_query(query, LLM_QUERY_REWRITER, OPTIMIZED_QUERY_PROMPT)
-    except Exception as e:
-        logger.error(f"Rewriter error: {e}")
-        optimized_query = query
-
-    logger.info(f"[RAG] Query gốc: {query} -> Tối ưu: {optimized_query}")
-
-    # 2. Retrieve
-    retrieved_docs = RAG_RETRIEVER.invoke(optimized_query)
+    # 0. Fast path: truy vấn gọi tên một ký hiệu đã biết -> trả thẳng, không rewrite / retrieve / rerank
+    term_doc = match_sign_term(query)
+    if term_doc is not None:
+        logger.info(f"[RAG] Query gốc: {query} -> Ký hiệu: {term_doc.metadata['chunk_id']}")
+        retrieved_docs = [term_doc]
+    else:
+        if RAG_RETRIEVER is None or LLM_QUERY_REWRITER is None:
+            return json.dumps({"text_content": "Lỗi: DB chưa sẵn sàng.", "media": None})
+
+        # 1. Rewrite Query
+        try:
+            # prompt = OPTIMIZED_QUERY_PROMPT.format(query=query)
+            # resp = LLM_QUERY_REWRITER.invoke([HumanMessage(content=prompt)])
+            # optimized_query = resp.content.strip() or query
+            optimized_query = rewrite_query(query, LLM_QUERY_REWRITER, OPTIMIZED_QUERY_PROMPT)
+        except Exception as e:
+            logger.error(f"Rewriter error: {e}")
+            optimized_query = query
+
+        logger.info(f"[RAG] Query gốc: {query} -> Tối ưu: {optimized_query}")
+
+        # 2. Retrieve
+        retrieved_docs = RAG_RETRIEVER.invoke(optimized_query)
     
     if not retrieved_docs:
         return json.dumps({
@@ -617,5 +623,10 @@ async def chat_endpoint(request: ChatRequest):
         logger.error("LỖI nghiêm trọng trong chat_endpoint: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Lỗi hệ thống: {str(e)}")
 
+@app.get("/cache_stats")
+async def cache_stats_endpoint():
+    """Số hit/miss của các cache RAG (để theo dõi)."""
+    return {"rewrite": rewrite_cache_stats(), "retrieval": retrieval_cache_stats()}
+
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
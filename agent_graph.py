@@ -22,7 +22,7 @@ from langchain_openai import ChatOpenAI
 from langfuse import Langfuse
 
 # Import nội bộ
-from rag_service import safe_get_url, rewrite_query
+from rag_service import safe_get_url, rewrite_query, match_sign_term
 from config import (MODEL_NAME, OPTIMIZED_QUERY_PROMPT, 
                     CORE_INSTRUCTIONS, CLASSIFIER_SYS_PROMPT, MODEL_NAME_2, 
                     OPENROUTER_MODEL_NAME, OPENROUTER_BASE_URL)
@@ -77,19 +77,25 @@ def search_sign_language_knowledge(query: str) -> str:
     Tìm kiếm thông tin về Ngôn ngữ Ký hiệu Việt Nam (VSL).
     Trả về danh sách 5 kết quả tốt nhất dưới dạng JSON để AI lựa chọn.
     """
-    if RAG_RETRIEVER is None or LLM_QUERY_REWRITER is None:
-        return json.dumps({"error": "DB chưa sẵn sàng."})
+    # Fast path: truy vấn gọi tên một ký hiệu đã biết -> trả thẳng, không rewrite / retrieve / rerank
+    term_doc = match_sign_term(query)
+    if term_doc is not None:
+        logger.info(f"[RAG] Query: {query} -> Ký hiệu: {term_doc.metadata['chunk_id']}")
+        retrieved_docs = [term_doc]
+    else:
+        if RAG_RETRIEVER is None or LLM_QUERY_REWRITER is None:
+            return json.dumps({"error": "DB chưa sẵn sàng."})
 
-    try:
-        optimized_query = rewrite_query(query, LLM_QUERY_REWRITER, OPTIMIZED_QUERY_PROMPT)
-    except Exception as e:
-        logger.error(f"Rewriter error: {e}")
-        optimized_query = query
+        try:
+            optimized_query = rewrite_query(query, LLM_QUERY_REWRITER, OPTIMIZED_QUERY_PROMPT)
+        except Exception as e:
+            logger.error(f"Rewriter error: {e}")
+            optimized_query = query
 
-    logger.info(f"[RAG] Query: {query} -> Opt: {optimized_query}")
+        logger.info(f"[RAG] Query: {query} -> Opt: {optimized_query}")
 
-    # Lấy 5 docs (do config.py đã chỉnh top_n=5)
-    retrieved_docs = RAG_RETRIEVER.invoke(optimized_query)
+        # Lấy 5 docs (do config.py đã chỉnh top_n=5)
+        retrieved_docs = RAG_RETRIEVER.invoke(optimized_query)
     
     if not retrieved_docs:
         return json.dumps([])
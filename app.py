@@ -28,7 +28,7 @@ import agent_graph
 from agent_graph import build_agent_graph, background_safety_check
 
 # Import Rag Service để init global
-from rag_service import initialize_rag_retriever
+from rag_service import initialize_rag_retriever, rewrite_cache_stats, retrieval_cache_stats
 from config import OPTIMIZED_QUERY_PROMPT
 
 # --- LOGGING ---
@@ -416,5 +416,10 @@ async def delete_thread_endpoint(thread_id: str):
         logger.error(f"Lỗi khi xóa thread: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/cache_stats")
+async def cache_stats_endpoint():
+    """Số hit/miss của các cache RAG (để theo dõi)."""
+    return {"rewrite": rewrite_cache_stats(), "retrieval": retrieval_cache_stats()}
+
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
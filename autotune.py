@@ -0,0 +1,165 @@
+# autotune.py
+"""
+Đo SSTCN_Attention trên máy hiện tại theo số thread, interop thread, batch size và backend,
+rồi ghi profile (PERF_PROFILE_DIR/<hostname>.json) mà trang Recognition, batch_recognize.py
+và recognition_service.py áp dụng lúc khởi động.
+
+Số interop thread chỉ đặt được một lần mỗi process nên mỗi giá trị chạy trong một process con.
+
+    python autotune.py
+    python autotune.py --threads 1 2 4 --batch-sizes 1 16 64 --backends eager onnx
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from configs.recognition_config import SEQ_LEN, NUM_JOINTS, PREDICT_STRIDE, INCREMENTAL_INFERENCE
+
+WORKER_PREFIX = "AUTOTUNE_RESULT "
+
+
+def default_threads():
+    n = os.cpu_count() or 1
+    values = {1, n, max(1, n // 2)}
+    k = 2
+    while k < n:
+        values.add(k)
+        k *= 2
+    return sorted(values)
+
+
+def time_incremental(module, iters, max_seconds, stride=PREDICT_STRIDE):
+    """ms cho mỗi lần dự đoán của trang Recognition khi suy luận tăng dần: `stride` frame push + logits."""
+    import torch
+    from sstcn_attention_model import SSTCNStream
+
+    stream = SSTCNStream(module, seq_len=SEQ_LEN)
+    frames = torch.rand(SEQ_LEN + stride * (iters + 1), 3, NUM_JOINTS)
+    for i in range(SEQ_LEN):
+        stream.push(frames[i])
+    i, n = SEQ_LEN, 0
+    t0 = time.perf_counter()
+    while n < iters and (n == 0 or time.perf_counter() - t0 < max_seconds):
+        for _ in range(stride):
+            stream.push(frames[i])
+            i += 1
+        stream.logits()
+        n += 1
+    return 1e3 * (time.perf_counter() - t0) / n
+
+
+def run_worker(args):
+    """Chạy trong process con: interop thread đã cố định, quét threads x backend x batch size."""
+    import torch
+
+    torch.set_num_interop_threads(args.interop)
+    from utils.inference_backends import create_backend, QuantizedBackend
+    from utils.model_loader import load_model, create_random_model
+    from utils.quantization import is_quantized_artifact
+
+    quantized = args.model and os.path.exists(args.model) and is_quantized_artifact(args.model)
+    if quantized:
+        model, backends = None, ["int8"]
+    else:
+        model = load_model(args.model) if args.model and os.path.exists(args.model) else create_random_model()
+        backends = args.backends
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for threads in args.threads:
+            torch.set_num_threads(threads)
+            for name in backends:
+                try:
+                    backend = QuantizedBackend(args.model) if quantized else \
+                        create_backend(model, name, onnx_path=os.path.join(tmp, "model.onnx"))
+                except ImportError as e:
+                    print(f"[autotune] Bỏ qua backend {name}: {e}", file=sys.stderr)
+                    continue
+                for bs in args.batch_sizes:
+                    x = torch.rand(bs, 3, SEQ_LEN, NUM_JOINTS)
+                    for _ in range(args.warmup):
+                        backend(x)
+                    t0 = time.perf_counter()
+                    n = 0
+                    # Tối đa --iters lần, dừng sớm khi đã đo đủ --max-seconds
+                    while n < args.iters and (n == 0 or time.perf_counter() - t0 < args.max_seconds):
+                        backend(x)
+                        n += 1
+                    t = (time.perf_counter() - t0) / n
+                    results.append({"interop_threads": args.interop, "num_threads": threads, "backend": name,
+                                    "batch_size": bs, "ms": 1e3 * t, "windows_per_s": bs / t})
+                    print(f"[autotune] interop={args.interop} threads={threads} {name} batch={bs}: "
+                          f"{1e3 * t:.2f} ms, {bs / t:.1f} win/s", file=sys.stderr)
+                if backend.module is not None and INCREMENTAL_INFERENCE:
+                    ms = time_incremental(backend.module, args.iters, args.max_seconds)
+                    results.append({"interop_threads": args.interop, "num_threads": threads, "backend": name,
+                                    "batch_size": 1, "incremental": True, "ms": ms, "windows_per_s": 1e3 / ms})
+                    print(f"[autotune] interop={args.interop} threads={threads} {name} incremental: "
+                          f"{ms:.2f} ms / dự đoán", file=sys.stderr)
+    print(WORKER_PREFIX + json.dumps(results))
+
+
+def main():
+    from utils.inference_backends import BACKENDS
+    from utils.model_loader import default_model_path
+    from utils.perf_profile import save_profile, profile_path
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=default_model_path())
+    parser.add_argument("--threads", type=int, nargs="+", default=default_threads())
+    parser.add_argument("--interop", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["eager", "torchscript", "onnx"])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--max-seconds", type=float, default=3.0, help="Thời gian đo tối đa mỗi cấu hình")
+    parser.add_argument("--output", default=None, help=f"Mặc định {profile_path()}")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        args.interop = args.interop[0]
+        run_worker(args)
+        return
+
+    results = []
+    for interop in args.interop:
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", "--interop", str(interop),
+               "--model", args.model or "", "--iters", str(args.iters), "--warmup", str(args.warmup),
+               "--max-seconds", str(args.max_seconds),
+               "--threads", *map(str, args.threads), "--backends", *args.backends,
+               "--batch-sizes", *map(str, args.batch_sizes)]
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if proc.returncode != 0:
+            print(f"[autotune] Process con interop={interop} lỗi (exit {proc.returncode})", file=sys.stderr)
+            continue
+        for line in proc.stdout.splitlines():
+            if line.startswith(WORKER_PREFIX):
+                results.extend(json.loads(line[len(WORKER_PREFIX):]))
+    if not results:
+        raise SystemExit("[autotune] Không đo được cấu hình nào")
+
+    keys = ("backend", "num_threads", "interop_threads", "batch_size")
+    # Realtime: độ trễ mỗi lần dự đoán một cửa sổ (kể cả suy luận tăng dần của backend eager)
+    single = [r for r in results if r["batch_size"] == 1] or results
+    realtime = min(single, key=lambda r: r["ms"])
+    batch = max((r for r in results if not r.get("incremental")), key=lambda r: r["windows_per_s"])
+    profile = {
+        "created": time.time(),
+        "model": args.model,
+        "realtime": {**{k: realtime[k] for k in keys}, "ms": realtime["ms"]},
+        "batch": {**{k: batch[k] for k in keys}, "windows_per_s": batch["windows_per_s"]},
+        "results": results,
+    }
+    path = save_profile(profile, args.output)
+    print(f"[autotune] realtime: {profile['realtime']}")
+    print(f"[autotune] batch: {profile['batch']}")
+    print(f"[autotune] Đã ghi {path}")
+
+
+if __name__ == "__main__":
+    main()
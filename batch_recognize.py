@@ -0,0 +1,181 @@
+# batch_recognize.py
+"""
+Nhận diện ký hiệu offline cho cả thư mục video (ví dụ chấm bài luyện tập qua đêm).
+
+- Giải mã video bằng OpenCV và trích xuất keypoints Holistic trong process pool
+  (mỗi worker một instance MediaPipe).
+- Gom các cửa sổ trượt thành batch và chạy qua SSTCN_Attention ở process chính.
+- Keypoints được cache theo hash nội dung video (utils/keypoint_cache.py).
+- Ghi dự đoán + xác suất của từng cửa sổ ra file JSONL
+  (start_frame/end_frame tính theo các frame còn lại sau frame_skip).
+
+    python batch_recognize.py videos/ -o predictions.jsonl --workers 8
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+from configs.recognition_config import (NUM_CLASSES, DEVICE, SEQ_LEN,
+                                        THRESHOLD, FRAME_SKIP, PREDICT_STRIDE, UNKNOWN_CLASS,
+                                        KEYPOINT_CACHE_DIR, INFERENCE_BACKEND)
+from utils.keypoint_cache import KeypointCache
+from utils.inference_backends import load_backend, BACKENDS
+from utils.model_loader import default_model_path
+from utils.perf_profile import apply_profile, profile_backend
+from utils.sign_dict import SIGN_DICT
+from utils.keypoint_windows import sliding_windows
+from utils.video_keypoints import create_holistic, extract_video_keypoints
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+# --- Worker (process con) ---
+_HOLISTIC = None
+_CACHE = None
+
+
+def _init_worker(cache_dir=None):
+    """Mỗi worker giữ một Holistic riêng (reset trước mỗi video); tắt đa luồng OpenCV để không tranh CPU."""
+    global _HOLISTIC, _CACHE
+    cv2.setNumThreads(1)
+    _HOLISTIC = create_holistic()
+    _CACHE = KeypointCache(cache_dir) if cache_dir else None
+
+
+def _extract_worker(path, frame_skip):
+    keypoints = extract_video_keypoints(path, _HOLISTIC, frame_skip=frame_skip, cache=_CACHE)
+    return path, np.asarray(keypoints)
+
+
+# --- Process chính ---
+def find_videos(inputs, exts=VIDEO_EXTS):
+    videos = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            videos.extend(sorted(f for f in p.rglob("*") if f.suffix.lower() in exts))
+        elif p.is_file():
+            videos.append(p)
+        else:
+            logger.warning(f"Bỏ qua (không tồn tại): {item}")
+    return [str(v) for v in videos]
+
+
+class WindowBatcher:
+    """Gom cửa sổ của nhiều video thành batch cố định để chạy model một lần."""
+
+    def __init__(self, model, out_file, batch_size, threshold=THRESHOLD, device=DEVICE):
+        self.model = model
+        self.out_file = out_file
+        self.batch_size = batch_size
+        self.threshold = threshold
+        self.device = device
+        self.pending = []   # [(video, window_idx, start, end, window)]
+        self.num_windows = 0
+
+    def add_video(self, video, keypoints, seq_len, stride):
+        windows, starts = sliding_windows(keypoints, seq_len, stride)
+        for i, (window, start) in enumerate(zip(windows, starts)):
+            end = start + window.shape[1]
+            self.pending.append((video, i, start, end, window))
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        # Cửa sổ ngắn (video < SEQ_LEN) có T khác nên chạy riêng theo từng độ dài
+        by_len = {}
+        for item in self.pending:
+            by_len.setdefault(item[4].shape[1], []).append(item)
+
+        for items in by_len.values():
+            batch = torch.from_numpy(np.ascontiguousarray(np.stack([it[4] for it in items])))
+            with torch.no_grad():
+                probs = torch.softmax(self.model(batch.to(self.device)), dim=1).cpu().numpy()
+
+            for (video, idx, start, end, _), p in zip(items, probs):
+                top = int(p.argmax())
+                pred = top if p[top] >= self.threshold else UNKNOWN_CLASS
+                record = {
+                    "video": video,
+                    "window": idx,
+                    "start_frame": start,
+                    "end_frame": end,
+                    "pred": pred,
+                    "label": SIGN_DICT[pred],
+                    "top_class": top,
+                    "prob": float(p[top]),
+                    "probs": [round(float(v), 6) for v in p],
+                }
+                self.out_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.num_windows += len(self.pending)
+        self.pending = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="File video hoặc thư mục chứa video")
+    parser.add_argument("-o", "--output", default="predictions.jsonl")
+    parser.add_argument("--model", default=default_model_path())
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Số process trích xuất keypoints (mặc định: số core)")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Mặc định theo profile của máy (autotune.py), không có thì 64")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help="Mặc định theo profile của máy, không có thì INFERENCE_BACKEND")
+    parser.add_argument("--stride", type=int, default=PREDICT_STRIDE)
+    parser.add_argument("--frame-skip", type=int, default=FRAME_SKIP)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--cache-dir", default=KEYPOINT_CACHE_DIR,
+                        help="Thư mục cache keypoints (bỏ qua Holistic với video đã xử lý)")
+    parser.add_argument("--no-cache", action="store_true", help="Luôn chạy lại Holistic")
+    args = parser.parse_args()
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        parser.error("Không tìm thấy video nào.")
+    logger.info(f"Tìm thấy {len(videos)} video, dùng {args.workers} worker.")
+
+    settings = apply_profile("batch")
+    backend = args.backend or profile_backend(settings, INFERENCE_BACKEND)
+    batch_size = args.batch_size or settings.get("batch_size", 64)
+    model = load_backend(args.model, backend, num_classes=NUM_CLASSES, device=DEVICE)
+    t0 = time.perf_counter()
+    failed = 0
+
+    with open(args.output, "w", encoding="utf-8") as out_file, \
+            ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                initargs=(None if args.no_cache else args.cache_dir,)) as pool:
+        batcher = WindowBatcher(model, out_file, batch_size, threshold=args.threshold)
+        futures = [pool.submit(_extract_worker, v, args.frame_skip) for v in videos]
+
+        # Model chạy ở process chính trong lúc các worker vẫn tiếp tục trích xuất
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                video, keypoints = future.result()
+            except Exception as e:
+                failed += 1
+                logger.error(f"Lỗi trích xuất: {e}")
+                continue
+            batcher.add_video(video, keypoints, SEQ_LEN, args.stride)
+            logger.info(f"[{done}/{len(videos)}] {video}: {len(keypoints)} frames")
+        batcher.flush()
+
+    elapsed = time.perf_counter() - t0
+    logger.info(f"Xong {len(videos) - failed}/{len(videos)} video, {batcher.num_windows} cửa sổ "
+                f"trong {elapsed:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
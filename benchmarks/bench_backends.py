@@ -0,0 +1,69 @@
+# benchmarks/bench_backends.py
+"""
+So sánh các backend suy luận (eager, TorchScript, ONNX Runtime) trên cùng trọng số và cùng input:
+latency mỗi batch, throughput (cửa sổ/giây) và max|logits lệch| so với eager.
+
+    python -m benchmarks.bench_backends --batch-sizes 1 8 32
+    python -m benchmarks.bench_backends --backends eager onnx --random-weights
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import torch
+
+from configs.recognition_config import NUM_CLASSES, SEQ_LEN, NUM_JOINTS
+from utils.inference_backends import BACKENDS, create_backend
+from utils.model_loader import load_model, create_random_model, default_model_path
+
+
+def time_backend(backend, x, warmup, iters):
+    for _ in range(warmup):
+        backend(x)
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        backend(x)
+    return (time.perf_counter() - t0) / iters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=default_model_path())
+    parser.add_argument("--random-weights", action="store_true")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    if args.random_weights or not os.path.exists(args.model):
+        print(f"[bench] Không dùng {args.model} -> trọng số ngẫu nhiên")
+        model = create_random_model(NUM_CLASSES)
+    else:
+        model = load_model(args.model)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {}
+        for name in args.backends:
+            t0 = time.perf_counter()
+            backends[name] = create_backend(model, name, onnx_path=os.path.join(tmp, "model.onnx"))
+            print(f"[bench] {name}: khởi tạo {1e3 * (time.perf_counter() - t0):.0f} ms")
+        reference = create_backend(model, "eager")
+
+        print(f"{'backend':>12} {'batch':>5} {'ms/batch':>9} {'win/s':>8} {'max|diff|':>10}")
+        for bs in args.batch_sizes:
+            x = torch.rand(bs, 3, SEQ_LEN, NUM_JOINTS)
+            expected = reference(x)
+            for name, backend in backends.items():
+                diff = (backend(x) - expected).abs().max().item()
+                t = time_backend(backend, x, args.warmup, args.iters)
+                print(f"{name:>12} {bs:>5} {t * 1e3:>9.2f} {bs / t:>8.1f} {diff:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
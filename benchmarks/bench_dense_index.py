@@ -0,0 +1,81 @@
+# benchmarks/bench_dense_index.py
+"""
+So sánh chỉ mục dense NumPy (utils/dense_index.py) với Chroma trên vectorstore hiện tại:
+thời gian khởi động (mở store + truy vấn đầu tiên), latency mỗi truy vấn (đã có embedding,
+chỉ tính phần tìm kiếm) và độ trùng top-k. Truy vấn: dòng đầu của mỗi tài liệu
+(tên ký hiệu / bài học) + --queries (mỗi dòng một truy vấn).
+
+    python -m benchmarks.bench_dense_index
+    python -m benchmarks.bench_dense_index --k 5 --repeat 20 --queries queries.txt
+"""
+import argparse
+import time
+
+import numpy as np
+
+from config import DENSE_INDEX_PATH, DENSE_INDEX_METRIC
+from rag_service import get_embeddings, load_vectorstore_chroma, build_dense_index
+from utils.dense_index import DenseIndex, read_meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index", default=DENSE_INDEX_PATH)
+    parser.add_argument("--metric", default=DENSE_INDEX_METRIC)
+    parser.add_argument("--queries", default=None)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    # Model embedding dùng chung, không tính vào thời gian khởi động của hai bên
+    embeddings = get_embeddings()
+
+    t0 = time.perf_counter()
+    chroma = load_vectorstore_chroma(embeddings)
+    t_chroma_open = time.perf_counter() - t0
+    if read_meta(args.index) is None:
+        build_dense_index(chroma, args.index, metric=args.metric)
+        print(f"[dense] Đã dựng {args.index} từ Chroma")
+
+    data = chroma.get(include=["documents"])
+    queries = [text.strip().split("\n", 1)[0].split(":", 1)[-1].strip() for text in data["documents"]]
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries += [line.strip() for line in f if line.strip()]
+    queries = [q for q in dict.fromkeys(queries) if q]
+    vectors = np.asarray(embeddings.embed_documents(queries), dtype=np.float32)
+
+    t0 = time.perf_counter()
+    chroma.similarity_search_by_vector(vectors[0].tolist(), k=args.k)
+    t_chroma_start = t_chroma_open + time.perf_counter() - t0
+    t0 = time.perf_counter()
+    index = DenseIndex(args.index, metric=args.metric)
+    index.top_k(vectors[0], args.k)
+    t_index_start = time.perf_counter() - t0
+    print(f"[dense] Khởi động (mở + truy vấn đầu): Chroma {1e3 * t_chroma_start:.1f} ms, "
+          f"NumPy {1e3 * t_index_start:.1f} ms ({len(index)} tài liệu, metric {index.metric})")
+
+    def run_chroma():
+        return [[d.id for d in chroma.similarity_search_by_vector(v.tolist(), k=args.k)] for v in vectors]
+
+    def run_index():
+        return [[index.documents[i]["id"] for i in index.top_k(v, args.k)[0][0]] for v in vectors]
+
+    timings = {}
+    for name, fn in (("Chroma", run_chroma), ("NumPy", run_index)):
+        fn()
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            results = fn()
+        timings[name] = (time.perf_counter() - t0) / (args.repeat * len(queries))
+        timings[name + "_results"] = results
+    overlap = np.mean([len(set(a) & set(b)) / len(a)
+                       for a, b in zip(timings["Chroma_results"], timings["NumPy_results"])])
+    same_order = np.mean([a == b for a, b in zip(timings["Chroma_results"], timings["NumPy_results"])])
+    print(f"[dense] {len(queries)} truy vấn, top-{args.k}: Chroma {1e3 * timings['Chroma']:.3f} ms, "
+          f"NumPy {1e3 * timings['NumPy']:.3f} ms ({timings['Chroma'] / timings['NumPy']:.1f}x)")
+    print(f"[dense] Trùng top-{args.k} với Chroma: {overlap:.1%} tài liệu, {same_order:.1%} truy vấn cùng thứ tự")
+
+
+if __name__ == "__main__":
+    main()
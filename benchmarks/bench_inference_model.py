@@ -0,0 +1,63 @@
+# benchmarks/bench_inference_model.py
+"""
+So sánh SSTCN_Attention và SSTCN_AttentionInference trên cùng trọng số:
+latency mỗi forward, throughput và sai khác logits lớn nhất theo batch size.
+
+    python -m benchmarks.bench_inference_model --batch-sizes 1 2 4 8 16 32 64
+"""
+import argparse
+import os
+import time
+
+import torch
+
+from configs.recognition_config import MODEL_PATH, NUM_CLASSES, SEQ_LEN, NUM_JOINTS
+from sstcn_attention_model import SSTCN_Attention, SSTCN_AttentionInference
+
+
+def time_forward(model, x, warmup, iters):
+    with torch.inference_mode():
+        for _ in range(warmup):
+            model(x)
+        t0 = time.perf_counter()
+        for _ in range(iters):
+            model(x)
+    return (time.perf_counter() - t0) / iters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    torch.manual_seed(0)
+    base = SSTCN_Attention(num_classes=NUM_CLASSES)
+    if os.path.exists(args.model):
+        base.load_state_dict(torch.load(args.model, map_location="cpu")["model_state_dict"])
+    else:
+        print(f"[bench] Không có {args.model} -> trọng số ngẫu nhiên")
+    base.eval()
+    fast = SSTCN_AttentionInference(num_classes=NUM_CLASSES)
+    fast.load_state_dict(base.state_dict())
+    fast.eval()
+
+    print(f"{'batch':>5} {'base ms':>9} {'fast ms':>9} {'speedup':>8} {'fast win/s':>11} {'max|diff|':>10}")
+    for bs in args.batch_sizes:
+        x = torch.rand(bs, 3, SEQ_LEN, NUM_JOINTS)
+        with torch.inference_mode():
+            diff = (base(x) - fast(x)).abs().max().item()
+        t_base = time_forward(base, x, args.warmup, args.iters)
+        t_fast = time_forward(fast, x, args.warmup, args.iters)
+        print(f"{bs:>5} {t_base * 1e3:>9.2f} {t_fast * 1e3:>9.2f} {t_base / t_fast:>7.2f}x "
+              f"{bs / t_fast:>11.1f} {diff:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_keypoints.py
+"""
+Microbenchmark: chi phí mỗi frame của extract_keypoints (cũ) so với KeypointExtractor.
+Dùng landmark protobuf giả lập của MediaPipe nên không cần camera.
+
+    python -m benchmarks.bench_keypoints --frames 5000
+"""
+import argparse
+import random
+import timeit
+from types import SimpleNamespace
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from utils.keypoints import extract_keypoints, KeypointExtractor
+
+
+def make_landmarks(n, with_visibility=False):
+    landmarks = landmark_pb2.NormalizedLandmarkList()
+    for _ in range(n):
+        lm = landmarks.landmark.add()
+        lm.x, lm.y, lm.z = random.random(), random.random(), random.random() - 0.5
+        if with_visibility:
+            lm.visibility, lm.presence = random.random(), random.random()
+    return landmarks
+
+
+def make_results(pose=True, left=True, right=True):
+    return SimpleNamespace(
+        pose_landmarks=make_landmarks(33, with_visibility=True) if pose else None,
+        left_hand_landmarks=make_landmarks(21) if left else None,
+        right_hand_landmarks=make_landmarks(21) if right else None,
+    )
+
+
+SCENARIOS = {
+    "full": dict(pose=True, left=True, right=True),
+    "one_hand": dict(pose=True, left=False, right=True),
+    "pose_only": dict(pose=True, left=False, right=False),
+    "empty": dict(pose=False, left=False, right=False),
+}
+
+
+def bench(fn, frames, repeat):
+    return min(timeit.repeat(fn, number=frames, repeat=repeat)) / frames * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    extractor = KeypointExtractor()
+    print(f"{'scenario':<10} {'old (us)':>10} {'new (us)':>10} {'speedup':>8}")
+    for name, parts in SCENARIOS.items():
+        results = make_results(**parts)
+
+        # Kiểm tra cùng kết quả trước khi đo
+        new, _ = extractor.extract(results)
+        assert np.allclose(new.ravel(), extract_keypoints(results), atol=1e-7), name
+
+        old_us = bench(lambda: extract_keypoints(results), args.frames, args.repeat)
+        new_us = bench(lambda: extractor.extract(results), args.frames, args.repeat)
+        print(f"{name:<10} {old_us:>10.2f} {new_us:>10.2f} {old_us / new_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# benchmarks/bench_recognition.py
+"""
+Benchmark nhận diện end-to-end, lặp lại được: phát lại một bộ clip cố định qua đúng
+pipeline của trang Recognition (RecognitionPipeline + StreamingRecognizer), không cần
+camera hay giao diện, chạy được trên máy CI chỉ có CPU.
+
+Clip có thể là video, thư mục ảnh hoặc keypoints ghi sẵn (.npy/.npz, bỏ qua MediaPipe).
+Không có checkpoint thì dùng model trọng số ngẫu nhiên (seed cố định).
+
+    python -m benchmarks.bench_recognition clips/*.mp4 clips/*.npy --output bench.json
+
+Báo cáo cho từng clip:
+- fps: số frame xử lý / giây
+- ttfp_s: thời gian tới dự đoán đầu tiên
+- stability: tỉ lệ hai dự đoán liên tiếp giống nhau, flips: số lần đổi nhãn
+"""
+import argparse
+import json
+import os
+import time
+
+from configs.recognition_config import (MODEL_PATH, NUM_CLASSES, DEVICE, SEQ_LEN, THRESHOLD,
+                                        FRAME_SKIP, PREDICT_STRIDE)
+from utils.frame_sources import open_source
+from utils.model_loader import load_model, create_random_model
+from utils.realtime_pipeline import RecognitionPipeline
+from utils.streaming_recognizer import StreamingRecognizer
+
+
+def prediction_stability(preds):
+    """(tỉ lệ giữ nguyên nhãn giữa hai dự đoán liên tiếp, số lần đổi nhãn)."""
+    if len(preds) < 2:
+        return 1.0, 0
+    flips = sum(1 for a, b in zip(preds, preds[1:]) if a != b)
+    return 1.0 - flips / (len(preds) - 1), flips
+
+
+def run_clip(clip, model, args, holistic_factory):
+    source = open_source(clip)
+    holistic = None if source.provides_keypoints else holistic_factory()
+    recognizer = StreamingRecognizer(model, seq_len=SEQ_LEN, stride=args.stride,
+                                     threshold=args.threshold, device=DEVICE,
+                                     incremental=not args.full_window)
+    pipeline = RecognitionPipeline(source, holistic, recognizer, frame_skip=args.frame_skip,
+                                   drop_stale=False, log_predictions=True)
+    t0 = time.perf_counter()
+    try:
+        pipeline.start()
+        pipeline.join()
+    finally:
+        source.release()
+        if holistic is not None:
+            holistic.close()
+    elapsed = time.perf_counter() - t0
+
+    preds = [p[2] for p in pipeline.predictions]
+    stability, flips = prediction_stability(preds)
+    return {
+        "clip": clip,
+        "frames": recognizer.count,
+        "elapsed_s": elapsed,
+        "fps": recognizer.count / elapsed if elapsed > 0 else 0.0,
+        "ttfp_s": pipeline.predictions[0][0] if pipeline.predictions else None,
+        "predictions": len(preds),
+        "stability": stability,
+        "flips": flips,
+        "labels": preds,
+        "completed": pipeline.finished,
+        "latency": pipeline.latency.summary()["stages"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clips", nargs="+")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--random-weights", action="store_true",
+                        help="Bỏ qua checkpoint, dùng trọng số ngẫu nhiên (seed 0)")
+    parser.add_argument("--stride", type=int, default=PREDICT_STRIDE)
+    parser.add_argument("--frame-skip", type=int, default=FRAME_SKIP)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--full-window", action="store_true",
+                        help="Forward cả cửa sổ thay vì suy luận tăng dần")
+    parser.add_argument("--output", help="Ghi kết quả JSON")
+    args = parser.parse_args()
+
+    if args.random_weights or not os.path.exists(args.model):
+        print(f"[bench] Không dùng checkpoint ({args.model}) -> trọng số ngẫu nhiên")
+        model = create_random_model(NUM_CLASSES, seed=0, device=DEVICE)
+    else:
+        model = load_model(args.model, num_classes=NUM_CLASSES, device=DEVICE)
+
+    def holistic_factory():
+        # Import muộn: clip keypoints không cần MediaPipe
+        from utils.video_keypoints import create_holistic
+        return create_holistic()
+
+    results = [run_clip(clip, model, args, holistic_factory) for clip in args.clips]
+
+    print(f"{'clip':<40} {'frames':>7} {'fps':>8} {'ttfp(s)':>8} {'preds':>6} {'stable':>7} {'flips':>6}")
+    for r in results:
+        ttfp = f"{r['ttfp_s']:.3f}" if r["ttfp_s"] is not None else "-"
+        print(f"{os.path.basename(r['clip'])[:40]:<40} {r['frames']:>7} {r['fps']:>8.1f} {ttfp:>8} "
+              f"{r['predictions']:>6} {r['stability']:>7.2f} {r['flips']:>6}")
+
+    total_frames = sum(r["frames"] for r in results)
+    total_time = sum(r["elapsed_s"] for r in results)
+    summary = {
+        "frames": total_frames,
+        "fps": total_frames / total_time if total_time > 0 else 0.0,
+        "clips": len(results),
+    }
+    print(f"TOTAL: {total_frames} frames, {summary['fps']:.1f} FPS")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "summary": summary, "results": results}, f,
+                      ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# benchmarks/bench_suite.py
+"""
+Bộ benchmark SSTCN_Attention để theo dõi regression hiệu năng giữa các thay đổi:
+latency (mean / p50 / p90), throughput và peak RSS theo backend x số thread x batch size x độ dài cửa sổ.
+
+Mỗi lần chạy được nối vào file lịch sử JSON (BENCHMARK_HISTORY_PATH) kèm máy, commit git và model;
+mỗi cấu hình được so với lần chạy sạch gần nhất trên cùng máy (cùng CPU, số core, phiên bản torch),
+chậm hơn BENCHMARK_TIME_TOLERANCE hoặc tốn bộ nhớ hơn BENCHMARK_RSS_TOLERANCE thì báo regression
+(exit 1 với --fail-on-regression). Lần chạy có regression vẫn được ghi nhưng không làm baseline
+(tránh chậm dần từng chút mà không bị báo), trừ khi chạy với --accept-regressions. Chỉ chạy CPU; không có checkpoint thì dùng trọng số ngẫu nhiên.
+
+Peak RSS của từng cấu hình đọc từ VmHWM trong /proc/self/status, được reset trước mỗi cấu hình
+qua /proc/self/clear_refs (Linux); nơi khác dùng ru_maxrss (đỉnh của cả process).
+
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --backends eager onnx numpy --threads 1 4 --seq-lens 10 30 60
+    python -m benchmarks.bench_suite --fail-on-regression --no-save
+    python -m benchmarks.bench_suite --accept-regressions --label "model mới"
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from configs.recognition_config import (NUM_CLASSES, SEQ_LEN, NUM_JOINTS, BENCHMARK_HISTORY_PATH,
+                                        BENCHMARK_TIME_TOLERANCE, BENCHMARK_RSS_TOLERANCE)
+from utils.inference_backends import BACKENDS, create_backend
+from utils.model_loader import load_model, create_random_model, default_model_path, save_numpy_model
+from utils.numpy_model import NumpySSTCN
+from utils.perf_profile import host_info
+
+SUITE_BACKENDS = BACKENDS + ("numpy",)
+CONFIG_KEYS = ("backend", "num_threads", "batch_size", "seq_len")
+
+
+# --- Bộ nhớ ---
+def _proc_status_kb(field):
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Reset đỉnh RSS của process (True nếu hệ điều hành hỗ trợ)."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    kb = _proc_status_kb("VmHWM")
+    if kb is None:
+        import resource
+
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            kb //= 1024
+    return kb / 1024
+
+
+# --- Đo ---
+def build_backends(model, names, tmp):
+    backends = {}
+    for name in names:
+        try:
+            if name == "numpy":
+                runtime = NumpySSTCN.load(save_numpy_model(model, os.path.join(tmp, "model.npz")))
+                backends[name] = lambda x, runtime=runtime: runtime(x.numpy())
+            else:
+                backends[name] = create_backend(model, name, onnx_path=os.path.join(tmp, "model.onnx"))
+        except ImportError as e:
+            print(f"[bench] Bỏ qua backend {name}: {e}", file=sys.stderr)
+    return backends
+
+
+def measure(backend, x, warmup, iters, max_seconds):
+    """Thời gian từng lần gọi (giây): tối đa `iters` lần, dừng sớm sau `max_seconds`."""
+    with torch.inference_mode():
+        for _ in range(warmup):
+            backend(x)
+        times = []
+        start = time.perf_counter()
+        while len(times) < iters and (not times or time.perf_counter() - start < max_seconds):
+            t0 = time.perf_counter()
+            backend(x)
+            times.append(time.perf_counter() - t0)
+    return np.asarray(times)
+
+
+def run_suite(backends, args):
+    results = []
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        for name, backend in backends.items():
+            for seq_len in args.seq_lens:
+                for bs in args.batch_sizes:
+                    x = torch.rand(bs, 3, seq_len, NUM_JOINTS)
+                    exact = reset_peak_rss()
+                    times = measure(backend, x, args.warmup, args.iters, args.max_seconds)
+                    p50 = float(np.percentile(times, 50))
+                    result = {"backend": name, "num_threads": threads, "batch_size": bs, "seq_len": seq_len,
+                              "iters": len(times), "ms_mean": 1e3 * float(times.mean()), "ms_p50": 1e3 * p50,
+                              "ms_p90": 1e3 * float(np.percentile(times, 90)), "windows_per_s": bs / p50,
+                              "peak_rss_mb": peak_rss_mb(), "peak_rss_exact": exact}
+                    results.append(result)
+                    print(f"{name:>12} {threads:>7} {bs:>5} {seq_len:>7} {result['ms_p50']:>9.2f} "
+                          f"{result['ms_p90']:>9.2f} {result['windows_per_s']:>9.1f} {result['peak_rss_mb']:>8.0f}")
+    return results
+
+
+# --- Lịch sử + regression ---
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def same_host(a, b):
+    return all(a.get(k) == b.get(k) for k in ("cpu", "cpu_count", "torch"))
+
+
+def find_regressions(results, history, host, time_tolerance, rss_tolerance):
+    """
+    So từng cấu hình với lần chạy gần nhất trên cùng máy có cấu hình đó, bỏ qua các lần chạy
+    có regression chưa được chấp nhận.
+    """
+    regressions = []
+    for result in results:
+        key = tuple(result[k] for k in CONFIG_KEYS)
+        baseline = None
+        for run in reversed(history):
+            if not same_host(run.get("host", {}), host):
+                continue
+            if run.get("regressions") and not run.get("accepted"):
+                continue
+            baseline = next((r for r in run["results"] if tuple(r.get(k) for k in CONFIG_KEYS) == key), None)
+            if baseline is not None:
+                baseline = {**baseline, "commit": run.get("commit")}
+                break
+        if baseline is None:
+            continue
+        checks = [("ms_p50", time_tolerance)]
+        # Chỉ so RSS khi cả hai lần đều đo được đỉnh riêng từng cấu hình
+        if result.get("peak_rss_exact") and baseline.get("peak_rss_exact"):
+            checks.append(("peak_rss_mb", rss_tolerance))
+        for metric, tolerance in checks:
+            if result[metric] > baseline[metric] * (1 + tolerance):
+                regressions.append({**{k: result[k] for k in CONFIG_KEYS}, "metric": metric,
+                                    "baseline": baseline[metric], "current": result[metric],
+                                    "change": result[metric] / baseline[metric] - 1,
+                                    "baseline_commit": baseline["commit"]})
+    return regressions
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=default_model_path())
+    parser.add_argument("--random-weights", action="store_true")
+    parser.add_argument("--backends", nargs="+", choices=SUITE_BACKENDS, default=["eager", "torchscript", "onnx"])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seq-lens", type=int, nargs="+", default=[SEQ_LEN])
+    parser.add_argument("--threads", type=int, nargs="+", default=[torch.get_num_threads()])
+    parser.add_argument("--iters", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--max-seconds", type=float, default=3.0, help="Thời gian đo tối đa mỗi cấu hình")
+    parser.add_argument("--history", default=BENCHMARK_HISTORY_PATH)
+    parser.add_argument("--time-tolerance", type=float, default=BENCHMARK_TIME_TOLERANCE)
+    parser.add_argument("--rss-tolerance", type=float, default=BENCHMARK_RSS_TOLERANCE)
+    parser.add_argument("--label", default=None, help="Ghi chú cho lần chạy (ví dụ tên nhánh)")
+    parser.add_argument("--no-save", action="store_true", help="Chỉ so sánh, không nối vào lịch sử")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--accept-regressions", action="store_true",
+                        help="Dùng lần chạy này làm baseline dù có regression (thay đổi có chủ ý)")
+    args = parser.parse_args()
+
+    quantized = False
+    if args.random_weights or not args.model or not os.path.exists(args.model):
+        print(f"[bench] Không dùng {args.model} -> trọng số ngẫu nhiên")
+        model, source = create_random_model(NUM_CLASSES), None
+    else:
+        from utils.quantization import is_quantized_artifact
+
+        quantized = is_quantized_artifact(args.model)
+        model, source = (None if quantized else load_model(args.model)), args.model
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if quantized:
+            from utils.inference_backends import QuantizedBackend
+
+            backends = {"int8": QuantizedBackend(args.model)}
+        else:
+            backends = build_backends(model, args.backends, tmp)
+        print(f"{'backend':>12} {'threads':>7} {'batch':>5} {'seq_len':>7} {'p50 ms':>9} {'p90 ms':>9} "
+              f"{'win/s':>9} {'RSS MB':>8}")
+        results = run_suite(backends, args)
+
+    host = host_info()
+    history = load_history(args.history)
+    regressions = find_regressions(results, history, host, args.time_tolerance, args.rss_tolerance)
+    for r in regressions:
+        print(f"[bench] REGRESSION {r['backend']} threads={r['num_threads']} batch={r['batch_size']} "
+              f"seq_len={r['seq_len']}: {r['metric']} {r['baseline']:.2f} -> {r['current']:.2f} "
+              f"({r['change']:+.0%}, so với commit {r['baseline_commit']})")
+    if not regressions:
+        print("[bench] Không có regression so với lần chạy trước")
+
+    if not args.no_save:
+        history.append({"created": time.time(), "commit": git_commit(), "label": args.label, "host": host,
+                        "model": source, "regressions": len(regressions), "accepted": args.accept_regressions,
+                        "results": results})
+        save_history(args.history, history)
+        print(f"[bench] Đã ghi {args.history} ({len(history)} lần chạy)")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
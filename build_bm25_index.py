@@ -0,0 +1,84 @@
+# build_bm25_index.py
+"""
+Dựng chỉ mục BM25 (utils/bm25_index.py) từ DOCS_PATH vào BM25_INDEX_PATH, rồi kiểm tra top-k
+so với BM25Retriever.from_documents (cách rag_service dựng BM25 trước đây) trên một tập truy vấn:
+tên ký hiệu / bài học trong corpus + các truy vấn ở --queries (mỗi dòng một truy vấn).
+
+    python build_bm25_index.py
+    python build_bm25_index.py --queries queries.txt --k 5 10
+"""
+import argparse
+import time
+
+import numpy as np
+from langchain_community.retrievers import BM25Retriever
+
+from config import DOCS_PATH, BM25_INDEX_PATH
+from rag_service import load_docs, build_bm25_index
+from utils.bm25_index import BM25Index
+
+
+def default_queries(documents):
+    """Dòng đầu (Sign: / Lesson: ...) của mỗi tài liệu, bỏ nhãn -> truy vấn ngắn như query đã tối ưu."""
+    queries = []
+    for doc in documents:
+        first = doc.page_content.strip().split("\n", 1)[0]
+        queries.append(first.split(":", 1)[-1].strip())
+    return [q for q in dict.fromkeys(queries) if q]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=DOCS_PATH)
+    parser.add_argument("--index", default=BM25_INDEX_PATH)
+    parser.add_argument("--queries", default=None, help="File truy vấn, mỗi dòng một truy vấn")
+    parser.add_argument("--k", type=int, nargs="+", default=[5])
+    args = parser.parse_args()
+
+    documents = load_docs(args.docs)
+    if not documents:
+        raise SystemExit(f"[bm25] Không có tài liệu trong {args.docs}")
+    t0 = time.perf_counter()
+    build_bm25_index(args.index, args.docs)
+    print(f"[bm25] Đã dựng {args.index} ({len(documents)} tài liệu) trong {time.perf_counter() - t0:.2f}s")
+
+    t0 = time.perf_counter()
+    index = BM25Index(args.index)
+    t_load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    reference = BM25Retriever.from_documents(documents)
+    t_build = time.perf_counter() - t0
+    print(f"[bm25] Khởi động: nạp chỉ mục {1e3 * t_load:.1f} ms, BM25Retriever.from_documents {1e3 * t_build:.1f} ms")
+
+    queries = default_queries(documents)
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries += [line.strip() for line in f if line.strip()]
+
+    mismatches = 0
+    for k in args.k:
+        for query in queries:
+            ids, _ = index.top_k(query, k)
+            scores = reference.vectorizer.get_scores(reference.preprocess_func(query))
+            expected = np.argsort(scores)[::-1][:k]
+            if not np.array_equal(ids, expected):
+                mismatches += 1
+                print(f"[bm25] Lệch top-{k} cho {query!r}: {ids.tolist()} != {expected.tolist()}")
+
+    tokens = [reference.preprocess_func(q) for q in queries]
+    t0 = time.perf_counter()
+    for query in queries:
+        index.top_k(query, max(args.k))
+    t_index = (time.perf_counter() - t0) / len(queries)
+    t0 = time.perf_counter()
+    for query in tokens:
+        reference.vectorizer.get_top_n(query, reference.docs, n=max(args.k))
+    t_reference = (time.perf_counter() - t0) / len(queries)
+    print(f"[bm25] {len(queries)} truy vấn x top-{args.k}: {mismatches} lệch; "
+          f"mỗi truy vấn {1e3 * t_index:.3f} ms (chỉ mục) / {1e3 * t_reference:.3f} ms (BM25Retriever)")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,32 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # DOCS_PATH = os.path.join(os.path.dirname(BASE_DIR), "data", "docs.pkl")
 CHROMA_PATH = os.path.join(BASE_DIR, "vectorstore", "chroma") 
 DOCS_PATH = os.path.join(BASE_DIR, "data", "docs_chroma.pkl")
+# Chỉ mục BM25 dựng sẵn (utils/bm25_index.py), tự dựng lại khi DOCS_PATH thay đổi
+BM25_INDEX_PATH = os.path.join(BASE_DIR, "vectorstore", "bm25")
+USE_BM25_INDEX = True
+# Chỉ mục dense NumPy (utils/dense_index.py) thay cho truy vấn Chroma; dựng từ embeddings trong Chroma,
+# tự dựng lại khi vectorstore thay đổi. "l2" giữ thứ tự như collection Chroma (space l2).
+DENSE_INDEX_PATH = os.path.join(BASE_DIR, "vectorstore", "dense")
+USE_DENSE_INDEX = False
+DENSE_INDEX_METRIC = "l2"
+# Cache kết quả viết lại truy vấn (key: truy vấn chuẩn hóa + hash prompt template / model):
+# LRU trong bộ nhớ (REWRITE_CACHE_MAX_ENTRIES) trước bảng SQLite (tối đa REWRITE_CACHE_MAX_STORED dòng),
+# hết hạn sau REWRITE_CACHE_TTL giây; entry hết hạn / của prompt template cũ bị xóa lúc khởi tạo RAG
+REWRITE_CACHE_PATH = os.path.join(BASE_DIR, "memory", "rag_cache.db")
+USE_REWRITE_CACHE = True
+REWRITE_CACHE_TTL = 7 * 24 * 3600
+REWRITE_CACHE_MAX_ENTRIES = 2048
+REWRITE_CACHE_MAX_STORED = 50000
+# Cache kết quả truy xuất cuối (id + điểm rerank theo truy vấn đã tối ưu, chuẩn hóa như cache trên).
+# Namespace = phiên bản corpus (hash Chroma + DOCS_PATH + model embedding / rerank): corpus đổi là tự vô hiệu.
+RETRIEVAL_CACHE_PATH = os.path.join(BASE_DIR, "memory", "retrieval_cache.db")
+USE_RETRIEVAL_CACHE = True
+RETRIEVAL_CACHE_TTL = 30 * 24 * 3600
+RETRIEVAL_CACHE_MAX_ENTRIES = 1024
+RETRIEVAL_CACHE_MAX_STORED = 20000
+# Fast path: truy vấn chỉ gọi tên một ký hiệu đã biết (utils/sign_terms.py) được trả thẳng từ chỉ mục thuật ngữ
+SIGN_TERMS_PATH = os.path.join(BASE_DIR, "data", "sign_terms_updated_video.json")
+USE_SIGN_TERM_FAST_PATH = True
 MODEL_NAME = "gemini-2.5-flash"
 MODEL_NAME_2 = "gemini-2.5-flash-lite"
 
@@ -0,0 +1,84 @@
+# configs/recognition_config.py
+# Cấu hình dùng chung cho nhận diện ký hiệu (trang Recognition và các công cụ offline).
+# Không import torch/streamlit ở đây để module nào cũng dùng được.
+
+MODEL_PATH = "sign_sstcn_attention_model.pth"
+NUM_CLASSES = 102
+UNKNOWN_CLASS = 102          # index "UNKNOWN" trong SIGN_DICT
+DEVICE = "cpu"
+
+SEQ_LEN = 30                 # số frame trong một cửa sổ
+NUM_JOINTS = 75              # 33 pose + 21 tay trái + 21 tay phải
+THRESHOLD = 0.7              # ngưỡng xác suất để chấp nhận dự đoán
+
+FRAME_SKIP = 2               # chỉ xử lý 1/FRAME_SKIP frame camera
+PREDICT_STRIDE = 5           # dự đoán lại sau mỗi PREDICT_STRIDE frame (cửa sổ trượt)
+
+# Early exit: dự đoán cả trên cửa sổ chưa đủ SEQ_LEN frame (từ EARLY_EXIT_MIN_FRAMES frame),
+# hiện kết quả ngay khi xác suất >= THRESHOLD rồi tiếp tục cập nhật khi có thêm frame
+EARLY_EXIT = True
+EARLY_EXIT_MIN_FRAMES = 10
+
+# Dùng SSTCN_AttentionInference (cùng checkpoint, forward nhanh hơn) khi load model
+OPTIMIZED_MODEL = True
+
+# Bỏ qua attention của tay không xuất hiện (keypoints = 0) và không chạy model khi
+# cả cửa sổ không có pose lẫn tay (trả về UNKNOWN). Phần attention cho kết quả giống hệt đường đầy đủ.
+PRESENCE_AWARE = True
+
+# Checkpoint đã gộp BN vào conv, bỏ dropout (tạo bằng `python freeze_model.py`).
+# Trang Recognition dùng file này nếu có, không thì dùng MODEL_PATH.
+FUSED_MODEL_PATH = "sign_sstcn_attention_model_fused.pth"
+USE_FUSED_MODEL = True
+
+# Checkpoint dạng tensor memory-map (tạo bằng `python convert_checkpoint.py`): không unpickle,
+# các worker dùng chung trang trọng số qua page cache. Ưu tiên hơn file .pth khi có.
+TENSOR_MODEL_PATH = "sign_sstcn_attention_model.safetensors"
+USE_TENSOR_MODEL = True
+
+# Backend suy luận: "eager" (PyTorch), "torchscript" (trace + freeze) hoặc "onnx" (onnxruntime CPU).
+# Chỉ "eager" dùng được suy luận tăng dần (INCREMENTAL_INFERENCE).
+INFERENCE_BACKEND = "eager"
+ONNX_MODEL_PATH = "sign_sstcn_attention_model.onnx"
+ONNX_OPSET = 17
+
+# Artifact int8 (tạo bằng `python quantize_model.py`), ưu tiên hơn checkpoint fuse khi bật
+QUANTIZED_MODEL_PATH = "sign_sstcn_attention_model_int8.pt"
+USE_QUANTIZED_MODEL = False
+
+# Trọng số .npz cho runtime NumPy (tạo bằng `python export_numpy.py`). Khi bật và có file,
+# trang Recognition chạy model bằng utils/numpy_model.py, không import torch.
+NUMPY_MODEL_PATH = "sign_sstcn_attention_model.npz"
+NUMPY_RUNTIME = False
+
+# Cache keypoints cho công cụ offline (key = hash nội dung video + cấu hình Holistic)
+KEYPOINT_CACHE_DIR = "data/keypoint_cache"
+KEYPOINT_CACHE_MAX_BYTES = 2 * 1024 ** 3   # 2 GB, vượt quá thì xóa theo LRU
+
+# Suy luận tăng dần: chỉ tính phần mới của mỗi frame thay vì forward lại cả cửa sổ
+INCREMENTAL_INFERENCE = True
+
+# recognition_service.py: gom cửa sổ từ nhiều session thành một batch
+SERVICE_MAX_BATCH = 32
+SERVICE_MAX_WAIT_MS = 10
+
+# Nơi lưu số liệu độ trễ (JSON) mỗi khi tắt camera
+LATENCY_LOG_DIR = "logs/latency"
+
+# Lịch sử benchmark model (`python -m benchmarks.bench_suite`): kết quả mỗi lần chạy được nối
+# vào file JSON; chậm hơn / tốn bộ nhớ hơn lần chạy trước trên cùng máy quá ngưỡng -> báo regression
+BENCHMARK_HISTORY_PATH = "logs/benchmark_history.json"
+BENCHMARK_TIME_TOLERANCE = 0.15      # +15% latency p50
+BENCHMARK_RSS_TOLERANCE = 0.20       # +20% peak RSS
+
+# Preview camera: thu nhỏ + JPEG + giới hạn FPS, tách khỏi tốc độ nhận diện
+PREVIEW_MAX_WIDTH = 640
+PREVIEW_JPEG_QUALITY = 70
+PREVIEW_MAX_FPS = 15
+
+# Nguồn camera cho trang Recognition: số -> webcam, hoặc đường dẫn video / thư mục ảnh / keypoints .npy
+CAMERA_SOURCE = 0
+
+# Profile hiệu năng theo máy (tạo bằng `python autotune.py`), áp dụng lúc khởi động
+PERF_PROFILE_DIR = "profiles"
+APPLY_PERF_PROFILE = True
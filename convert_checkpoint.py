@@ -0,0 +1,44 @@
+# convert_checkpoint.py
+"""
+Chuyển checkpoint .pth (huấn luyện hoặc đã fuse) sang file tensor memory-map (safetensors-style)
+kèm metadata: num_classes, bố cục joints, SEQ_LEN, bảng nhãn. Sau đó nạp lại file mới
+và so sánh logits với checkpoint gốc.
+
+    python convert_checkpoint.py
+    python convert_checkpoint.py --model sign_sstcn_attention_model.pth --fuse
+"""
+import argparse
+
+import torch
+
+from configs.recognition_config import MODEL_PATH, TENSOR_MODEL_PATH, SEQ_LEN, NUM_JOINTS
+from utils.model_loader import load_model, fuse_model, save_model_tensors
+from utils.tensor_file import read_metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--output", default=TENSOR_MODEL_PATH)
+    parser.add_argument("--fuse", action="store_true", help="Gộp BN vào conv trước khi lưu")
+    parser.add_argument("--atol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    if args.fuse:
+        model = fuse_model(model)
+    save_model_tensors(model, args.output, source=args.model)
+
+    reloaded = load_model(args.output)
+    x = torch.rand(8, 3, SEQ_LEN, NUM_JOINTS)
+    with torch.inference_mode():
+        diff = (model(x) - reloaded(x)).abs().max().item()
+    metadata = read_metadata(args.output)
+    print(f"[convert] {args.model} -> {args.output} (fused={metadata['fused']}, "
+          f"num_classes={metadata['num_classes']}), max|diff| = {diff:.2e}")
+    if diff > args.atol:
+        raise SystemExit(f"[convert] Lệch vượt atol={args.atol:g}")
+
+
+if __name__ == "__main__":
+    main()
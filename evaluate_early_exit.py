@@ -0,0 +1,142 @@
+# evaluate_early_exit.py
+"""
+Đánh giá early exit: độ chính xác so với thời gian ra quyết định.
+
+Mỗi bản ghi keypoints (T, 75, 3) .npy/.npz là một ký hiệu. Nhãn lấy từ --labels (JSON
+{tên file: class id hoặc nhãn}) hoặc từ tên thư mục cha (class id / nhãn trong SIGN_DICT).
+Với mỗi bản ghi, model chạy trên mọi tiền tố 1..SEQ_LEN frame (một batch có mask độ dài);
+với từng threshold, quyết định là tiền tố ngắn nhất (>= --min-frames) có xác suất >= threshold.
+
+    python evaluate_early_exit.py data/recordings --thresholds 0.5 0.7 0.9
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import torch
+
+from configs.recognition_config import (MODEL_PATH, SEQ_LEN, THRESHOLD, FRAME_SKIP,
+                                        EARLY_EXIT_MIN_FRAMES, UNKNOWN_CLASS)
+from utils.keypoint_windows import find_keypoint_files, load_keypoint_file
+from utils.model_loader import load_model, create_random_model
+from utils.sign_dict import SIGN_DICT
+
+LABEL_TO_ID = {v: k for k, v in SIGN_DICT.items()}
+
+
+def resolve_label(path, labels):
+    """Class id của bản ghi, None nếu không xác định được."""
+    name = os.path.basename(path)
+    value = labels.get(path, labels.get(name, labels.get(os.path.splitext(name)[0])))
+    if value is None:
+        value = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    if isinstance(value, int) or str(value).isdigit():
+        return int(value)
+    return LABEL_TO_ID.get(str(value))
+
+
+def prefix_probs(model, keypoints, seq_len, batch_size=32):
+    """Xác suất [L, num_classes] trên các tiền tố 1..L frame (L = min(T, seq_len))."""
+    L = min(len(keypoints), seq_len)
+    window = torch.from_numpy(np.ascontiguousarray(keypoints[:L].transpose(2, 0, 1)))  # [3, L, J]
+    lengths = torch.arange(1, L + 1)
+    probs = []
+    with torch.inference_mode():
+        for i in range(0, L, batch_size):
+            n = lengths[i:i + batch_size]
+            x = window.unsqueeze(0).expand(len(n), -1, -1, -1)
+            probs.append(torch.softmax(model(x, n), dim=1))
+    return torch.cat(probs).numpy()
+
+
+def summarize(records, threshold, min_frames, seconds_per_frame):
+    """records: list (label, probs [L, C]). Trả về dict chỉ số cho một threshold."""
+    correct, decided, frames = 0, 0, []
+    for label, probs in records:
+        best = probs.argmax(axis=1)
+        conf = probs.max(axis=1)
+        hits = np.nonzero(conf[min_frames - 1:] >= threshold)[0]
+        if len(hits):
+            t = hits[0] + min_frames
+            decided += 1
+            correct += int(best[t - 1] == label)
+        else:
+            # Không vượt threshold cả khi đủ cửa sổ -> UNKNOWN, quyết định lúc cửa sổ đầy
+            t = len(probs)
+            correct += int(label == UNKNOWN_CLASS)
+        frames.append(t)
+    frames = np.asarray(frames, dtype=np.float64)
+    n = len(records)
+    return {
+        "threshold": threshold,
+        "clips": n,
+        "decided": decided / n,
+        "accuracy": correct / n,
+        "mean_frames": float(frames.mean()),
+        "p50_frames": float(np.percentile(frames, 50)),
+        "p90_frames": float(np.percentile(frames, 90)),
+        "mean_seconds": float(frames.mean() * seconds_per_frame),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="File/thư mục keypoints ghi sẵn")
+    parser.add_argument("--labels", default=None, help="JSON {tên file: class id hoặc nhãn}")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--random-weights", action="store_true")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.6, THRESHOLD, 0.8, 0.9])
+    parser.add_argument("--min-frames", type=int, default=EARLY_EXIT_MIN_FRAMES)
+    parser.add_argument("--fps", type=float, default=30.0, help="FPS camera (trước frame_skip)")
+    parser.add_argument("--frame-skip", type=int, default=FRAME_SKIP)
+    parser.add_argument("--output", default=None, help="Ghi kết quả JSON")
+    args = parser.parse_args()
+
+    labels = {}
+    if args.labels:
+        with open(args.labels, encoding="utf-8") as f:
+            labels = json.load(f)
+
+    if args.random_weights or not os.path.exists(args.model):
+        print(f"[early-exit] Không dùng {args.model} -> trọng số ngẫu nhiên")
+        model = create_random_model()
+    else:
+        model = load_model(args.model)
+
+    records, skipped = [], 0
+    for path in find_keypoint_files(args.inputs):
+        label = resolve_label(path, labels)
+        keypoints = load_keypoint_file(path)
+        if label is None or len(keypoints) == 0:
+            skipped += 1
+            continue
+        records.append((label, prefix_probs(model, keypoints, SEQ_LEN)))
+    if not records:
+        parser.error("Không có bản ghi nào có nhãn.")
+    print(f"[early-exit] {len(records)} bản ghi ({skipped} bỏ qua vì thiếu nhãn / rỗng)")
+
+    seconds_per_frame = args.frame_skip / args.fps
+    min_frames = max(1, min(args.min_frames, SEQ_LEN))
+    # Mốc so sánh: chỉ dự đoán khi cửa sổ đầy (không early exit)
+    baseline = summarize([(label, probs[-1:]) for label, probs in records],
+                         THRESHOLD, 1, seconds_per_frame)
+    baseline["mean_frames"] = float(np.mean([len(p) for _, p in records]))
+    baseline["mean_seconds"] = baseline["mean_frames"] * seconds_per_frame
+    results = [summarize(records, t, min_frames, seconds_per_frame) for t in args.thresholds]
+
+    print(f"{'threshold':>9} {'quyết định':>10} {'accuracy':>9} {'frames':>7} {'p50':>5} {'p90':>5} {'giây':>6}")
+    print(f"{'đủ cửa sổ':>9} {baseline['decided']:>10.1%} {baseline['accuracy']:>9.1%} "
+          f"{baseline['mean_frames']:>7.1f} {'':>5} {'':>5} {baseline['mean_seconds']:>6.2f}")
+    for r in results:
+        print(f"{r['threshold']:>9.2f} {r['decided']:>10.1%} {r['accuracy']:>9.1%} {r['mean_frames']:>7.1f} "
+              f"{r['p50_frames']:>5.0f} {r['p90_frames']:>5.0f} {r['mean_seconds']:>6.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"min_frames": min_frames, "baseline": baseline, "results": results},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# export_numpy.py
+"""
+Export trọng số SSTCN_Attention sang .npz cho runtime NumPy (utils/numpy_model.py), rồi kiểm tra
+logits của runtime NumPy (forward đầy đủ, cửa sổ ngắn và suy luận tăng dần NumpyStream)
+so với model PyTorch trên cửa sổ keypoints ghi sẵn (hoặc ngẫu nhiên nếu không có).
+
+Bật NUMPY_RUNTIME trong configs/recognition_config.py để trang Recognition chạy không cần torch.
+
+    python export_numpy.py
+    python export_numpy.py --model sign_sstcn_attention_model_fused.pth --windows data/keypoint_cache
+    python export_numpy.py --random-weights --output /tmp/model.npz
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import torch
+
+from configs.recognition_config import (MODEL_PATH, NUMPY_MODEL_PATH, SEQ_LEN, NUM_JOINTS,
+                                        KEYPOINT_CACHE_DIR, PREDICT_STRIDE, EARLY_EXIT_MIN_FRAMES)
+from utils.keypoint_windows import load_windows
+from utils.model_loader import load_model, create_random_model, save_numpy_model
+from utils.numpy_model import NumpySSTCN, NumpyStream
+
+
+def time_call(fn, iters=10):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    return 1e3 * (time.perf_counter() - t0) / iters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--random-weights", action="store_true")
+    parser.add_argument("--output", default=NUMPY_MODEL_PATH)
+    parser.add_argument("--windows", nargs="*", default=[KEYPOINT_CACHE_DIR],
+                        help="File/thư mục keypoints ghi sẵn để so sánh")
+    parser.add_argument("--max-windows", type=int, default=256)
+    parser.add_argument("--atol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    if args.random_weights or not os.path.exists(args.model):
+        print(f"[numpy] Không dùng {args.model} -> trọng số ngẫu nhiên")
+        model, source = create_random_model(), None
+    else:
+        model, source = load_model(args.model), args.model
+    save_numpy_model(model, args.output, source=source)
+    runtime = NumpySSTCN.load(args.output)
+    print(f"[numpy] Đã export {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+
+    windows = load_windows(args.windows, SEQ_LEN, PREDICT_STRIDE, max_windows=args.max_windows)
+    if len(windows) == 0:
+        print("[numpy] Không có cửa sổ ghi sẵn -> dùng keypoints ngẫu nhiên")
+        windows = np.random.default_rng(0).random((64, 3, SEQ_LEN, NUM_JOINTS), dtype=np.float32)
+    windows = np.ascontiguousarray(windows, dtype=np.float32)
+
+    with torch.inference_mode():
+        reference = torch.cat([model(torch.from_numpy(windows[i:i + 32]))
+                               for i in range(0, len(windows), 32)]).numpy()
+        short = windows[:8, :, :EARLY_EXIT_MIN_FRAMES]
+        short_reference = model(torch.from_numpy(short)).numpy()
+    logits = np.concatenate([runtime(windows[i:i + 32]) for i in range(0, len(windows), 32)])
+    diffs = {
+        "cửa sổ đầy": np.abs(logits - reference).max(),
+        f"cửa sổ {short.shape[2]} frame": np.abs(runtime(short) - short_reference).max(),
+    }
+    # Suy luận tăng dần trên chuỗi frame của cửa sổ đầu tiên, so với forward đầy đủ sau mỗi frame
+    stream = NumpyStream(runtime, seq_len=SEQ_LEN)
+    frames = windows[0].transpose(1, 0, 2)                                      # [T, C, J]
+    diffs["NumpyStream"] = max(np.abs(stream.step(frame) - runtime(frames[:t + 1].transpose(1, 0, 2)[None])).max()
+                               for t, frame in enumerate(frames))
+    agreement = (logits.argmax(axis=1) == reference.argmax(axis=1)).mean()
+    for name, diff in diffs.items():
+        print(f"[numpy] max|logits lệch| {name}: {diff:.2e}")
+    print(f"[numpy] top-1 trùng với PyTorch: {agreement:.1%} ({len(windows)} cửa sổ)")
+
+    x = windows[:1]
+    with torch.inference_mode():
+        ms_torch = time_call(lambda: model(torch.from_numpy(x)))
+    print(f"[numpy] batch 1: PyTorch {ms_torch:.1f} ms, NumPy {time_call(lambda: runtime(x)):.1f} ms")
+
+    if max(diffs.values()) > args.atol or agreement < 1.0:
+        raise SystemExit(f"[numpy] Runtime NumPy lệch so với PyTorch (atol={args.atol:g})")
+
+
+if __name__ == "__main__":
+    main()
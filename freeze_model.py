@@ -0,0 +1,69 @@
+# freeze_model.py
+"""
+"Đóng băng" SSTCN_Attention cho suy luận: gộp BatchNorm vào conv đứng trước, bỏ dropout
+và lưu thành checkpoint riêng mà trang Recognition nạp trực tiếp.
+Trước khi lưu, so sánh logits với model gốc trên input ngẫu nhiên; lệch quá --atol thì không lưu.
+
+    python freeze_model.py
+    python freeze_model.py --model sign_sstcn_attention_model.pth --output sign_sstcn_attention_model_fused.pth
+"""
+import argparse
+import os
+import sys
+
+import torch
+
+from configs.recognition_config import MODEL_PATH, FUSED_MODEL_PATH, NUM_CLASSES, SEQ_LEN, NUM_JOINTS
+from utils.model_loader import load_model, create_random_model, fuse_model, save_fused_checkpoint
+
+
+def check_equivalence(reference, fused, batches=4, batch_size=8, seed=0):
+    """Max |logits lệch| và tỉ lệ trùng top-1 trên input ngẫu nhiên (kèm cửa sổ ngắn hơn SEQ_LEN)."""
+    gen = torch.Generator().manual_seed(seed)
+    max_diff, agree, total = 0.0, 0, 0
+    with torch.inference_mode():
+        for b in range(batches):
+            seq_len = SEQ_LEN if b % 2 == 0 else max(1, SEQ_LEN // 2)
+            x = torch.rand(batch_size, 3, seq_len, NUM_JOINTS, generator=gen)
+            ref, out = reference(x), fused(x)
+            max_diff = max(max_diff, (ref - out).abs().max().item())
+            agree += (ref.argmax(dim=1) == out.argmax(dim=1)).sum().item()
+            total += batch_size
+    return max_diff, agree / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--output", default=FUSED_MODEL_PATH)
+    parser.add_argument("--random-weights", action="store_true",
+                        help="Dùng trọng số ngẫu nhiên (khi không có checkpoint)")
+    parser.add_argument("--batches", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--atol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    if args.random_weights or not os.path.exists(args.model):
+        print(f"[freeze] Không dùng {args.model} -> trọng số ngẫu nhiên")
+        reference = create_random_model(NUM_CLASSES, optimized=False)
+        source = None
+    else:
+        reference = load_model(args.model, optimized=False)
+        source = args.model
+
+    fused = fuse_model(reference)
+    max_diff, agreement = check_equivalence(reference, fused, args.batches, args.batch_size)
+    print(f"[freeze] max|logits diff| = {max_diff:.2e}, top-1 trùng {agreement:.1%}")
+    if max_diff > args.atol:
+        print(f"[freeze] Lệch vượt atol={args.atol:g}, không lưu checkpoint")
+        sys.exit(1)
+
+    save_fused_checkpoint(fused, args.output, source=source)
+    # Nạp lại đúng đường mà trang Recognition dùng để chắc checkpoint đọc được
+    reloaded = load_model(args.output)
+    max_diff, _ = check_equivalence(reference, reloaded, 1, args.batch_size)
+    print(f"[freeze] Đã lưu {args.output} (nạp lại: max|diff| = {max_diff:.2e})")
+
+
+if __name__ == "__main__":
+    main()
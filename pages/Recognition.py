@@ -1,11 +1,19 @@
 # app_sign_realtime.py
+import os
+import time
 import streamlit as st
-import cv2
 import mediapipe as mp
-import numpy as np
-import torch
-from sstcn_attention_model import SSTCN_Attention
 from utils.sign_dict import SIGN_DICT
+from utils.numpy_model import NumpySSTCN
+from utils.streaming_recognizer import StreamingRecognizer
+from utils.realtime_pipeline import RecognitionPipeline
+from utils.latency import LatencyTracker
+from utils.preview import PreviewRenderer
+from utils.frame_sources import open_source
+from configs.recognition_config import (NUM_CLASSES, UNKNOWN_CLASS, DEVICE,
+                                        SEQ_LEN, THRESHOLD, FRAME_SKIP, PREDICT_STRIDE,
+                                        LATENCY_LOG_DIR, CAMERA_SOURCE, INFERENCE_BACKEND,
+                                        NUMPY_RUNTIME, NUMPY_MODEL_PATH, PRESENCE_AWARE)
 from configs.page_config import setup_page
 from utils.image_util import load_image_base64
 from utils.motivations import get_motivation
@@ -44,16 +52,19 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # --- Load mô hình ---
-NUM_CLASSES = 102
-DEVICE = 'cpu'
-
 @st.cache_resource
 def load_model():
-    model = SSTCN_Attention(num_classes=NUM_CLASSES).to(DEVICE)
-    checkpoint = torch.load("sign_sstcn_attention_model.pth", map_location=DEVICE)
-    model.load_state_dict(checkpoint['model_state_dict'])
-    model.eval()
-    return model
+    if NUMPY_RUNTIME and os.path.exists(NUMPY_MODEL_PATH):
+        # Runtime NumPy: process Streamlit không cần import torch
+        return NumpySSTCN.load(NUMPY_MODEL_PATH, presence_aware=PRESENCE_AWARE)
+    from utils.model_loader import default_model_path
+    from utils.inference_backends import load_backend
+    from utils.perf_profile import apply_profile, profile_backend
+
+    # Số thread / backend theo profile của máy (autotune.py), nếu có
+    settings = apply_profile("realtime")
+    return load_backend(default_model_path(), profile_backend(settings, INFERENCE_BACKEND),
+                        num_classes=NUM_CLASSES, device=DEVICE)
 
 model = load_model()
 sign_dict = SIGN_DICT
@@ -63,29 +74,6 @@ mp_holistic = mp.solutions.holistic
 holistic = mp_holistic.Holistic(min_detection_confidence=0.5,
                                 min_tracking_confidence=0.5)
 
-SEQ_LEN = 30
-NUM_JOINTS = 75
-threshold = 0.7
-
-# --- Hàm trích xuất keypoints ---
-def extract_keypoints(results):
-    if results.pose_landmarks:
-        pose = np.array([[lm.x, lm.y, lm.z] for lm in results.pose_landmarks.landmark])
-    else:
-        pose = np.zeros((33, 3))
-    
-    if results.left_hand_landmarks:
-        left = np.array([[lm.x, lm.y, lm.z] for lm in results.left_hand_landmarks.landmark])
-    else:
-        left = np.zeros((21, 3))
-    
-    if results.right_hand_landmarks:
-        right = np.array([[lm.x, lm.y, lm.z] for lm in results.right_hand_landmarks.landmark])
-    else:
-        right = np.zeros((21, 3))
-    
-    return np.concatenate([pose, left, right]).flatten()
-
 
 # CSS để căn giữa FRAME_WINDOW
 st.markdown("""
@@ -118,62 +106,69 @@ with col2:
     FRAME_WINDOW = st.image([], channels="BGR", use_container_width=False)
 
     st.markdown('</div>', unsafe_allow_html=True)
+
+# Panel độ trễ (tùy chọn) ở sidebar, cập nhật trong lúc camera chạy
+with st.sidebar:
+    show_latency = st.checkbox("⏱️ Hiển thị độ trễ", value=False)
+    latency_panel = st.empty()
+
 if start_button:
-    cap = cv2.VideoCapture(0)
-    sequence = []
-    pred = 102
-    pred_rate_value = 0.0
-    frame_skip = 2
-    frame_count = 0
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            st.warning("Không thể mở webcam!")
-            break
-
-        frame_count += 1
-        if frame_count % frame_skip != 0:
-            continue
-
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = holistic.process(image)
-
-        keypoints = extract_keypoints(results)
-        sequence.append(keypoints)
-
-        sequence_count_text.markdown(f"### Tiến trình: {len(sequence)}/{SEQ_LEN}")
-
-        # --- Khi đủ 30 frames ---
-        if len(sequence) == SEQ_LEN:
-            seq = np.array(sequence).reshape(SEQ_LEN, NUM_JOINTS, 3)
-            seq = seq.transpose(2, 0, 1)        # (3, 30, 75)
-            seq = seq[np.newaxis, ...]          # (1, 3, 30, 75)
-            seq = torch.tensor(seq, dtype=torch.float32).to(DEVICE)
-
-            with torch.no_grad():
-                out = model(seq)
-                probs = torch.softmax(out, dim=1)
-                max_prob, pred_idx = torch.max(probs, dim=1)
-                if max_prob.item() >= threshold:
-                    pred = pred_idx.item()
-                    pred_rate_value = max_prob.item()
-                else:
-                    pred = 102
-                    pred_rate_value = 0.0
-            sequence = []
-
-        # --- Hiển thị kết quả ---
-        FRAME_WINDOW.image(frame, channels="BGR")
-
-        pred_text.markdown(f"### Dự đoán: **{sign_dict[pred]}**")
-        pred_rate.markdown(f"### Xác suất: **{pred_rate_value:.2f}**")
-
-        # Nếu người dùng nhấn Dừng thì thoát
-        if stop_button:
-            break
-
-    cap.release()
+    cap = open_source(CAMERA_SOURCE, realtime=True)
+    # Cửa sổ trượt: dự đoán lại mỗi PREDICT_STRIDE frame trên SEQ_LEN frame gần nhất
+    recognizer = StreamingRecognizer(model, seq_len=SEQ_LEN, stride=PREDICT_STRIDE,
+                                     threshold=THRESHOLD, unknown_class=UNKNOWN_CLASS,
+                                     device=DEVICE)
+    # Capture / MediaPipe / model chạy song song trên các thread riêng
+    latency = LatencyTracker()
+    pipeline = RecognitionPipeline(cap, holistic, recognizer, frame_skip=FRAME_SKIP, latency=latency)
+    pipeline.start()
+    # Preview chạy với FPS riêng, không làm chậm nhận diện
+    preview = PreviewRenderer(FRAME_WINDOW)
+    output_seq = 0
+    last_panel_update = 0.0
+    last_progress, last_result = None, None
+
+    try:
+        while pipeline.running:
+            output_seq, output = pipeline.wait_output(output_seq)
+            if output is None:
+                continue
+
+            # Chỉ gửi text khi thay đổi để giảm message qua websocket
+            if output["progress"] != last_progress:
+                sequence_count_text.markdown(f"### Tiến trình: {output['progress']}/{SEQ_LEN}")
+                last_progress = output["progress"]
+
+            result = (output["pred"], round(output["prob"], 2))
+            if result != last_result:
+                pred_text.markdown(f"### Dự đoán: **{sign_dict[output['pred']]}**")
+                pred_rate.markdown(f"### Xác suất: **{output['prob']:.2f}**")
+                last_result = result
+
+            # --- Hiển thị kết quả ---
+            if output["frame"] is not None and preview.due():
+                with latency.time("render"):
+                    preview.render(output["frame"])
+            latency.tick()
+
+            if show_latency and time.monotonic() - last_panel_update > 1.0:
+                latency_panel.markdown(latency.to_markdown())
+                last_panel_update = time.monotonic()
+
+            # Nếu người dùng nhấn Dừng thì thoát
+            if stop_button:
+                break
+    finally:
+        # Streamlit dừng script bằng exception khi rerun -> luôn tắt thread và camera
+        pipeline.stop()
+        cap.release()
+        latency_file = os.path.join(LATENCY_LOG_DIR, f"latency_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        latency.dump(latency_file, extra={"throughput": pipeline.stage_stats()})
+
+    if pipeline.error:
+        st.warning(pipeline.error)
+    stage_fps = " | ".join(f"{name}: {s['fps']:.1f} FPS" for name, s in pipeline.stage_stats().items())
+    st.caption(f"Throughput: {stage_fps}")
     st.success("📷 Camera đã tắt.")
 
 # --- SIDEBAR ---
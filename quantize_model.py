@@ -0,0 +1,125 @@
+# quantize_model.py
+"""
+Lượng tử hóa SSTCN_Attention cho CPU và báo cáo độ khớp / tốc độ so với fp32:
+  - int8 dynamic: projection attention tay + fc
+  - int8 static: temporal conv (calibration trên cửa sổ keypoints ghi sẵn)
+  - bf16 autocast (chỉ báo cáo, dùng qua INFERENCE_BACKEND = "bf16")
+
+Cửa sổ ghi sẵn là các file keypoints (T, 75, 3) .npy/.npz, ví dụ data/keypoint_cache.
+Một phần dùng để calibrate, phần còn lại để đánh giá top-1 trùng với fp32.
+Artifact int8 (TorchScript) được lưu ở --output; bật USE_QUANTIZED_MODEL để trang Recognition dùng.
+
+    python quantize_model.py --windows data/keypoint_cache
+    python quantize_model.py --random-weights --no-save
+"""
+import argparse
+import json
+import os
+import time
+
+import torch
+
+from configs.recognition_config import (MODEL_PATH, NUM_CLASSES, SEQ_LEN, NUM_JOINTS,
+                                        QUANTIZED_MODEL_PATH, KEYPOINT_CACHE_DIR, PREDICT_STRIDE)
+from utils.inference_backends import Bf16Backend
+from utils.keypoint_windows import load_windows
+from utils.model_loader import load_model, create_random_model
+from utils.quantization import quantize_model, save_quantized
+
+
+def time_model(model, x, warmup=2, iters=10):
+    with torch.inference_mode():
+        for _ in range(warmup):
+            model(x)
+        t0 = time.perf_counter()
+        for _ in range(iters):
+            model(x)
+    return (time.perf_counter() - t0) / iters
+
+
+def evaluate(model, windows, reference_logits, batch_size=64):
+    """(top-1 trùng với fp32, max|logits lệch|)."""
+    outputs = []
+    with torch.inference_mode():
+        for i in range(0, len(windows), batch_size):
+            outputs.append(model(windows[i:i + batch_size]).float())
+    logits = torch.cat(outputs)
+    agreement = (logits.argmax(dim=1) == reference_logits.argmax(dim=1)).float().mean().item()
+    return agreement, (logits - reference_logits).abs().max().item()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--random-weights", action="store_true")
+    parser.add_argument("--windows", nargs="*", default=[KEYPOINT_CACHE_DIR],
+                        help="File/thư mục keypoints ghi sẵn cho calibration + đánh giá")
+    parser.add_argument("--stride", type=int, default=PREDICT_STRIDE)
+    parser.add_argument("--calib-windows", type=int, default=256)
+    parser.add_argument("--eval-windows", type=int, default=512)
+    parser.add_argument("--no-static", action="store_true", help="Không lượng tử hóa conv (static int8)")
+    parser.add_argument("--no-dynamic", action="store_true", help="Không lượng tử hóa Linear (dynamic int8)")
+    parser.add_argument("--bf16", action="store_true", help="Báo cáo thêm bf16 autocast")
+    parser.add_argument("--output", default=QUANTIZED_MODEL_PATH)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--report", default=None, help="Ghi báo cáo JSON")
+    args = parser.parse_args()
+
+    if args.random_weights or not os.path.exists(args.model):
+        print(f"[quantize] Không dùng {args.model} -> trọng số ngẫu nhiên")
+        model = create_random_model(NUM_CLASSES)
+        source = None
+    else:
+        model = load_model(args.model)
+        source = args.model
+
+    windows = torch.from_numpy(load_windows(args.windows, SEQ_LEN, args.stride,
+                                            max_windows=args.calib_windows + args.eval_windows))
+    if len(windows) < 2:
+        print("[quantize] Không có cửa sổ ghi sẵn -> dùng keypoints ngẫu nhiên (kết quả chỉ mang tính tham khảo)")
+        windows = torch.rand(args.calib_windows + args.eval_windows, 3, SEQ_LEN, NUM_JOINTS)
+    split = min(args.calib_windows, len(windows) // 2)
+    calibration, evaluation = windows[:split], windows[split:]
+    print(f"[quantize] {len(calibration)} cửa sổ calibration, {len(evaluation)} cửa sổ đánh giá")
+
+    variants = {"fp32": model}
+    if not args.no_dynamic:
+        variants["int8-dynamic"] = quantize_model(model, dynamic=True, static=False)
+    if not args.no_static:
+        variants["int8-static"] = quantize_model(model, calibration, dynamic=False, static=True)
+    if not (args.no_dynamic or args.no_static):
+        variants["int8"] = quantize_model(model, calibration, dynamic=True, static=True)
+    if args.bf16:
+        variants["bf16"] = Bf16Backend(model)
+
+    with torch.inference_mode():
+        reference = torch.cat([model(evaluation[i:i + 64]) for i in range(0, len(evaluation), 64)])
+
+    report = {"source": source, "calib_windows": len(calibration), "eval_windows": len(evaluation), "variants": {}}
+    base_ms = {}
+    print(f"{'variant':>13} {'top-1 trùng':>11} {'max|diff|':>10} {'ms@1':>8} {'ms@32':>8} {'speedup@1':>9} {'speedup@32':>10}")
+    for name, variant in variants.items():
+        agreement, max_diff = evaluate(variant, evaluation, reference)
+        ms = {bs: 1e3 * time_model(variant, torch.rand(bs, 3, SEQ_LEN, NUM_JOINTS)) for bs in (1, 32)}
+        if name == "fp32":
+            base_ms = ms
+        speedup = {bs: base_ms[bs] / ms[bs] for bs in ms}
+        report["variants"][name] = {"top1_agreement": agreement, "max_abs_diff": max_diff,
+                                    "ms_batch1": ms[1], "ms_batch32": ms[32],
+                                    "speedup_batch1": speedup[1], "speedup_batch32": speedup[32]}
+        print(f"{name:>13} {agreement:>11.1%} {max_diff:>10.2e} {ms[1]:>8.2f} {ms[32]:>8.2f} "
+              f"{speedup[1]:>8.2f}x {speedup[32]:>9.2f}x")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    saved = next((n for n in ("int8", "int8-static", "int8-dynamic") if n in variants), None)
+    if saved and not args.no_save:
+        save_quantized(variants[saved], args.output, source=source, variant=saved,
+                       top1_agreement=report["variants"][saved]["top1_agreement"])
+        print(f"[quantize] Đã lưu {saved} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 # rag_service.py
+import operator
 import os
 import pickle
 from dotenv import load_dotenv
@@ -13,11 +14,24 @@ from langchain_community.cross_encoders import HuggingFaceCrossEncoder
 from langchain_core.messages import HumanMessage
 from langchain_classic.retrievers.document_compressors import CrossEncoderReranker
 from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langfuse import observe
-from typing import Optional
+from typing import Any, List, Optional
 
 from config import (CHROMA_PATH, DOCS_PATH, MODEL_NAME, 
-                    EMBEDDING_MODEL_NAME, RERANK_MODEL_NAME, RERANK_MODEL, COMPRESSOR)
+                    EMBEDDING_MODEL_NAME, RERANK_MODEL_NAME, RERANK_MODEL, COMPRESSOR,
+                    BM25_INDEX_PATH, USE_BM25_INDEX,
+                    DENSE_INDEX_PATH, USE_DENSE_INDEX, DENSE_INDEX_METRIC,
+                    REWRITE_CACHE_PATH, USE_REWRITE_CACHE, REWRITE_CACHE_TTL, REWRITE_CACHE_MAX_ENTRIES,
+                    REWRITE_CACHE_MAX_STORED,
+                    RETRIEVAL_CACHE_PATH, USE_RETRIEVAL_CACHE, RETRIEVAL_CACHE_TTL, RETRIEVAL_CACHE_MAX_ENTRIES,
+                    RETRIEVAL_CACHE_MAX_STORED,
+                    SIGN_TERMS_PATH, USE_SIGN_TERM_FAST_PATH)
+from utils import dense_index
+from utils.bm25_index import BM25Index, save_index, read_meta, file_fingerprint
+from utils.persistent_cache import PersistentCache, normalize_text, text_hash
+from utils.sign_terms import SignTermIndex, term_document
 # --- CẤU HÌNH (Đã lấy từ config.py gốc) ---
 load_dotenv()
 
@@ -42,14 +56,17 @@ def load_docs(docs_path=DOCS_PATH):
     except FileNotFoundError:
         return []
 
-def load_vectorstore_chroma():
+def get_embeddings():
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL_NAME
+    )
+
+def load_vectorstore_chroma(embeddings=None):
     """Tải database Chroma đã được tạo trước đó."""
     if not os.path.exists(CHROMA_PATH):
         raise FileNotFoundError(f"Vectorstore not found at {CHROMA_PATH}.")
 
-    embeddings = HuggingFaceEmbeddings(
-        model_name=EMBEDDING_MODEL_NAME
-    )
+    embeddings = embeddings or get_embeddings()
 
     db = Chroma(
         persist_directory=CHROMA_PATH,
@@ -58,15 +75,87 @@ def load_vectorstore_chroma():
     )
     return db
 
-def get_retriever(vector_store, documents):
-    """Tạo Hybrid Retriever (Chroma + BM25)."""
-    retriever_dense = vector_store.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": 5}
-    )
+class IndexedBM25Retriever(BaseRetriever):
+    """BM25 trên chỉ mục dựng sẵn (utils/bm25_index.py), kết quả giống BM25Retriever.from_documents."""
+    index: Any
+    k: int = 5
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        doc_ids, _ = self.index.top_k(query, self.k)
+        docs = self.index.documents
+        return [Document(page_content=docs[i]["page_content"], metadata=docs[i]["metadata"], id=docs[i]["id"])
+                for i in doc_ids]
+
+
+def build_bm25_index(index_path=BM25_INDEX_PATH, docs_path=DOCS_PATH):
+    """Dựng chỉ mục BM25 từ file docs (pickle) và ghi ra `index_path`."""
+    documents = [{"id": d.id, "page_content": d.page_content, "metadata": d.metadata}
+                 for d in load_docs(docs_path)]
+    return save_index(index_path, documents, source_fingerprint=file_fingerprint(docs_path))
+
+
+def load_bm25_retriever(index_path=BM25_INDEX_PATH, docs_path=DOCS_PATH, k=5):
+    """Nạp chỉ mục BM25 (memory-map); dựng lại nếu chưa có hoặc file docs đã đổi."""
+    meta = read_meta(index_path)
+    fingerprint = file_fingerprint(docs_path)
+    if meta is None or (fingerprint is not None and meta.get("source_fingerprint") != fingerprint):
+        build_bm25_index(index_path, docs_path)
+    return IndexedBM25Retriever(index=BM25Index(index_path), k=k)
+
+
+class DenseIndexRetriever(BaseRetriever):
+    """Top-k chính xác trên chỉ mục dense NumPy (utils/dense_index.py), thay cho vector_store.as_retriever."""
+    index: Any
+    embeddings: Any
+    k: int = 5
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        doc_ids, _ = self.index.top_k(self.embeddings.embed_query(query), self.k)
+        docs = self.index.documents
+        return [Document(page_content=docs[i]["page_content"], metadata=docs[i]["metadata"], id=docs[i]["id"])
+                for i in doc_ids[0]]
+
+
+def chroma_fingerprint(chroma_path=CHROMA_PATH):
+    return file_fingerprint(os.path.join(chroma_path, "chroma.sqlite3"))
+
 
-    retriever_sparse = BM25Retriever.from_documents(documents)
-    retriever_sparse.k = 5
+def build_dense_index(vector_store, index_path=DENSE_INDEX_PATH, metric=DENSE_INDEX_METRIC):
+    """Xuất embeddings đã lưu trong Chroma (không embed lại) thành chỉ mục dense."""
+    data = vector_store.get(include=["embeddings", "documents", "metadatas"])
+    documents = [{"id": i, "page_content": text, "metadata": meta or {}}
+                 for i, text, meta in zip(data["ids"], data["documents"], data["metadatas"])]
+    return dense_index.save_index(index_path, data["embeddings"], documents, metric=metric,
+                                  source_fingerprint=chroma_fingerprint(), embedding_model=EMBEDDING_MODEL_NAME)
+
+
+def load_dense_retriever(index_path=DENSE_INDEX_PATH, embeddings=None, k=5):
+    """Nạp chỉ mục dense (memory-map); dựng lại từ Chroma nếu chưa có hoặc vectorstore đã đổi."""
+    embeddings = embeddings or get_embeddings()
+    meta = dense_index.read_meta(index_path)
+    fingerprint = chroma_fingerprint()
+    stale = (meta is None or meta.get("embedding_model") != EMBEDDING_MODEL_NAME
+             or (fingerprint is not None and meta.get("source_fingerprint") != fingerprint))
+    if stale:
+        build_dense_index(load_vectorstore_chroma(embeddings), index_path)
+    return DenseIndexRetriever(index=dense_index.DenseIndex(index_path, metric=DENSE_INDEX_METRIC),
+                               embeddings=embeddings, k=k)
+
+
+def get_retriever(vector_store, documents, retriever_sparse=None, retriever_dense=None):
+    """
+    Tạo Hybrid Retriever (Chroma + BM25). `retriever_sparse` có sẵn (chỉ mục dựng sẵn) thì không index lại
+    `documents`; `retriever_dense` có sẵn (chỉ mục dense NumPy) thì không dùng `vector_store`.
+    """
+    if retriever_dense is None:
+        retriever_dense = vector_store.as_retriever(
+            search_type="similarity",
+            search_kwargs={"k": 5}
+        )
+
+    if retriever_sparse is None:
+        retriever_sparse = BM25Retriever.from_documents(documents)
+        retriever_sparse.k = 5
 
     hybrid_retriever = EnsembleRetriever(
         retrievers=[retriever_dense, retriever_sparse],
@@ -74,18 +163,171 @@ def get_retriever(vector_store, documents):
     )
     return retriever_dense, retriever_sparse, hybrid_retriever # Trả về cả 3 cho rõ ràng
 
+class ScoredCrossEncoderReranker(CrossEncoderReranker):
+    """Như CrossEncoderReranker (cùng thứ tự, cùng top_n) nhưng ghi điểm rerank vào metadata["relevance_score"]."""
+
+    def compress_documents(self, documents, query, callbacks=None):
+        scores = self.model.score([(query, doc.page_content) for doc in documents])
+        ranked = sorted(zip(documents, scores), key=operator.itemgetter(1), reverse=True)[: self.top_n]
+        return [Document(page_content=doc.page_content, metadata={**doc.metadata, "relevance_score": float(score)},
+                         id=doc.id)
+                for doc, score in ranked]
+
+
 def rerank_result(ensemble_retriever, compressor=COMPRESSOR):
     """Áp dụng Reranker lên kết quả truy xuất."""
+    if type(compressor) is CrossEncoderReranker:
+        compressor = ScoredCrossEncoderReranker(model=compressor.model, top_n=compressor.top_n)
     compression_retriever = ContextualCompressionRetriever(
         base_compressor=compressor,
         base_retriever=ensemble_retriever
     )
     return compression_retriever
 
-@observe(as_type="generation") # Đánh dấu đây là một bước "Generation" trên Langfuse
+def doc_key(page_content):
+    """Id tài liệu theo nội dung: giống nhau dù tài liệu đến từ Chroma (có id) hay BM25 (id None)."""
+    return text_hash(page_content)
+
+
+class CachedRetriever(BaseRetriever):
+    """
+    Cache kết quả cuối của `base` (id + điểm rerank) theo truy vấn đã chuẩn hóa (normalize_text, như cache
+    viết lại truy vấn): truy vấn lặp lại không gọi embedder, Chroma/BM25 hay cross-encoder.
+    Tài liệu được dựng lại từ `documents` (doc_key -> dict tài liệu); id nào không còn trong corpus thì coi như miss.
+    """
+    base: Any
+    cache: Any
+    version: str
+    documents: dict = {}
+
+    def _resolve(self, entries):
+        docs = []
+        for entry in entries:
+            doc = self.documents.get(entry["id"])
+            if doc is None:
+                return None
+            metadata = dict(doc["metadata"])
+            if entry.get("score") is not None:
+                metadata["relevance_score"] = entry["score"]
+            docs.append(Document(page_content=doc["page_content"], metadata=metadata, id=doc["id"]))
+        return docs
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        key = normalize_text(query)
+        entries = self.cache.get(self.version, key)
+        docs = self._resolve(entries) if entries is not None else None
+        if docs is not None:
+            return docs
+
+        docs = self.base.invoke(query, config={"callbacks": run_manager.get_child()})
+        for doc in docs:
+            self.documents.setdefault(doc_key(doc.page_content), {"id": doc.id, "page_content": doc.page_content,
+                                                                  "metadata": doc.metadata})
+        self.cache.set(self.version, key, [{"id": doc_key(doc.page_content),
+                                            "score": doc.metadata.get("relevance_score")} for doc in docs])
+        return docs
+
+
+def corpus_version():
+    """Hash của vectorstore, file docs và các model quyết định kết quả truy xuất."""
+    return text_hash(chroma_fingerprint(), file_fingerprint(DOCS_PATH), EMBEDDING_MODEL_NAME, RERANK_MODEL_NAME,
+                     getattr(COMPRESSOR, "top_n", None), USE_DENSE_INDEX and DENSE_INDEX_METRIC)
+
+
+_RETRIEVAL_CACHE = None
+
+def get_retrieval_cache():
+    """Cache kết quả truy xuất dùng chung trong process (None nếu tắt)."""
+    global _RETRIEVAL_CACHE
+    if USE_RETRIEVAL_CACHE and _RETRIEVAL_CACHE is None:
+        _RETRIEVAL_CACHE = PersistentCache(RETRIEVAL_CACHE_PATH, table="retrieval_results", ttl=RETRIEVAL_CACHE_TTL,
+                                           max_entries=RETRIEVAL_CACHE_MAX_ENTRIES,
+                                           max_stored=RETRIEVAL_CACHE_MAX_STORED)
+    return _RETRIEVAL_CACHE
+
+def retrieval_cache_stats():
+    """Số hit/miss của cache kết quả truy xuất (cho monitoring)."""
+    cache = get_retrieval_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+def cache_retrieval(retriever, documents=()):
+    """
+    Bọc retriever cuối bằng CachedRetriever. Phiên bản corpus tính lúc khởi tạo;
+    entry của phiên bản cũ (corpus / model đã đổi) bị xóa khỏi SQLite.
+    """
+    cache = get_retrieval_cache()
+    if cache is None:
+        return retriever
+    version = corpus_version()
+    cache.purge(keep_namespace=version)
+    lookup = {}
+    for doc in documents:
+        if isinstance(doc, Document):
+            doc = {"id": doc.id, "page_content": doc.page_content, "metadata": doc.metadata}
+        lookup.setdefault(doc_key(doc["page_content"]), doc)
+    return CachedRetriever(base=retriever, cache=cache, version=version, documents=lookup)
+
+_SIGN_TERM_INDEX = None
+
+def get_sign_term_index():
+    """Chỉ mục thuật ngữ ký hiệu dùng chung trong process (None nếu tắt hoặc thiếu file)."""
+    global _SIGN_TERM_INDEX
+    if USE_SIGN_TERM_FAST_PATH and _SIGN_TERM_INDEX is None and os.path.exists(SIGN_TERMS_PATH):
+        _SIGN_TERM_INDEX = SignTermIndex.load(SIGN_TERMS_PATH)
+    return _SIGN_TERM_INDEX
+
+def match_sign_term(query: str) -> Optional[Document]:
+    """
+    Tài liệu của ký hiệu mà truy vấn gọi tên ("ký hiệu Bác sĩ", "so 5"), cùng nội dung với chunk trong corpus;
+    None nếu không khớp chắc chắn -> đi đường rewrite + retrieval + rerank như cũ.
+    """
+    index = get_sign_term_index()
+    entry = index.match(query) if index is not None else None
+    if entry is None:
+        return None
+    doc = term_document(entry)
+    return Document(page_content=doc["page_content"], metadata=doc["metadata"])
+
+_REWRITE_CACHE = None
+
+def get_rewrite_cache():
+    """Cache viết lại truy vấn dùng chung trong process (None nếu tắt); entry hết hạn bị xóa khi tạo."""
+    global _REWRITE_CACHE
+    if USE_REWRITE_CACHE and _REWRITE_CACHE is None:
+        _REWRITE_CACHE = PersistentCache(REWRITE_CACHE_PATH, table="query_rewrites", ttl=REWRITE_CACHE_TTL,
+                                         max_entries=REWRITE_CACHE_MAX_ENTRIES, max_stored=REWRITE_CACHE_MAX_STORED)
+        _REWRITE_CACHE.purge()
+    return _REWRITE_CACHE
+
+def rewrite_namespace(llm, prompt_template: str):
+    """Namespace cache viết lại: hash prompt template + model (đổi một trong hai là không dùng lại entry cũ)."""
+    return text_hash(prompt_template, getattr(llm, "model", None))
+
+def purge_rewrite_cache(llm, prompt_template: str):
+    """Xóa entry hết hạn và entry của prompt template / model cũ. Trả về số dòng đã xóa."""
+    cache = get_rewrite_cache()
+    return cache.purge(keep_namespace=rewrite_namespace(llm, prompt_template)) if cache is not None else 0
+
+def rewrite_cache_stats():
+    """Số hit/miss của cache viết lại truy vấn (cho monitoring)."""
+    cache = get_rewrite_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
 def rewrite_query(query: str, llm, prompt_template: str):
     """
-    Tối ưu hóa truy vấn người dùng bằng LLM.
+    Tối ưu hóa truy vấn người dùng bằng LLM, có cache: truy vấn giống nhau sau khi chuẩn hóa
+    (NFC, chữ hoa/thường, khoảng trắng) với cùng prompt template + model không gọi lại LLM.
+    """
+    cache = get_rewrite_cache()
+    if cache is None:
+        return _rewrite_query_llm(query, llm, prompt_template)
+    return cache.get_or_compute(rewrite_namespace(llm, prompt_template), normalize_text(query),
+                                lambda: _rewrite_query_llm(query, llm, prompt_template))
+
+@observe(as_type="generation") # Đánh dấu đây là một bước "Generation" trên Langfuse
+def _rewrite_query_llm(query: str, llm, prompt_template: str):
+    """
+    Gọi LLM để tối ưu hóa truy vấn.
     Có tích hợp Langfuse để theo dõi input/output.
     """
     # Nếu prompt chưa format, ta format tại đây
@@ -107,14 +349,18 @@ def initialize_rag_retriever(prompt_template: str):
     try:
         # Load Components
         try: 
-            chroma_db = load_vectorstore_chroma()
-            documents = load_docs()
+            # Chỉ mục dense NumPy: không cần mở Chroma (SQLite + HNSW) khi chỉ mục còn mới
+            retriever_dense = load_dense_retriever() if USE_DENSE_INDEX else None
+            chroma_db = load_vectorstore_chroma() if retriever_dense is None else None
+            # Chỉ mục BM25 dựng sẵn: không cần unpickle + tokenize lại docs mỗi lần start
+            retriever_sparse = load_bm25_retriever() if USE_BM25_INDEX else None
+            documents = [] if retriever_sparse is not None else load_docs()
         except Exception as e:
             raise Exception(f"LỖI khi tải dữ liệu hoặc vectorstore: {e}")
 
         # Build Retriever
         try:
-            _, _, hybrid_retriever = get_retriever(chroma_db, documents)
+            _, _, hybrid_retriever = get_retriever(chroma_db, documents, retriever_sparse, retriever_dense)
         except Exception as e:
             raise Exception(f"LỖI khi xây dựng Retriever: {e}")
         
@@ -123,6 +369,15 @@ def initialize_rag_retriever(prompt_template: str):
             final_retriever = rerank_result(hybrid_retriever, COMPRESSOR)
         except Exception as e:
             raise Exception(f"LỖI khi áp dụng Reranker: {e}")
+
+        # Cache kết quả cuối theo truy vấn (tự vô hiệu khi corpus đổi)
+        try:
+            corpus = retriever_sparse.index.documents if retriever_sparse is not None else documents
+            if retriever_dense is not None:
+                corpus = list(retriever_dense.index.documents) + list(corpus)
+            final_retriever = cache_retrieval(final_retriever, corpus)
+        except Exception as e:
+            raise Exception(f"LỖI khi khởi tạo cache truy xuất: {e}")
         
         # LLM để viết lại query (tạo instance mới cho mỗi lần gọi)
         try :
@@ -130,7 +385,9 @@ def initialize_rag_retriever(prompt_template: str):
         except Exception as e:
             raise Exception(f"LỖI khi khởi tạo LLM cho Query Rewriting: {e}")
 
-        
+        # Dọn cache viết lại: entry hết hạn / của prompt template cũ không bao giờ được dùng lại
+        purge_rewrite_cache(llm_query_rewriter, prompt_template)
+
         return final_retriever, llm_query_rewriter
     
     except FileNotFoundError as e:
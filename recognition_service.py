@@ -0,0 +1,233 @@
+# recognition_service.py
+"""
+Dịch vụ nhận diện ký hiệu từ keypoints (client tự chạy MediaPipe).
+
+- WebSocket /ws/recognize: mỗi message là một cửa sổ keypoints
+    + text JSON: {"keypoints": [[225 số] * T]} (hoặc [T][75][3]), tùy chọn "id"
+    + binary: float32 little-endian, T * 75 * 3 số
+  Server trả về {"id", "pred", "label", "prob", "top_k"} cho từng cửa sổ.
+- POST /recognize: giống WebSocket nhưng một request / một cửa sổ.
+
+Cửa sổ từ mọi session được gom thành một batch SSTCN_Attention theo chính sách
+max-batch / max-wait, nên một máy CPU phục vụ được nhiều người học cùng lúc.
+
+    python recognition_service.py
+"""
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional, Any
+
+import numpy as np
+import torch
+import uvicorn
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel
+
+from configs.recognition_config import (NUM_CLASSES, NUM_JOINTS, DEVICE, SEQ_LEN,
+                                        THRESHOLD, UNKNOWN_CLASS,
+                                        SERVICE_MAX_BATCH, SERVICE_MAX_WAIT_MS, INFERENCE_BACKEND)
+from utils.inference_backends import load_backend
+from utils.model_loader import default_model_path
+from utils.perf_profile import apply_profile, profile_backend
+from utils.sign_dict import SIGN_DICT
+
+# --- LOGGING ---
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TOP_K = 3
+
+
+class MicroBatcher:
+    """
+    Gom các cửa sổ đang chờ thành một forward duy nhất.
+    Batch được chạy khi đủ `max_batch` cửa sổ hoặc cửa sổ đầu tiên đã chờ `max_wait` giây.
+    Forward chạy trong thread riêng để không chặn event loop.
+    """
+
+    def __init__(self, model, max_batch=SERVICE_MAX_BATCH, max_wait_ms=SERVICE_MAX_WAIT_MS,
+                 threshold=THRESHOLD, device=DEVICE):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.threshold = threshold
+        self.device = device
+        self.queue = asyncio.Queue()
+        self._task = None
+        self.num_batches = 0
+        self.num_windows = 0
+        self.infer_time = 0.0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, window):
+        """window: np.float32 [3, T, J]. Trả về dict kết quả khi batch chứa nó chạy xong."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((window, future))
+        return await future
+
+    async def _collect(self):
+        items = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            # Cửa sổ khác độ dài T không stack được -> chia nhóm
+            groups = {}
+            for item in items:
+                groups.setdefault(item[0].shape[1], []).append(item)
+
+            for group in groups.values():
+                windows = np.stack([w for w, _ in group])
+                try:
+                    probs = await loop.run_in_executor(None, self._forward, windows)
+                except Exception as e:
+                    logger.error(f"Lỗi inference: {e}", exc_info=True)
+                    for _, fut in group:
+                        if not fut.done():
+                            fut.set_exception(e)
+                    continue
+                for (_, fut), p in zip(group, probs):
+                    if not fut.done():
+                        fut.set_result(self._format(p))
+
+    def _forward(self, windows):
+        t0 = time.perf_counter()
+        with torch.no_grad():
+            out = self.model(torch.from_numpy(windows).to(self.device))
+            probs = torch.softmax(out, dim=1).cpu().numpy()
+        self.infer_time += time.perf_counter() - t0
+        self.num_batches += 1
+        self.num_windows += len(windows)
+        return probs
+
+    def _format(self, p):
+        top = np.argsort(p)[::-1][:TOP_K]
+        best = int(top[0])
+        pred = best if p[best] >= self.threshold else UNKNOWN_CLASS
+        return {
+            "pred": pred,
+            "label": SIGN_DICT[pred],
+            "prob": float(p[best]) if pred != UNKNOWN_CLASS else 0.0,
+            "top_k": [{"class": int(k), "label": SIGN_DICT[int(k)], "prob": float(p[k])} for k in top],
+        }
+
+    def stats(self):
+        return {
+            "batches": self.num_batches,
+            "windows": self.num_windows,
+            "avg_batch_size": self.num_windows / self.num_batches if self.num_batches else 0.0,
+            "avg_batch_ms": 1000.0 * self.infer_time / self.num_batches if self.num_batches else 0.0,
+            "pending": self.queue.qsize(),
+        }
+
+
+def parse_window(data):
+    """Chuyển keypoints (list lồng nhau hoặc bytes float32) thành [3, T, J] float32."""
+    if isinstance(data, (bytes, bytearray)):
+        arr = np.frombuffer(data, dtype="<f4")
+    else:
+        arr = np.asarray(data, dtype=np.float32)
+    if arr.size == 0 or arr.size % (NUM_JOINTS * 3) != 0:
+        raise ValueError(f"Số phần tử keypoints phải chia hết cho {NUM_JOINTS * 3}")
+    arr = arr.reshape(-1, NUM_JOINTS, 3)
+    if arr.shape[0] > SEQ_LEN:
+        arr = arr[-SEQ_LEN:]  # chỉ giữ SEQ_LEN frame gần nhất
+    return np.ascontiguousarray(arr.transpose(2, 0, 1))
+
+
+# ==========================================
+# SERVER LIFESPAN & API
+# ==========================================
+
+app_state = {}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("--- Khởi động recognition service: load model ---")
+    settings = apply_profile("batch")
+    model = load_backend(default_model_path(), profile_backend(settings, INFERENCE_BACKEND),
+                         num_classes=NUM_CLASSES, device=DEVICE)
+    batcher = MicroBatcher(model, max_batch=settings.get("batch_size", SERVICE_MAX_BATCH))
+    batcher.start()
+    app_state["batcher"] = batcher
+    yield
+    await batcher.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+class RecognizeRequest(BaseModel):
+    keypoints: List[Any]
+    id: Optional[Any] = None
+
+
+@app.post("/recognize")
+async def recognize_endpoint(request: RecognizeRequest):
+    try:
+        window = parse_window(request.keypoints)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = await app_state["batcher"].submit(window)
+    return {"id": request.id, **result}
+
+
+@app.websocket("/ws/recognize")
+async def recognize_ws(websocket: WebSocket):
+    await websocket.accept()
+    batcher = app_state["batcher"]
+    try:
+        while True:
+            message = await websocket.receive()
+            if message.get("type") == "websocket.disconnect":
+                break
+
+            msg_id = None
+            try:
+                if message.get("bytes") is not None:
+                    window = parse_window(message["bytes"])
+                else:
+                    payload = json.loads(message.get("text") or "{}")
+                    msg_id = payload.get("id")
+                    window = parse_window(payload.get("keypoints", []))
+            except (ValueError, json.JSONDecodeError) as e:
+                await websocket.send_json({"id": msg_id, "error": str(e)})
+                continue
+
+            result = await batcher.submit(window)
+            await websocket.send_json({"id": msg_id, **result})
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/stats")
+async def stats_endpoint():
+    return app_state["batcher"].stats()
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="127.0.0.1", port=8001)
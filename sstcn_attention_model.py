@@ -48,40 +48,378 @@ class SSTCN_Attention(nn.Module):
         self.left_hand_joints = list(range(L_HAND_START,L_HAND_END))
         self.right_hand_joints = list(range(R_HAND_START,R_HAND_END))
     
-    def forward(self, x):
-        B, C, T, J = x.shape
-        
-        # --- Spatial conv ---
-        x = x.permute(0,2,1,3).contiguous()  # [B, T, C, J]
-        x = x.view(B*T, C, J)                # [B*T, C, J]
+    def frame_features(self, x):
+        """Phần spatial + attention, độc lập giữa các frame: [N, C, J] -> [N, 128, J]."""
+        N = x.shape[0]
         x = F.relu(self.spatial_bn(self.spatial_conv(x)))
         x = self.spatial_drop(x)
         
         # --- Attention cho joints tay --- 
-        left_hand = x[:,:,self.left_hand_joints]  # [B*T, 64, 21]
+        left_hand = x[:,:,self.left_hand_joints]  # [N, 64, 21]
         left_hand = self.left_hand_attn(left_hand)
         right_hand = x[:,:,self.right_hand_joints]
         right_hand = self.right_hand_attn(right_hand)
 
         # Avoid inplace by clone + scatter
         x_new = x.clone()
-        x_new.scatter_(2, torch.tensor(self.left_hand_joints).view(1,1,-1).to(x.device).expand(B*T,128,-1), left_hand)
-        x_new.scatter_(2, torch.tensor(self.right_hand_joints).view(1,1,-1).to(x.device).expand(B*T,128,-1), right_hand)
-        x = x_new
+        x_new.scatter_(2, torch.tensor(self.left_hand_joints).view(1,1,-1).to(x.device).expand(N,128,-1), left_hand)
+        x_new.scatter_(2, torch.tensor(self.right_hand_joints).view(1,1,-1).to(x.device).expand(N,128,-1), right_hand)
+        return x_new
+
+    def forward(self, x, lengths=None):
+        """
+        x: [B, C, T, J]. `lengths` (tùy chọn, [B]): số frame hợp lệ của từng cửa sổ, nằm ở đầu
+        trục T, phần sau là padding. Kết quả giống forward riêng trên x[i, :, :lengths[i]].
+        """
+        B, C, T, J = x.shape
+        
+        # --- Spatial conv ---
+        x = x.permute(0,2,1,3).contiguous()  # [B, T, C, J]
+        x = x.view(B*T, C, J)                # [B*T, C, J]
+        x = self.frame_features(x)
         
         # --- Khôi phục shape để temporal conv ---
         x = x.view(B, T, 128, J).permute(0,2,1,3)  # [B, 64, T, J]
+        mask = None
+        if lengths is not None:
+            # Padding phải bằng 0 ở mỗi tầng như zero padding của conv trên cửa sổ ngắn
+            mask = length_mask(lengths, T, x.dtype)
+            x = x * mask
         
         # --- Temporal conv ---
         x = F.relu(self.temporal_bn1(self.temporal_conv1(x)))
         x = self.temporal_drop1(x)
+        if mask is not None:
+            x = x * mask
         x = F.relu(self.temporal_bn2(self.temporal_conv2(x)))
         x = self.temporal_drop2(x)
         
         # Global average pooling (temporal + joints)
-        x = x.mean(dim=2).mean(dim=2)  # [B, 256]
+        if mask is not None:
+            x = (x * mask).sum(dim=(2, 3)) / (lengths.view(B, 1).to(x.dtype) * J)
+        else:
+            x = x.mean(dim=2).mean(dim=2)  # [B, 256]
         
         # Classifier
         x = self.fc_drop(x)
         out = self.fc(x)  # [B, num_classes]
-        return out
\ No newline at end of file
+        return out
+
+
+def length_mask(lengths, T, dtype=torch.float32):
+    """Mask [B, 1, T, 1]: 1 cho frame t < lengths[b], 0 cho padding."""
+    lengths = torch.as_tensor(lengths)
+    return (torch.arange(T, device=lengths.device) < lengths.view(-1, 1)).to(dtype).view(-1, 1, T, 1)
+
+
+# (conv, BN ngay sau nó) và các dropout, dùng khi fuse model cho suy luận
+FUSED_CONV_BN = (("spatial_conv", "spatial_bn"),
+                 ("temporal_conv1", "temporal_bn1"),
+                 ("temporal_conv2", "temporal_bn2"))
+DROPOUT_MODULES = ("spatial_drop", "temporal_drop1", "temporal_drop2", "fc_drop")
+
+
+def bn_affine(bn):
+    """(scale, shift) theo kênh của BN ở eval; None nếu BN đã được gộp (nn.Identity)."""
+    if not isinstance(bn, nn.modules.batchnorm._BatchNorm):
+        return None
+    scale = bn.weight * torch.rsqrt(bn.running_var + bn.eps)
+    return scale, bn.bias - bn.running_mean * scale
+
+
+def fold_batchnorm(conv, bn):
+    """Trọng số, bias của conv sau khi gộp BN (eval) vào: bn(conv(x)) == conv'(x)."""
+    scale, shift = bn_affine(bn)
+    weight = conv.weight * scale.view(-1, *([1] * (conv.weight.dim() - 1)))
+    bias = conv.bias * scale + shift if conv.bias is not None else shift
+    return weight, bias
+
+
+class SSTCN_AttentionInference(SSTCN_Attention):
+    """
+    Bản SSTCN_Attention tối ưu cho suy luận (eval), nạp được cùng `model_state_dict`:
+      - chỉ số joints tay là buffer, không tạo tensor mỗi lần forward
+        (tay trái + phải liền nhau nên lấy bằng slice view, không copy)
+      - spatial conv (kernel 1) tính bằng matmul theo layout [N, J, E] mà attention cần
+      - attention tay trái và tay phải gộp thành một lần tính batched
+        (trọng số hai nhánh được stack sẵn)
+      - ghi kết quả attention thẳng vào tensor đặc trưng, không clone + scatter
+      - temporal conv chạy ở layout channels-last, BN + ReLU in-place, pool một lần
+      - fuse(): gộp BN vào conv và bỏ dropout, lưu thành checkpoint riêng
+      - presence_aware: frame không có tay trái/phải thì thay attention bằng hằng số tương đương
+    Ở chế độ train dùng lại đường tính của SSTCN_Attention.
+    """
+
+    def __init__(self, num_classes, num_joints=75, in_channels=3, dropout=0.3):
+        super().__init__(num_classes, num_joints, in_channels, dropout)
+        hand_joints = self.left_hand_joints + self.right_hand_joints
+        self.register_buffer("hand_joints", torch.tensor(hand_joints), persistent=False)
+        if hand_joints != list(range(hand_joints[0], hand_joints[-1] + 1)):
+            raise ValueError("SSTCN_AttentionInference cần joints tay trái + phải liên tiếp")
+        self.hand_slice = slice(hand_joints[0], hand_joints[-1] + 1)
+        self.num_heads = self.left_hand_attn.attn.num_heads
+        self.fused = False
+        # Bỏ qua attention của tay vắng mặt (joints = 0); tắt khi trace/export đồ thị tĩnh
+        self.presence_aware = True
+        self.register_load_state_dict_post_hook(lambda module, _: module.refresh_hand_weights())
+        self.refresh_hand_weights()
+
+    @torch.no_grad()
+    def refresh_hand_weights(self):
+        """Stack trọng số attention của hai tay (gọi lại nếu sửa trọng số thủ công)."""
+        attns = (self.left_hand_attn.attn, self.right_hand_attn.attn)
+        self._in_w = torch.stack([a.in_proj_weight.t() for a in attns]).contiguous()   # [2, E, 3E]
+        self._in_b = torch.stack([a.in_proj_bias for a in attns]).unsqueeze(1)         # [2, 1, 3E]
+        self._out_w = torch.stack([a.out_proj.weight.t() for a in attns]).contiguous() # [2, E, E]
+        self._out_b = torch.stack([a.out_proj.bias for a in attns]).unsqueeze(1)       # [2, 1, E]
+
+    def _apply(self, fn, *args, **kwargs):
+        # Giữ trọng số đã stack cùng device/dtype khi .to()/.half()
+        module = super()._apply(fn, *args, **kwargs)
+        self.refresh_hand_weights()
+        return module
+
+    def _attention(self, tokens, in_w, in_b, out_w, out_b):
+        """Self-attention nhiều head cho G nhóm token [G, M, K, E] với trọng số riêng từng nhóm -> [G, M, K, E]."""
+        G, M, K, E = tokens.shape
+        H = self.num_heads
+        d = E // H
+        qkv = torch.baddbmm(in_b, tokens.reshape(G, M * K, E), in_w)          # [G, M*K, 3E]
+        q, k, v = qkv.view(G * M, K, 3, H, d).permute(2, 0, 3, 1, 4).unbind(0)  # [G*M, H, K, d]
+        attn = torch.matmul(q, k.transpose(-1, -2)).mul_(d ** -0.5).softmax(dim=-1)
+        out = torch.matmul(attn, v)                                            # [G*M, H, K, d]
+        out = out.transpose(1, 2).reshape(G, M * K, E)
+        out = torch.baddbmm(out_b, out, out_w)                                 # [G, M*K, E]
+        return out.view(G, M, K, E)
+
+    def hand_attention(self, tokens):
+        """tokens: [N, 2*21, E] (tay trái rồi tay phải) -> [N, 2*21, E]."""
+        N, K2, E = tokens.shape
+        # [2, N, 21, E]: mỗi tay một nhóm với trọng số riêng
+        tokens = tokens.reshape(N, 2, K2 // 2, E).transpose(0, 1)
+        out = self._attention(tokens, self._in_w, self._in_b, self._out_w, self._out_b)
+        return out.transpose(0, 1).reshape(N, K2, E)
+
+    def _presence_hand_attention(self, x, y, bias):
+        """
+        Attention tay có xét tay vắng mặt (eval, no_grad), ghi thẳng vào y [N, J, E].
+        Tay vắng mặt ở một frame có 21 joint = 0 nên mọi token bằng c = relu(bias):
+        softmax đều, output attention là hằng số out_proj(v_proj(c)) -> không cần tính attention.
+        """
+        hs = self.hand_slice
+        N, C = x.shape[:2]
+        K = (hs.stop - hs.start) // 2
+        present = x[:, :, hs].reshape(N, C, 2, K).ne(0).any(dim=3).any(dim=1)  # [N, 2]
+        if bool(present.all()):
+            y[:, hs] = self.hand_attention(y[:, hs])
+            return
+        E = y.shape[2]
+        c = F.relu(bias)
+        for h in range(2):
+            cols = slice(hs.start + h * K, hs.start + (h + 1) * K)
+            rows = present[:, h].nonzero().squeeze(1)
+            out = None
+            if len(rows):
+                group = slice(h, h + 1)
+                out = self._attention(y[rows, cols].unsqueeze(0), self._in_w[group], self._in_b[group],
+                                      self._out_w[group], self._out_b[group])[0]
+            if len(rows) < N:
+                v = torch.addmm(self._in_b[h, :, 2 * E:], c.unsqueeze(0), self._in_w[h, :, 2 * E:])
+                y[:, cols] = torch.addmm(self._out_b[h], v, self._out_w[h])
+            if out is not None:
+                y[rows, cols] = out
+
+    def frame_features(self, x):
+        if self.training:
+            return super().frame_features(x)
+        N, C, J = x.shape
+        # Conv1d kernel 1 == matmul theo kênh; BN eval là affine theo kênh
+        weight, bias = self.spatial_conv.weight.view(-1, C), self.spatial_conv.bias
+        affine = bn_affine(self.spatial_bn)
+        if affine is not None:
+            scale, shift = affine
+            weight = weight * scale.unsqueeze(1)
+            bias = bias * scale + shift
+        y = torch.addmm(bias, x.transpose(1, 2).reshape(N * J, C), weight.t())
+        y = F.relu(y).view(N, J, -1)                                           # [N, J, E]
+
+        if torch.is_grad_enabled():
+            hands = self.hand_attention(y[:, self.hand_slice])
+            y = torch.cat([y[:, :self.hand_slice.start], hands, y[:, self.hand_slice.stop:]], dim=1)
+        elif self.presence_aware:
+            self._presence_hand_attention(x, y, bias)
+        else:
+            y[:, self.hand_slice] = self.hand_attention(y[:, self.hand_slice])
+        # [N, J, E] -> [N, E, J] (view, layout channels-last cho temporal conv)
+        return y.transpose(1, 2)
+
+    @staticmethod
+    def _conv_bn_relu(x, conv, bn):
+        y = conv(x)
+        if torch.is_grad_enabled():
+            return F.relu(bn(y))
+        # BN eval = affine theo kênh, tính in-place trên output của conv
+        affine = bn_affine(bn)
+        if affine is not None:
+            scale, shift = affine
+            y.mul_(scale.view(1, -1, 1, 1)).add_(shift.view(1, -1, 1, 1))
+        return y.relu_()
+
+    @torch.no_grad()
+    def fuse(self, fold=True):
+        """
+        "Đóng băng" cho suy luận: gộp mỗi BN vào conv đứng trước, thay BN và dropout
+        bằng nn.Identity rồi chuyển sang eval. `fold=False` chỉ đổi cấu trúc
+        (dùng trước khi nạp state_dict đã fuse).
+        """
+        for conv_name, bn_name in FUSED_CONV_BN:
+            conv, bn = getattr(self, conv_name), getattr(self, bn_name)
+            if fold and isinstance(bn, nn.modules.batchnorm._BatchNorm):
+                weight, bias = fold_batchnorm(conv, bn)
+                conv.weight.copy_(weight)
+                conv.bias.copy_(bias)
+            setattr(self, bn_name, nn.Identity())
+        for name in DROPOUT_MODULES:
+            setattr(self, name, nn.Identity())
+        self.fused = True
+        return self.eval()
+
+    def forward(self, x, lengths=None):
+        if self.training:
+            return super().forward(x, lengths)
+        B, C, T, J = x.shape
+        x = x.permute(0, 2, 1, 3).reshape(B * T, C, J)
+        x = self.frame_features(x)
+        # [B, 128, T, J] ở layout channels-last (không copy), conv2d CPU chạy nhanh hơn NCHW
+        x = x.view(B, T, -1, J).permute(0, 2, 1, 3)
+        mask = None
+        if lengths is not None:
+            mask = length_mask(lengths, T, x.dtype)
+            x = x * mask
+        x = self._conv_bn_relu(x, self.temporal_conv1, self.temporal_bn1)
+        if mask is not None:
+            x = x * mask
+        x = self._conv_bn_relu(x, self.temporal_conv2, self.temporal_bn2)
+        if mask is not None:
+            return self.fc((x * mask).sum(dim=(2, 3)) / (lengths.view(B, 1).to(x.dtype) * J))
+        # Pool một lần trên (T, J): với channels-last nhanh hơn nhiều so với mean hai lần
+        return self.fc(x.mean(dim=(2, 3)))
+
+
+class SSTCNStream:
+    """
+    Suy luận tăng dần (streaming) cho SSTCN_Attention ở chế độ eval.
+
+    Phần spatial + attention chỉ phụ thuộc từng frame nên mỗi frame chỉ tính một lần.
+    Temporal conv có kernel 3, nên với cửa sổ [s, e]:
+      - h1[i] (sau conv1) với s < i < e chỉ phụ thuộc f[i-1..i+1] -> cache theo frame
+      - h2[i] (sau conv2) với s+2 <= i <= e-2 chỉ dùng h1 "bên trong" -> cache luôn
+        giá trị đã pool theo joints
+    Mỗi bước chỉ tính lại 2 vị trí h1 ở biên (zero padding) và 4 vị trí h2 ở biên,
+    kết quả bằng forward() trên cùng cửa sổ (kể cả cửa sổ chưa đủ seq_len frame).
+    """
+
+    def __init__(self, model, seq_len=30, batch_size=1):
+        if model.training:
+            raise ValueError("SSTCNStream cần model ở chế độ eval()")
+        self.model = model
+        self.seq_len = seq_len
+        self.batch_size = batch_size
+        p = next(model.parameters())
+        B, S, J = batch_size, seq_len, R_HAND_END
+        # Ring buffer theo chỉ số frame tuyệt đối (idx % seq_len)
+        self.f = p.new_zeros(S, B, 128, J)    # đặc trưng từng frame
+        self.h1 = p.new_zeros(S, B, 256, J)   # conv1 "bên trong" tại frame i
+        self.p2 = p.new_zeros(S, B, 512)      # conv2 "bên trong" đã mean theo joints
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+
+    @property
+    def window_len(self):
+        return min(self.count, self.seq_len)
+
+    def _conv1(self, x):
+        """x: [P, B, 128, 3, J] (3 frame liên tiếp) -> [P, B, 256, J]."""
+        m = self.model
+        P, B = x.shape[:2]
+        y = F.conv2d(x.reshape(P * B, 128, 3, -1), m.temporal_conv1.weight, m.temporal_conv1.bias)
+        y = F.relu(m.temporal_bn1(y))
+        return y.view(P, B, 256, -1)
+
+    def _conv2_pooled(self, x):
+        """x: [P, B, 256, 3, J] -> mean theo joints [P, B, 512]."""
+        m = self.model
+        P, B = x.shape[:2]
+        y = F.conv2d(x.reshape(P * B, 256, 3, -1), m.temporal_conv2.weight, m.temporal_conv2.bias)
+        y = F.relu(m.temporal_bn2(y))
+        return y.mean(dim=(2, 3)).view(P, B, 512)
+
+    @torch.no_grad()
+    def push(self, frame):
+        """Thêm một frame keypoints [B, C, J] (hoặc [C, J] khi batch_size=1)."""
+        if frame.dim() == 2:
+            frame = frame.unsqueeze(0)
+        S, i = self.seq_len, self.count
+        self.f[i % S] = self.model.frame_features(frame)
+
+        # h1 bên trong tại i-1: cần f[i-2], f[i-1], f[i]
+        if i >= 2:
+            x = torch.stack([self.f[(i - 2) % S], self.f[(i - 1) % S], self.f[i % S]], dim=2)
+            self.h1[(i - 1) % S] = self._conv1(x.unsqueeze(0))[0]
+        # h2 bên trong tại i-2: cần h1 bên trong tại i-3, i-2, i-1
+        if i >= 4:
+            x = torch.stack([self.h1[(i - 3) % S], self.h1[(i - 2) % S], self.h1[(i - 1) % S]], dim=2)
+            self.p2[(i - 2) % S] = self._conv2_pooled(x.unsqueeze(0))[0]
+        self.count += 1
+
+    @torch.no_grad()
+    def logits(self):
+        """Logits [B, num_classes] trên cửa sổ hiện tại (tối đa seq_len frame gần nhất)."""
+        if self.count == 0:
+            raise RuntimeError("Chưa có frame nào trong stream")
+        m, S = self.model, self.seq_len
+        L = self.window_len
+        e = self.count - 1
+        s = e - L + 1
+
+        if L < 5:
+            # Cửa sổ quá ngắn để tách biên / bên trong -> chạy temporal đầy đủ
+            idx = [k % S for k in range(s, e + 1)]
+            x = self.f[idx].permute(1, 2, 0, 3)  # [B, 128, L, J]
+            x = F.relu(m.temporal_bn1(m.temporal_conv1(x)))
+            x = F.relu(m.temporal_bn2(m.temporal_conv2(x)))
+            return m.fc(x.mean(dim=2).mean(dim=2))
+
+        f = lambda k: self.f[k % S]
+        h1 = lambda k: self.h1[k % S]
+        zf = torch.zeros_like(self.f[0])
+
+        # h1 ở hai biên (zero padding ngoài cửa sổ)
+        h1_edges = self._conv1(torch.stack([
+            torch.stack([zf, f(s), f(s + 1)], dim=2),
+            torch.stack([f(e - 1), f(e), zf], dim=2),
+        ]))
+        h1_s, h1_e = h1_edges[0], h1_edges[1]
+        zh = torch.zeros_like(h1_s)
+
+        # h2 tại s, s+1, e-1, e
+        p2_edges = self._conv2_pooled(torch.stack([
+            torch.stack([zh, h1_s, h1(s + 1)], dim=2),
+            torch.stack([h1_s, h1(s + 1), h1(s + 2)], dim=2),
+            torch.stack([h1(e - 2), h1(e - 1), h1_e], dim=2),
+            torch.stack([h1(e - 1), h1_e, zh], dim=2),
+        ]))
+
+        # h2 bên trong s+2..e-2 đã cache
+        inner = [k % S for k in range(s + 2, e - 1)]
+        pooled = p2_edges.sum(dim=0)
+        if inner:
+            pooled = pooled + self.p2[inner].sum(dim=0)
+        return m.fc(pooled / L)
+
+    def step(self, frame):
+        """push() + logits()."""
+        self.push(frame)
+        return self.logits()
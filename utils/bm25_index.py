@@ -0,0 +1,163 @@
+# utils/bm25_index.py
+"""
+Chỉ mục BM25 (Okapi) dựng sẵn, lưu thành mảng NumPy cạnh vectorstore và memory-map lúc khởi động,
+thay cho BM25Retriever.from_documents (tokenize + index lại toàn bộ corpus mỗi lần start).
+
+Thư mục chỉ mục:
+    meta.json          tham số k1, b, epsilon, avgdl, số tài liệu, fingerprint file docs nguồn
+    vocab.json         danh sách term (term id = vị trí)
+    docs.json          [{"id", "page_content", "metadata"}] theo thứ tự tài liệu
+    postings_ptr.npy   int64 [V + 1]: postings của term t là [ptr[t], ptr[t+1]) (CSR)
+    postings_doc.npy   int32 [nnz]: doc id
+    postings_tf.npy    int32 [nnz]: số lần term xuất hiện trong doc
+    idf.npy            float64 [V]
+    norm.npy           float64 [N]: k1 * (1 - b + b * doc_len / avgdl)
+
+Công thức, tokenizer (str.split) và thứ tự top-k giống rank_bm25.BM25Okapi mà BM25Retriever dùng,
+nên kết quả trùng với BM25Retriever.from_documents trên cùng tài liệu.
+"""
+import hashlib
+import json
+import math
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+BM25_FORMAT = "bm25_okapi"
+BM25_FORMAT_VERSION = 1
+ARRAYS = ("postings_ptr", "postings_doc", "postings_tf", "idf", "norm")
+
+
+def tokenize(text):
+    """Giống default_preprocessing_func của BM25Retriever."""
+    return text.split()
+
+
+def file_fingerprint(path):
+    """sha256 nội dung file (None nếu không có file)."""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_index(texts, k1=1.5, b=0.75, epsilon=0.25):
+    """(dict mảng, vocab, meta) cho danh sách văn bản."""
+    vocab, postings = {}, []
+    doc_len = np.zeros(len(texts), dtype=np.int64)
+    for doc_id, text in enumerate(texts):
+        tokens = tokenize(text)
+        doc_len[doc_id] = len(tokens)
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            term_id = vocab.setdefault(token, len(vocab))
+            if term_id == len(postings):
+                postings.append([])
+            postings[term_id].append((doc_id, tf))
+
+    N = len(texts)
+    avgdl = float(doc_len.sum()) / N if N else 0.0
+    # IDF như BM25Okapi: term có idf âm (xuất hiện ở hơn nửa corpus) lấy epsilon * idf trung bình
+    idf = np.array([math.log(N - len(p) + 0.5) - math.log(len(p) + 0.5) for p in postings], dtype=np.float64)
+    if len(idf):
+        idf[idf < 0] = epsilon * (sum(idf.tolist()) / len(idf))
+
+    ptr = np.zeros(len(postings) + 1, dtype=np.int64)
+    ptr[1:] = np.cumsum([len(p) for p in postings])
+    flat = [pair for p in postings for pair in p]
+    arrays = {
+        "postings_ptr": ptr,
+        "postings_doc": np.array([d for d, _ in flat], dtype=np.int32),
+        "postings_tf": np.array([tf for _, tf in flat], dtype=np.int32),
+        "idf": idf,
+        # Cùng thứ tự phép tính với BM25Okapi.get_scores để điểm trùng tới từng bit
+        "norm": k1 * (1 - b + b * doc_len / avgdl) if N else np.zeros(0),
+    }
+    meta = {"k1": k1, "b": b, "epsilon": epsilon, "avgdl": avgdl, "num_docs": N, "num_terms": len(vocab)}
+    return arrays, list(vocab), meta
+
+
+def save_index(path, documents, source_fingerprint=None, **params):
+    """
+    Dựng và ghi chỉ mục cho `documents` (dict {"id", "page_content", "metadata"}) vào thư mục `path`.
+    Ghi vào thư mục tạm rồi đổi tên, process khác không bao giờ đọc phải chỉ mục ghi dở.
+    """
+    arrays, vocab, meta = build_index([d["page_content"] for d in documents], **params)
+    meta.update({"format": BM25_FORMAT, "version": BM25_FORMAT_VERSION, "tokenizer": "whitespace",
+                 "source_fingerprint": source_fingerprint})
+
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    os.makedirs(tmp_path)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+    for name, value in (("vocab", vocab), ("docs", documents), ("meta", meta)):
+        with open(os.path.join(tmp_path, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+    old_path = None
+    if os.path.exists(path):
+        old_path = f"{path}.{uuid.uuid4().hex}.old"
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if old_path:
+        shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+
+def read_meta(path):
+    """meta.json của chỉ mục, None nếu chưa có / không đọc được."""
+    try:
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format") == BM25_FORMAT else None
+
+
+class BM25Index:
+    """Chỉ mục đã nạp: mảng postings/idf/norm là memory-map chỉ đọc."""
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = read_meta(path)
+        if self.meta is None:
+            raise FileNotFoundError(f"Không có chỉ mục BM25 hợp lệ tại {path}")
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+        with open(os.path.join(path, "vocab.json"), encoding="utf-8") as f:
+            self.term_ids = {term: i for i, term in enumerate(json.load(f))}
+        with open(os.path.join(path, "docs.json"), encoding="utf-8") as f:
+            self.documents = json.load(f)
+        self.k1 = self.meta["k1"]
+
+    def __len__(self):
+        return self.meta["num_docs"]
+
+    def scores(self, query):
+        """Điểm BM25 [N] của mọi tài liệu; chỉ duyệt postings của các term trong truy vấn."""
+        scores = np.zeros(len(self), dtype=np.float64)
+        # Term lặp lại trong truy vấn được cộng nhiều lần, term lạ đóng góp 0 (như BM25Okapi)
+        for token in tokenize(query):
+            term_id = self.term_ids.get(token)
+            if term_id is None:
+                continue
+            begin, end = self.postings_ptr[term_id], self.postings_ptr[term_id + 1]
+            docs = self.postings_doc[begin:end]
+            tf = self.postings_tf[begin:end].astype(np.float64)
+            # doc id trong một postings là duy nhất nên cộng theo chỉ số không bị trùng
+            scores[docs] += self.idf[term_id] * (tf * (self.k1 + 1) / (tf + self.norm[docs]))
+        return scores
+
+    def top_k(self, query, k=5):
+        """(doc ids, điểm) của k tài liệu tốt nhất, cùng thứ tự (kể cả khi hòa điểm) với BM25Okapi.get_top_n."""
+        scores = self.scores(query)
+        top = np.argsort(scores)[::-1][:k]
+        return top, scores[top]
@@ -0,0 +1,107 @@
+# utils/dense_index.py
+"""
+Chỉ mục dense trong process cho corpus nhỏ (vài trăm tài liệu), thay cho vòng Chroma (SQLite + HNSW):
+top-k chính xác bằng một phép nhân ma trận.
+
+Thư mục chỉ mục:
+    meta.json        metric, số chiều, model embedding, số tài liệu, fingerprint nguồn
+    embeddings.npy   float32 [N, D]: embedding đã chuẩn hóa (norm 1), memory-map khi nạp
+    norms.npy        float32 [N]: norm gốc của từng embedding
+    docs.json        [{"id", "page_content", "metadata"}] theo thứ tự hàng
+
+Metric:
+  - "l2": như collection Chroma (space l2): argmin |q - x|^2 = argmax 2 q.x - |x|^2,
+    với q.x = norms * (x_hat . q) -> cùng thứ tự kết quả với Chroma (HNSW của Chroma là xấp xỉ)
+  - "cosine": argmax x_hat . q_hat
+"""
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+DENSE_FORMAT = "dense_exact"
+DENSE_FORMAT_VERSION = 1
+METRICS = ("l2", "cosine")
+
+
+def save_index(path, embeddings, documents, metric="l2", source_fingerprint=None, embedding_model=None):
+    """Ghi embeddings [N, D] (chưa chuẩn hóa) + tài liệu vào thư mục `path` (thư mục tạm rồi đổi tên)."""
+    if metric not in METRICS:
+        raise ValueError(f"metric phải là một trong {METRICS}")
+    embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(documents), -1)
+    norms = np.linalg.norm(embeddings, axis=1).astype(np.float32)
+    normalized = embeddings / np.maximum(norms, np.finfo(np.float32).tiny)[:, None]
+    meta = {"format": DENSE_FORMAT, "version": DENSE_FORMAT_VERSION, "metric": metric,
+            "dim": embeddings.shape[1], "num_docs": len(documents), "embedding_model": embedding_model,
+            "source_fingerprint": source_fingerprint}
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, "embeddings.npy"), np.ascontiguousarray(normalized))
+    np.save(os.path.join(tmp_path, "norms.npy"), norms)
+    for name, value in (("docs", documents), ("meta", meta)):
+        with open(os.path.join(tmp_path, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+    old_path = None
+    if os.path.exists(path):
+        old_path = f"{path}.{uuid.uuid4().hex}.old"
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if old_path:
+        shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+
+def read_meta(path):
+    """meta.json của chỉ mục, None nếu chưa có / không đọc được."""
+    try:
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format") == DENSE_FORMAT else None
+
+
+class DenseIndex:
+    """Chỉ mục đã nạp: ma trận embedding là memory-map chỉ đọc."""
+
+    def __init__(self, path, metric=None):
+        self.path = path
+        self.meta = read_meta(path)
+        if self.meta is None:
+            raise FileNotFoundError(f"Không có chỉ mục dense hợp lệ tại {path}")
+        self.metric = metric or self.meta["metric"]
+        if self.metric not in METRICS:
+            raise ValueError(f"metric phải là một trong {METRICS}")
+        self.embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        self.norms = np.load(os.path.join(path, "norms.npy"))
+        self._sq_norms = self.norms.astype(np.float32) ** 2
+        with open(os.path.join(path, "docs.json"), encoding="utf-8") as f:
+            self.documents = json.load(f)
+
+    def __len__(self):
+        return self.meta["num_docs"]
+
+    def scores(self, queries):
+        """queries [Q, D] (hoặc [D]) -> điểm [Q, N], càng lớn càng gần."""
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        dots = q @ self.embeddings.T                                            # x_hat . q
+        if self.metric == "cosine":
+            return dots / np.maximum(np.linalg.norm(q, axis=1, keepdims=True), np.finfo(np.float32).tiny)
+        # -|q - x|^2 + |q|^2 = 2 q.x - |x|^2 (bỏ |q|^2 không đổi thứ tự)
+        return 2 * self.norms * dots - self._sq_norms
+
+    def top_k(self, queries, k=5):
+        """(chỉ số [Q, k], điểm [Q, k]) sắp giảm dần; argpartition rồi chỉ sắp k phần tử."""
+        scores = self.scores(queries)
+        k = min(k, scores.shape[1])
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), (len(scores), k))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
@@ -0,0 +1,134 @@
+# utils/frame_sources.py
+"""
+Các nguồn frame dùng chung một interface giống cv2.VideoCapture: read() -> (ret, frame), release().
+
+- WebcamSource: camera (nguồn live)
+- VideoFileSource: file video
+- ImageDirSource: thư mục ảnh (sắp xếp theo tên)
+- KeypointFileSource: keypoints ghi sẵn (T, 75, 3) .npy/.npz, read() trả về keypoints (75, 3)
+  nên pipeline bỏ qua MediaPipe
+
+Nguồn không live (`is_live=False`) báo hết dữ liệu bằng ret=False để pipeline dừng.
+"""
+import os
+import time
+
+import cv2
+
+from utils.keypoint_windows import KEYPOINT_EXTS, load_keypoint_file
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class FrameSource:
+    is_live = False
+    provides_keypoints = False
+
+    def read(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class _Pacer:
+    """Giữ nhịp `fps` khi phát lại file như camera thật (fps=None: nhanh nhất có thể)."""
+
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps else 0.0
+        self._next = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.perf_counter()
+        if self._next is not None and self._next > now:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+class WebcamSource(FrameSource):
+    is_live = True
+
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path, realtime=False):
+        self.path = path
+        self.cap = cv2.VideoCapture(str(path))
+        if not self.cap.isOpened():
+            raise IOError(f"Không mở được video: {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._pacer = _Pacer(self.fps if realtime else None)
+
+    def read(self):
+        self._pacer.wait()
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource(FrameSource):
+    def __init__(self, path, fps=None):
+        self.files = sorted(os.path.join(path, f) for f in os.listdir(path)
+                            if f.lower().endswith(IMAGE_EXTS))
+        if not self.files:
+            raise IOError(f"Không có ảnh trong thư mục: {path}")
+        self._index = 0
+        self._pacer = _Pacer(fps)
+
+    def read(self):
+        if self._index >= len(self.files):
+            return False, None
+        self._pacer.wait()
+        frame = cv2.imread(self.files[self._index])
+        self._index += 1
+        return frame is not None, frame
+
+
+class KeypointFileSource(FrameSource):
+    provides_keypoints = True
+
+    def __init__(self, path, fps=None, key="keypoints"):
+        self.keypoints = load_keypoint_file(path, key)
+        self._index = 0
+        self._pacer = _Pacer(fps)
+
+    def read(self):
+        if self._index >= len(self.keypoints):
+            return False, None
+        self._pacer.wait()
+        keypoints = self.keypoints[self._index]
+        self._index += 1
+        return True, keypoints
+
+
+def open_source(spec, realtime=False, fps=None):
+    """
+    Tạo nguồn từ chuỗi cấu hình: số ("0") -> webcam, thư mục -> ảnh,
+    .npy/.npz -> keypoints, còn lại -> file video.
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return WebcamSource(int(spec))
+    spec = str(spec)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, fps=fps)
+    if spec.lower().endswith(KEYPOINT_EXTS):
+        return KeypointFileSource(spec, fps=fps)
+    return VideoFileSource(spec, realtime=realtime)
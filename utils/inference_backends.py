@@ -0,0 +1,164 @@
+# utils/inference_backends.py
+"""
+Các backend suy luận cho SSTCN_Attention, dùng chung một interface:
+    backend(x) với x: torch.Tensor [B, 3, T, J] -> logits torch.Tensor [B, num_classes]
+
+- "eager": chạy nn.Module trực tiếp (hỗ trợ suy luận tăng dần SSTCNStream)
+- "torchscript": torch.jit.trace + torch.jit.freeze
+- "onnx": export ONNX (batch, T động) rồi chạy bằng onnxruntime CPUExecutionProvider
+- "bf16": eager dưới torch.autocast bfloat16 (CPU có AVX512-BF16/AMX mới nhanh hơn)
+
+Chọn backend bằng INFERENCE_BACKEND trong configs/recognition_config.py.
+Artifact int8 (xem utils/quantization.py) luôn chạy bằng QuantizedBackend, bất kể backend đã chọn.
+"""
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import torch
+
+from configs.recognition_config import (NUM_CLASSES, SEQ_LEN, NUM_JOINTS, DEVICE,
+                                        INFERENCE_BACKEND, ONNX_MODEL_PATH, ONNX_OPSET)
+from utils.model_loader import load_model
+from utils.quantization import is_quantized_artifact, load_quantized
+
+BACKENDS = ("eager", "torchscript", "onnx", "bf16")
+
+
+@contextmanager
+def _static_graph(model):
+    """Tắt nhánh phụ thuộc dữ liệu (presence_aware) trong lúc trace/export đồ thị tĩnh."""
+    presence_aware = getattr(model, "presence_aware", None)
+    if presence_aware is not None:
+        model.presence_aware = False
+    try:
+        yield model
+    finally:
+        if presence_aware is not None:
+            model.presence_aware = presence_aware
+
+
+class InferenceBackend:
+    name = None
+    # nn.Module gốc nếu backend chạy trực tiếp trên PyTorch eager, ngược lại None
+    module = None
+
+    def __call__(self, x):
+        raise NotImplementedError
+
+    def eval(self):
+        return self
+
+
+class EagerBackend(InferenceBackend):
+    name = "eager"
+
+    def __init__(self, model):
+        self.module = model.eval()
+
+    def __call__(self, x):
+        with torch.inference_mode():
+            return self.module(x)
+
+
+class Bf16Backend(InferenceBackend):
+    name = "bf16"
+
+    def __init__(self, model):
+        # Không đặt `module`: suy luận tăng dần sẽ chạy fp32, không còn là đường bf16
+        self.model = model.eval()
+
+    def __call__(self, x):
+        with torch.inference_mode(), torch.autocast("cpu", dtype=torch.bfloat16):
+            return self.model(x).float()
+
+
+class TorchScriptBackend(InferenceBackend):
+    name = "torchscript"
+
+    def __init__(self, model, seq_len=SEQ_LEN, num_joints=NUM_JOINTS, freeze=True):
+        model.eval()
+        example = torch.rand(2, 3, seq_len, num_joints, device=next(model.parameters()).device)
+        # Trace dưới no_grad để ghi lại đường eval (in-place) của model tối ưu
+        with torch.no_grad(), _static_graph(model):
+            traced = torch.jit.trace(model, example, check_trace=False)
+            self.script = torch.jit.freeze(traced) if freeze else traced
+
+    def __call__(self, x):
+        with torch.inference_mode():
+            return self.script(x)
+
+
+class QuantizedBackend(InferenceBackend):
+    name = "int8"
+
+    def __init__(self, path):
+        self.path = path
+        self.script, self.meta = load_quantized(path)
+
+    def __call__(self, x):
+        with torch.inference_mode():
+            return self.script(x)
+
+
+def export_onnx(model, path=ONNX_MODEL_PATH, seq_len=SEQ_LEN, num_joints=NUM_JOINTS, opset=ONNX_OPSET):
+    """Export model ra ONNX với trục batch và thời gian động."""
+    model.eval()
+    example = torch.rand(1, 3, seq_len, num_joints, device=next(model.parameters()).device)
+    tmp_path = f"{path}.tmp"
+    with torch.no_grad(), _static_graph(model):
+        torch.onnx.export(
+            model, example, tmp_path,
+            input_names=["keypoints"], output_names=["logits"],
+            dynamic_axes={"keypoints": {0: "batch", 2: "time"}, "logits": {0: "batch"}},
+            opset_version=opset, dynamo=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+class OnnxBackend(InferenceBackend):
+    name = "onnx"
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Mặc định theo torch.get_num_threads() để profile (utils/perf_profile.py) áp dụng cho cả ORT
+        options.intra_op_num_threads = num_threads or torch.get_num_threads()
+        self.path = path
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, x):
+        x = np.ascontiguousarray(x.detach().cpu().numpy(), dtype=np.float32)
+        return torch.from_numpy(self.session.run(None, {self.input_name: x})[0])
+
+
+def create_backend(model, backend=INFERENCE_BACKEND, onnx_path=ONNX_MODEL_PATH, source_path=None):
+    """
+    Bọc model đã load thành backend `backend`.
+    ONNX: export lại khi chưa có file hoặc file cũ hơn checkpoint `source_path`.
+    """
+    if backend == "eager":
+        return EagerBackend(model)
+    if backend == "torchscript":
+        return TorchScriptBackend(model)
+    if backend == "bf16":
+        return Bf16Backend(model)
+    if backend == "onnx":
+        stale = (not os.path.exists(onnx_path) or source_path is None
+                 or os.path.getmtime(onnx_path) < os.path.getmtime(source_path))
+        if stale:
+            export_onnx(model, onnx_path)
+        return OnnxBackend(onnx_path)
+    raise ValueError(f"Backend không hỗ trợ: {backend} (chọn một trong {BACKENDS})")
+
+
+def load_backend(path, backend=INFERENCE_BACKEND, num_classes=NUM_CLASSES, device=DEVICE,
+                 onnx_path=ONNX_MODEL_PATH):
+    """load_model() rồi bọc thành backend đã chọn (artifact int8 -> QuantizedBackend)."""
+    if is_quantized_artifact(path):
+        return QuantizedBackend(path)
+    model = load_model(path, num_classes=num_classes, device=device)
+    return create_backend(model, backend, onnx_path=onnx_path, source_path=path)
@@ -0,0 +1,130 @@
+# utils/keypoint_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+
+from configs.recognition_config import KEYPOINT_CACHE_DIR, KEYPOINT_CACHE_MAX_BYTES
+
+# Tăng khi cách trích xuất keypoints thay đổi để bỏ cache cũ
+# (2: reset Holistic trước mỗi video, bỏ entry trích xuất còn mang trạng thái tracking của video trước)
+EXTRACTOR_VERSION = 2
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """sha256 nội dung file (đọc theo chunk)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class KeypointCache:
+    """
+    Cache keypoints (T, 75, 3) của video, key = hash nội dung video + cấu hình Holistic.
+    Mỗi entry là một file .npy (đọc lại bằng memory-map), index lưu trong SQLite
+    để nhiều process (worker của batch_recognize) dùng chung được.
+    Vượt quá `max_bytes` thì xóa entry ít được dùng nhất (LRU).
+    """
+
+    def __init__(self, root=KEYPOINT_CACHE_DIR, max_bytes=KEYPOINT_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self.index_path = os.path.join(root, "index.sqlite3")
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    nbytes INTEGER NOT NULL,
+                    frames INTEGER NOT NULL,
+                    source TEXT,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)")
+
+    @contextmanager
+    def _connect(self):
+        """Kết nối trong một transaction (commit / rollback), luôn đóng khi xong."""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(video_path, settings):
+        """Key = sha256(video) + sha256(cấu hình trích xuất)."""
+        settings = {**settings, "extractor_version": EXTRACTOR_VERSION}
+        settings_hash = hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+        return f"{hash_file(video_path)[:32]}-{settings_hash[:16]}"
+
+    def get(self, key):
+        """Trả về keypoints dạng memmap (read-only) hoặc None nếu chưa có."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT filename FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            path = os.path.join(self.root, row[0])
+            if not os.path.exists(path):
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return np.load(path, mmap_mode="r")
+
+    def put(self, key, keypoints, source=None):
+        """Lưu keypoints (T, 75, 3) float32, rồi dọn cache nếu vượt dung lượng."""
+        keypoints = np.ascontiguousarray(keypoints, dtype=np.float32)
+        filename = f"{key}.npy"
+        path = os.path.join(self.root, filename)
+        # Ghi file tạm rồi rename để process khác không đọc phải file dở dang
+        tmp_path = os.path.join(self.root, f".{key}.{uuid.uuid4().hex}.tmp.npy")
+        np.save(tmp_path, keypoints)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, filename, os.path.getsize(path), len(keypoints),
+                 str(source) if source else None, now, now))
+        self.evict()
+
+    def evict(self):
+        """Xóa entry cũ nhất (theo last_access) cho tới khi tổng dung lượng <= max_bytes."""
+        if self.max_bytes is None:
+            return
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = conn.execute(
+                "SELECT key, filename, nbytes FROM entries ORDER BY last_access ASC").fetchall()
+            for key, filename, nbytes in rows:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.root, filename))
+                except FileNotFoundError:
+                    pass
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= nbytes
+
+    def stats(self):
+        with self._connect() as conn:
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
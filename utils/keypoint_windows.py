@@ -0,0 +1,75 @@
+# utils/keypoint_windows.py
+"""
+Đọc keypoints ghi sẵn (T, 75, 3) từ .npy/.npz (file hoặc thư mục, ví dụ data/keypoint_cache)
+và cắt thành cửa sổ cho model. Không phụ thuộc MediaPipe/OpenCV.
+"""
+import os
+
+import numpy as np
+
+from configs.recognition_config import NUM_JOINTS, SEQ_LEN, PREDICT_STRIDE
+
+KEYPOINT_EXTS = (".npy", ".npz")
+
+
+def load_keypoint_file(path, key="keypoints"):
+    """Keypoints (T, 75, 3) float32 từ .npy (memory-map) hoặc .npz (mảng `key`, không có thì mảng đầu tiên)."""
+    if str(path).endswith(".npz"):
+        with np.load(path) as data:
+            keypoints = data[key] if key in data else data[data.files[0]]
+    else:
+        keypoints = np.load(path, mmap_mode="r")
+    return np.asarray(keypoints, dtype=np.float32).reshape(-1, NUM_JOINTS, 3)
+
+
+def find_keypoint_files(inputs):
+    """Danh sách file .npy/.npz (sắp xếp) từ các file hoặc thư mục (duyệt đệ quy)."""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                files.extend(os.path.join(root, n) for n in names
+                             if n.lower().endswith(KEYPOINT_EXTS) and not n.startswith("."))
+        elif str(item).lower().endswith(KEYPOINT_EXTS):
+            files.append(str(item))
+    return sorted(files)
+
+
+def sliding_windows(keypoints, seq_len, stride):
+    """
+    Cắt keypoints (T, 75, 3) thành các cửa sổ [W, 3, seq_len, 75] (view, không copy).
+    Video ngắn hơn seq_len được dùng nguyên làm một cửa sổ.
+    Trả về (windows, start_frames).
+    """
+    T = keypoints.shape[0]
+    if T == 0:
+        return np.zeros((0, 3, seq_len, keypoints.shape[1]), dtype=np.float32), []
+    if T < seq_len:
+        return keypoints.transpose(2, 0, 1)[np.newaxis], [0]
+    # (W, 75, 3, seq_len) -> (W, 3, seq_len, 75)
+    windows = np.lib.stride_tricks.sliding_window_view(keypoints, seq_len, axis=0)[::stride]
+    starts = list(range(0, T - seq_len + 1, stride))
+    return windows.transpose(0, 2, 3, 1), starts
+
+
+def load_windows(inputs, seq_len=SEQ_LEN, stride=PREDICT_STRIDE, max_windows=None):
+    """
+    Gom cửa sổ đủ seq_len frame từ các bản ghi keypoints thành mảng [W, 3, seq_len, 75] float32.
+    Bản ghi ngắn hơn seq_len bị bỏ qua (để stack được).
+    """
+    windows = []
+    total = 0
+    for path in find_keypoint_files(inputs):
+        keypoints = load_keypoint_file(path)
+        if len(keypoints) < seq_len:
+            continue
+        w, _ = sliding_windows(keypoints, seq_len, stride)
+        if max_windows is not None:
+            w = w[:max_windows - total]
+        windows.append(np.ascontiguousarray(w))
+        total += len(w)
+        if max_windows is not None and total >= max_windows:
+            break
+    if not windows:
+        return np.zeros((0, 3, seq_len, NUM_JOINTS), dtype=np.float32)
+    return np.concatenate(windows)
@@ -0,0 +1,87 @@
+# utils/keypoints.py
+import numpy as np
+
+# --- Hàm trích xuất keypoints ---
+def extract_keypoints(results):
+    """Ghép pose (33) + tay trái (21) + tay phải (21) thành vector phẳng (225,)."""
+    if results.pose_landmarks:
+        pose = np.array([[lm.x, lm.y, lm.z] for lm in results.pose_landmarks.landmark])
+    else:
+        pose = np.zeros((33, 3))
+    
+    if results.left_hand_landmarks:
+        left = np.array([[lm.x, lm.y, lm.z] for lm in results.left_hand_landmarks.landmark])
+    else:
+        left = np.zeros((21, 3))
+    
+    if results.right_hand_landmarks:
+        right = np.array([[lm.x, lm.y, lm.z] for lm in results.right_hand_landmarks.landmark])
+    else:
+        right = np.zeros((21, 3))
+    
+    return np.concatenate([pose, left, right]).flatten()
+
+
+# --- Trích xuất không cấp phát (dùng cho vòng lặp realtime) ---
+POSE, LEFT_HAND, RIGHT_HAND = 0, 1, 2
+PART_SLICES = (slice(0, 33), slice(33, 54), slice(54, 75))
+
+# NormalizedLandmarkList được serialize thành các record:
+# 0x0a <len> 0x0d <x:f32> 0x15 <y:f32> 0x1d <z:f32> [visibility, presence]
+_TAGS = ((0, b"\x0a"), (2, b"\x0d"), (7, b"\x15"), (12, b"\x1d"))
+
+
+def _landmarks_from_wire(landmark_list, out):
+    """Đọc x, y, z trực tiếp từ bytes protobuf vào `out` (n, 3). Trả về False nếu layout không như mong đợi."""
+    n = out.shape[0]
+    raw = landmark_list.SerializeToString()
+    if len(raw) < 2:
+        return False
+    rec_len = raw[1] + 2
+    if rec_len < 17 or len(raw) != n * rec_len:
+        return False
+    for col, tag in _TAGS:
+        if raw[col::rec_len] != tag * n:
+            return False
+    # View float32 (không căn lề) lên x, y, z của từng record, copy thẳng vào out
+    xyz = np.ndarray((n, 3), dtype="<f4", buffer=raw, offset=3, strides=(rec_len, 5))
+    out[...] = xyz
+    return True
+
+
+def _landmarks_from_attrs(landmark_list, out):
+    """Cách chậm: đọc từng thuộc tính (fallback)."""
+    flat = memoryview(out).cast("B").cast("f")
+    i = 0
+    for lm in landmark_list.landmark:
+        flat[i] = lm.x
+        flat[i + 1] = lm.y
+        flat[i + 2] = lm.z
+        i += 3
+
+
+class KeypointExtractor:
+    """
+    Ghi landmarks của MediaPipe Holistic vào buffer float32 (75, 3) cấp phát sẵn,
+    kèm mask có mặt (3,) cho [pose, tay trái, tay phải].
+    Buffer được ghi đè ở lần gọi sau, copy ra nếu cần giữ lại.
+    """
+
+    def __init__(self):
+        self.buffer = np.zeros((75, 3), dtype=np.float32)
+        self.presence = np.zeros(3, dtype=bool)
+
+    def extract(self, results, out=None):
+        """Trả về (keypoints (75, 3) float32, presence (3,) bool)."""
+        out = self.buffer if out is None else out
+        parts = (results.pose_landmarks, results.left_hand_landmarks, results.right_hand_landmarks)
+        for part, (landmarks, sl) in enumerate(zip(parts, PART_SLICES)):
+            dst = out[sl]
+            if landmarks is None or len(landmarks.landmark) != dst.shape[0]:
+                dst.fill(0.0)
+                self.presence[part] = False
+                continue
+            if not _landmarks_from_wire(landmarks, dst):
+                _landmarks_from_attrs(landmarks, dst)
+            self.presence[part] = True
+        return out, self.presence
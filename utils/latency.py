@@ -0,0 +1,142 @@
+# utils/latency.py
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Biên các bucket histogram (ms), bucket cuối là "> 1000 ms"
+HIST_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class RollingLatency:
+    """Giữ `size` mẫu gần nhất để tính p50/p95/p99, kèm histogram tích lũy từ đầu."""
+
+    def __init__(self, size=300):
+        self.size = size
+        self.values = np.zeros(size, dtype=np.float64)  # giây
+        self.n = 0
+        self.total = 0.0
+        self.hist = np.zeros(len(HIST_EDGES_MS) + 1, dtype=np.int64)
+
+    def add(self, seconds):
+        self.values[self.n % self.size] = seconds
+        self.n += 1
+        self.total += seconds
+        self.hist[np.searchsorted(HIST_EDGES_MS, seconds * 1000.0)] += 1
+
+    def summary(self):
+        if self.n == 0:
+            return {"count": 0}
+        window = self.values[:min(self.n, self.size)] * 1000.0
+        p50, p95, p99 = np.percentile(window, [50, 95, 99])
+        return {
+            "count": self.n,
+            "mean_ms": 1000.0 * self.total / self.n,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(window.max()),
+        }
+
+
+class FpsCounter:
+    """FPS tính trên các frame trong `window` giây gần nhất."""
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self.stamps = deque()
+        self.count = 0
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        self.stamps.append(now)
+        self.count += 1
+        while self.stamps and now - self.stamps[0] > self.window:
+            self.stamps.popleft()
+
+    def fps(self):
+        if len(self.stamps) < 2:
+            return 0.0
+        span = self.stamps[-1] - self.stamps[0]
+        return (len(self.stamps) - 1) / span if span > 0 else 0.0
+
+
+class LatencyTracker:
+    """
+    Đo độ trễ từng stage của vòng nhận diện (capture, color, holistic, extract, inference, render)
+    và FPS. Dùng được từ nhiều thread.
+
+        with tracker.time("holistic"):
+            results = holistic.process(image)
+    """
+
+    STAGES = ("capture", "color", "holistic", "extract", "inference", "render")
+
+    def __init__(self, window=300, fps_window=2.0):
+        self._lock = threading.Lock()
+        self.window = window
+        self.stages = {name: RollingLatency(window) for name in self.STAGES}
+        self.fps_counter = FpsCounter(fps_window)
+        self.started = time.time()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = RollingLatency(self.window)
+            self.stages[stage].add(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - t0)
+
+    def tick(self):
+        """Gọi mỗi khi một frame được hiển thị."""
+        with self._lock:
+            self.fps_counter.tick()
+
+    def summary(self):
+        with self._lock:
+            return {
+                "fps": self.fps_counter.fps(),
+                "frames": self.fps_counter.count,
+                "stages": {name: s.summary() for name, s in self.stages.items()},
+            }
+
+    def to_markdown(self):
+        """Bảng tóm tắt cho sidebar."""
+        summary = self.summary()
+        lines = [f"**FPS:** {summary['fps']:.1f}", "",
+                 "| Stage | p50 | p95 | p99 (ms) |", "|---|---|---|---|"]
+        for name, s in summary["stages"].items():
+            if s["count"]:
+                lines.append(f"| {name} | {s['p50_ms']:.1f} | {s['p95_ms']:.1f} | {s['p99_ms']:.1f} |")
+        return "\n".join(lines)
+
+    def dump(self, path, extra=None):
+        """Ghi tóm tắt + histogram ra file JSON để so sánh giữa các lần chạy."""
+        with self._lock:
+            data = {
+                "started": self.started,
+                "duration_s": time.time() - self.started,
+                "fps": self.fps_counter.fps(),
+                "frames": self.fps_counter.count,
+                "hist_edges_ms": list(HIST_EDGES_MS),
+                "stages": {
+                    name: {**s.summary(), "hist": s.hist.tolist()}
+                    for name, s in self.stages.items()
+                },
+            }
+        if extra:
+            data.update(extra)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return path
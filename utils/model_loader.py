@@ -0,0 +1,170 @@
+# utils/model_loader.py
+import json
+import os
+
+import torch
+
+from sstcn_attention_model import (SSTCN_Attention, SSTCN_AttentionInference, FUSED_CONV_BN, bn_affine,
+                                   fold_batchnorm, POSE_START, POSE_END, L_HAND_START, L_HAND_END, R_HAND_START, R_HAND_END)
+from configs.recognition_config import (MODEL_PATH, NUM_CLASSES, DEVICE, OPTIMIZED_MODEL, SEQ_LEN, NUM_JOINTS,
+                                        PRESENCE_AWARE,
+                                        FUSED_MODEL_PATH, USE_FUSED_MODEL,
+                                        QUANTIZED_MODEL_PATH, USE_QUANTIZED_MODEL,
+                                        TENSOR_MODEL_PATH, USE_TENSOR_MODEL, NUMPY_MODEL_PATH)
+from utils.sign_dict import SIGN_DICT
+from utils.tensor_file import save_tensors, load_tensors, is_tensor_file
+from utils import numpy_model
+
+# Giá trị khóa "format" của checkpoint đã fuse (checkpoint huấn luyện không có khóa này)
+FUSED_FORMAT = "sstcn_attention_fused"
+FUSED_FORMAT_VERSION = 1
+
+# Giá trị "format" trong __metadata__ của file tensor (utils/tensor_file.py)
+TENSOR_FORMAT = "sstcn_attention"
+TENSOR_FORMAT_VERSION = 1
+JOINT_LAYOUT = {"pose": [POSE_START, POSE_END],
+                "left_hand": [L_HAND_START, L_HAND_END],
+                "right_hand": [R_HAND_START, R_HAND_END]}
+
+
+def _model_class(optimized):
+    return SSTCN_AttentionInference if optimized else SSTCN_Attention
+
+
+def _prepare(model, device):
+    """Chuyển device, eval và áp dụng PRESENCE_AWARE cho bản tối ưu suy luận."""
+    model.to(device)
+    model.eval()
+    if isinstance(model, SSTCN_AttentionInference):
+        model.presence_aware = PRESENCE_AWARE
+    return model
+
+
+def default_model_path():
+    """
+    Artifact int8 / file tensor memory-map / checkpoint đã fuse nếu có (và được bật trong config),
+    không thì checkpoint gốc.
+    """
+    if USE_QUANTIZED_MODEL and os.path.exists(QUANTIZED_MODEL_PATH):
+        return QUANTIZED_MODEL_PATH
+    if USE_TENSOR_MODEL and os.path.exists(TENSOR_MODEL_PATH):
+        return TENSOR_MODEL_PATH
+    if USE_FUSED_MODEL and os.path.exists(FUSED_MODEL_PATH):
+        return FUSED_MODEL_PATH
+    return MODEL_PATH
+
+
+def load_model(path=MODEL_PATH, num_classes=NUM_CLASSES, device=DEVICE, optimized=OPTIMIZED_MODEL):
+    """
+    Tạo SSTCN_Attention (hoặc bản tối ưu suy luận), nạp `model_state_dict` từ checkpoint và chuyển sang eval.
+    Checkpoint đã fuse (xem save_fused_checkpoint) luôn được nạp vào SSTCN_AttentionInference đã fuse.
+    File tensor (xem save_model_tensors) được memory-map, không unpickle.
+    """
+    if is_tensor_file(path):
+        return _load_tensor_file(path, device, optimized)
+    checkpoint = torch.load(path, map_location=device)
+    if checkpoint.get("format") == FUSED_FORMAT:
+        model = SSTCN_AttentionInference(num_classes=checkpoint.get("num_classes", num_classes))
+        model.fuse(fold=False)
+    else:
+        model = _model_class(optimized)(num_classes=num_classes)
+    model.load_state_dict(checkpoint['model_state_dict'])
+    return _prepare(model, device)
+
+
+def create_random_model(num_classes=NUM_CLASSES, seed=0, device=DEVICE, optimized=OPTIMIZED_MODEL):
+    """Model trọng số ngẫu nhiên (cố định seed) cho benchmark/CI khi không có checkpoint."""
+    torch.manual_seed(seed)
+    return _prepare(_model_class(optimized)(num_classes=num_classes), device)
+
+
+def fuse_model(model):
+    """Bản sao SSTCN_AttentionInference đã gộp BN + bỏ dropout của `model` (không sửa model gốc)."""
+    fused = SSTCN_AttentionInference(num_classes=model.fc.out_features)
+    fused.load_state_dict(model.state_dict())
+    fused.fuse()
+    return _prepare(fused, next(model.parameters()).device)
+
+
+def save_fused_checkpoint(model, path=FUSED_MODEL_PATH, source=None):
+    """Lưu model đã fuse thành checkpoint riêng (khóa "format" để load_model nhận ra)."""
+    torch.save({
+        "format": FUSED_FORMAT,
+        "version": FUSED_FORMAT_VERSION,
+        "num_classes": model.fc.out_features,
+        "source": str(source) if source else None,
+        "model_state_dict": model.state_dict(),
+    }, path)
+    return path
+
+
+def save_model_tensors(model, path=TENSOR_MODEL_PATH, source=None):
+    """Lưu state_dict thành file tensor memory-map được, metadata gồm num_classes, joints, SEQ_LEN, nhãn."""
+    fused = bool(getattr(model, "fused", False))
+    metadata = {
+        "format": TENSOR_FORMAT,
+        "version": TENSOR_FORMAT_VERSION,
+        "num_classes": model.fc.out_features,
+        "fused": int(fused),
+        "seq_len": SEQ_LEN,
+        "num_joints": NUM_JOINTS,
+        "joint_layout": json.dumps(JOINT_LAYOUT),
+        "labels": json.dumps(SIGN_DICT, ensure_ascii=False),
+    }
+    if source:
+        metadata["source"] = source
+    return save_tensors(model.state_dict(), path, metadata)
+
+
+@torch.no_grad()
+def save_numpy_model(model, path=NUMPY_MODEL_PATH, source=None):
+    """Export trọng số sang .npz cho utils/numpy_model.py (BN gộp vào conv, layout channels-last)."""
+    weights = {}
+    for (conv_name, bn_name), key in zip(FUSED_CONV_BN, ("spatial", "conv1", "conv2")):
+        conv, bn = getattr(model, conv_name), getattr(model, bn_name)
+        weight, bias = fold_batchnorm(conv, bn) if bn_affine(bn) is not None else (conv.weight, conv.bias)
+        if key == "spatial":
+            weights["spatial_w"] = weight.view(weight.shape[0], -1).t()               # [C, E]
+        else:
+            weights[f"{key}_w"] = weight.squeeze(3).permute(2, 1, 0)                  # [3, Ci, Co]
+        weights[f"{key}_b"] = bias
+    attns = (model.left_hand_attn.attn, model.right_hand_attn.attn)
+    weights["attn_in_w"] = torch.stack([a.in_proj_weight.t() for a in attns])
+    weights["attn_in_b"] = torch.stack([a.in_proj_bias for a in attns])
+    weights["attn_out_w"] = torch.stack([a.out_proj.weight.t() for a in attns])
+    weights["attn_out_b"] = torch.stack([a.out_proj.bias for a in attns])
+    weights["fc_w"] = model.fc.weight.t()
+    weights["fc_b"] = model.fc.bias
+
+    hand_joints = model.left_hand_joints + model.right_hand_joints
+    if hand_joints != list(range(hand_joints[0], hand_joints[-1] + 1)):
+        raise ValueError("Runtime NumPy cần joints tay trái + phải liên tiếp")
+    metadata = {
+        "num_classes": model.fc.out_features,
+        "num_heads": attns[0].num_heads,
+        "hand_joints": [hand_joints[0], hand_joints[-1] + 1],
+        "seq_len": SEQ_LEN,
+        "num_joints": NUM_JOINTS,
+        "joint_layout": JOINT_LAYOUT,
+    }
+    if source:
+        metadata["source"] = str(source)
+    return numpy_model.save_weights(path, {k: v.detach().float().cpu().numpy() for k, v in weights.items()},
+                                    metadata)
+
+
+def _load_tensor_file(path, device, optimized):
+    tensors, metadata = load_tensors(path)
+    if metadata.get("format") != TENSOR_FORMAT:
+        raise ValueError(f"{path} không phải checkpoint {TENSOR_FORMAT}")
+    if int(metadata.get("num_joints", NUM_JOINTS)) != NUM_JOINTS:
+        raise ValueError(f"{path}: model dùng {metadata['num_joints']} joints, config là {NUM_JOINTS}")
+    num_classes = int(metadata["num_classes"])
+    if metadata.get("fused") == "1":
+        model = SSTCN_AttentionInference(num_classes=num_classes)
+        model.fuse(fold=False)
+    else:
+        model = _model_class(optimized)(num_classes=num_classes)
+    # assign=True: tham số trỏ thẳng vào memory-map thay vì copy sang bộ nhớ riêng
+    model.load_state_dict(tensors, assign=True)
+    return _prepare(model, device)
@@ -0,0 +1,232 @@
+# utils/numpy_model.py
+"""
+Suy luận SSTCN_Attention chỉ bằng NumPy (không import torch), dùng cho trang Recognition
+khi NUMPY_RUNTIME = True.
+
+Trọng số được export bằng `python export_numpy.py` thành file .npz (float32, BN đã gộp vào conv,
+trọng số đã xoay sẵn theo layout channels-last [.., J, E] để mọi phép tính là matmul):
+
+    spatial_w [C, E], spatial_b [E]
+    attn_in_w [2, E, 3E], attn_in_b [2, 3E], attn_out_w [2, E, E], attn_out_b [2, E]   (tay trái, tay phải)
+    conv1_w [3, E, E1], conv1_b [E1], conv2_w [3, E1, E2], conv2_b [E2]                (kernel (3, 1) theo T)
+    fc_w [E2, num_classes], fc_b [num_classes]
+    __metadata__: chuỗi JSON (format, num_heads, hand_joints, num_classes, seq_len, ...)
+"""
+import json
+
+import numpy as np
+
+NUMPY_FORMAT = "sstcn_attention_numpy"
+NUMPY_FORMAT_VERSION = 1
+WEIGHT_NAMES = ("spatial_w", "spatial_b", "attn_in_w", "attn_in_b", "attn_out_w", "attn_out_b",
+                "conv1_w", "conv1_b", "conv2_w", "conv2_b", "fc_w", "fc_b")
+
+
+def save_weights(path, weights, metadata):
+    """Ghi dict {tên: mảng} + metadata ra .npz (không nén, float32)."""
+    arrays = {name: np.ascontiguousarray(weights[name], dtype=np.float32) for name in WEIGHT_NAMES}
+    meta = {"format": NUMPY_FORMAT, "version": NUMPY_FORMAT_VERSION, **metadata}
+    with open(path, "wb") as f:
+        np.savez(f, __metadata__=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+    return path
+
+
+def softmax(x, axis=-1):
+    x = x - x.max(axis=axis, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=axis, keepdims=True)
+    return x
+
+
+class NumpySSTCN:
+    """
+    Forward của SSTCN_Attention (eval) trên mảng float32:
+        model(x) với x: [B, 3, T, J] -> logits [B, num_classes]
+    Giống SSTCN_AttentionInference: tay vắng mặt (21 joint = 0) dùng output attention hằng số
+    thay vì tính attention (`presence_aware`).
+    """
+
+    def __init__(self, weights, metadata, presence_aware=True):
+        missing = [name for name in WEIGHT_NAMES if name not in weights]
+        if missing:
+            raise ValueError(f"Thiếu trọng số: {missing}")
+        if metadata.get("format") != NUMPY_FORMAT:
+            raise ValueError(f"Không phải trọng số {NUMPY_FORMAT}: {metadata.get('format')}")
+        self.metadata = metadata
+        for name in WEIGHT_NAMES:
+            setattr(self, name, np.ascontiguousarray(weights[name], dtype=np.float32))
+        self.num_heads = int(metadata["num_heads"])
+        start, stop = metadata["hand_joints"]
+        self.hand_slice = slice(start, stop)
+        self.num_classes = self.fc_w.shape[1]
+        self.presence_aware = presence_aware
+        # Output attention khi cả tay vắng mặt: mọi token = relu(spatial_b) -> out_proj(v_proj(token))
+        E = self.spatial_w.shape[1]
+        c = np.maximum(self.spatial_b, 0)
+        v = np.einsum("e,hef->hf", c, self.attn_in_w[:, :, 2 * E:]) + self.attn_in_b[:, 2 * E:]
+        self._absent = np.einsum("he,hef->hf", v, self.attn_out_w) + self.attn_out_b   # [2, E]
+
+    @classmethod
+    def load(cls, path, presence_aware=True):
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data["__metadata__"]))
+            weights = {name: data[name] for name in WEIGHT_NAMES if name in data.files}
+        return cls(weights, metadata, presence_aware)
+
+    def eval(self):
+        return self
+
+    # --- Spatial + attention tay ---
+    def _attention(self, tokens, h):
+        """Self-attention nhiều head của tay `h` trên tokens [N, K, E] -> [N, K, E]."""
+        N, K, E = tokens.shape
+        H = self.num_heads
+        d = E // H
+        qkv = tokens.reshape(N * K, E) @ self.attn_in_w[h] + self.attn_in_b[h]         # [N*K, 3E]
+        q, k, v = qkv.reshape(N, K, 3, H, d).transpose(2, 0, 3, 1, 4)                 # [N, H, K, d]
+        scores = q @ k.transpose(0, 1, 3, 2)
+        scores *= d ** -0.5
+        out = softmax(scores) @ v                                                     # [N, H, K, d]
+        out = out.transpose(0, 2, 1, 3).reshape(N * K, E) @ self.attn_out_w[h] + self.attn_out_b[h]
+        return out.reshape(N, K, E)
+
+    def frame_features(self, x):
+        """x: [N, C, J] -> [N, J, E] (channels-last)."""
+        N, C, J = x.shape
+        y = x.transpose(0, 2, 1).reshape(N * J, C) @ self.spatial_w + self.spatial_b
+        np.maximum(y, 0, out=y)
+        y = y.reshape(N, J, -1)
+
+        hs = self.hand_slice
+        K = (hs.stop - hs.start) // 2
+        if self.presence_aware:
+            present = x[:, :, hs].reshape(N, C, 2, K).any(axis=(1, 3))                 # [N, 2]
+        else:
+            present = np.ones((N, 2), dtype=bool)
+        for h in range(2):
+            cols = slice(hs.start + h * K, hs.start + (h + 1) * K)
+            rows = np.flatnonzero(present[:, h])
+            if len(rows) == N:
+                y[:, cols] = self._attention(y[:, cols], h)
+                continue
+            out = self._attention(y[rows, cols], h) if len(rows) else None
+            y[:, cols] = self._absent[h]
+            if out is not None:
+                y[rows, cols] = out
+        return y
+
+    # --- Temporal conv kernel (3, 1), zero padding theo T ---
+    @staticmethod
+    def _temporal_conv(x, weight, bias):
+        """x: [B, T, J, Ci], weight: [3, Ci, Co] -> relu(conv) [B, T, J, Co]."""
+        B, T, J, Ci = x.shape
+        flat = x.reshape(B, T * J, Ci)
+        out = flat @ weight[1] + bias                                                 # tâm kernel
+        if T > 1:
+            out = out.reshape(B, T, J, -1)
+            out[:, 1:] += (flat[:, :(T - 1) * J] @ weight[0]).reshape(B, T - 1, J, -1)   # frame t-1
+            out[:, :-1] += (flat[:, J:] @ weight[2]).reshape(B, T - 1, J, -1)           # frame t+1
+        np.maximum(out, 0, out=out)
+        return out.reshape(B, T, J, -1)
+
+    def temporal_pooled(self, f):
+        """Đặc trưng frame [B, T, J, E] -> hai temporal conv + mean theo (T, J) [B, E2]."""
+        h = self._temporal_conv(f, self.conv1_w, self.conv1_b)
+        return self._temporal_conv(h, self.conv2_w, self.conv2_b).mean(axis=(1, 2))
+
+    def classify(self, pooled):
+        return pooled @ self.fc_w + self.fc_b
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=np.float32)
+        B, C, T, J = x.shape
+        f = self.frame_features(x.transpose(0, 2, 1, 3).reshape(B * T, C, J))         # [B*T, J, E]
+        return self.classify(self.temporal_pooled(f.reshape(B, T, J, -1)))
+
+
+class NumpyStream:
+    """
+    Suy luận tăng dần cho NumpySSTCN, cùng cách chia biên / bên trong như SSTCNStream
+    (xem sstcn_attention_model.py): mỗi frame chỉ tính đặc trưng một lần, mỗi lần dự đoán
+    chỉ tính lại 2 vị trí conv1 và 4 vị trí conv2 ở biên cửa sổ.
+    """
+
+    def __init__(self, model, seq_len=30, batch_size=1):
+        self.model = model
+        self.seq_len = seq_len
+        self.batch_size = batch_size
+        S, B = seq_len, batch_size
+        E, E1, E2 = model.spatial_w.shape[1], model.conv1_w.shape[2], model.conv2_w.shape[2]
+        J = model.metadata.get("num_joints", model.hand_slice.stop)
+        self.f = np.zeros((S, B, J, E), dtype=np.float32)     # đặc trưng từng frame
+        self.h1 = np.zeros((S, B, J, E1), dtype=np.float32)   # conv1 "bên trong" tại frame i
+        self.p2 = np.zeros((S, B, E2), dtype=np.float32)      # conv2 "bên trong" đã mean theo joints
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+
+    @property
+    def window_len(self):
+        return min(self.count, self.seq_len)
+
+    @staticmethod
+    def _conv3(frames, weight, bias):
+        """relu(conv) tại một vị trí từ 3 frame liên tiếp [B, J, Ci] (None = zero padding)."""
+        out = bias
+        for k, frame in enumerate(frames):
+            if frame is not None:
+                out = out + frame @ weight[k]
+        return np.maximum(out, 0)
+
+    def push(self, frame):
+        """Thêm một frame keypoints [B, C, J] (hoặc [C, J] khi batch_size=1)."""
+        frame = np.asarray(frame, dtype=np.float32)
+        if frame.ndim == 2:
+            frame = frame[None]
+        m, S, i = self.model, self.seq_len, self.count
+        self.f[i % S] = m.frame_features(frame)
+        # h1 bên trong tại i-1 và h2 bên trong (đã pool) tại i-2
+        if i >= 2:
+            self.h1[(i - 1) % S] = self._conv3([self.f[(i - 2) % S], self.f[(i - 1) % S], self.f[i % S]],
+                                               m.conv1_w, m.conv1_b)
+        if i >= 4:
+            h2 = self._conv3([self.h1[(i - 3) % S], self.h1[(i - 2) % S], self.h1[(i - 1) % S]],
+                             m.conv2_w, m.conv2_b)
+            self.p2[(i - 2) % S] = h2.mean(axis=1)
+        self.count += 1
+
+    def logits(self):
+        """Logits [B, num_classes] trên cửa sổ hiện tại (tối đa seq_len frame gần nhất)."""
+        if self.count == 0:
+            raise RuntimeError("Chưa có frame nào trong stream")
+        m, S = self.model, self.seq_len
+        L = self.window_len
+        e = self.count - 1
+        s = e - L + 1
+
+        if L < 5:
+            # Cửa sổ quá ngắn để tách biên / bên trong -> chạy temporal đầy đủ
+            f = self.f[[k % S for k in range(s, e + 1)]].transpose(1, 0, 2, 3)       # [B, L, J, E]
+            return m.classify(m.temporal_pooled(np.ascontiguousarray(f)))
+
+        f = lambda k: self.f[k % S]
+        h1 = lambda k: self.h1[k % S]
+        # h1 ở hai biên (zero padding ngoài cửa sổ), rồi h2 tại s, s+1, e-1, e
+        h1_s = self._conv3([None, f(s), f(s + 1)], m.conv1_w, m.conv1_b)
+        h1_e = self._conv3([f(e - 1), f(e), None], m.conv1_w, m.conv1_b)
+        pooled = 0
+        for frames in ([None, h1_s, h1(s + 1)], [h1_s, h1(s + 1), h1(s + 2)],
+                       [h1(e - 2), h1(e - 1), h1_e], [h1(e - 1), h1_e, None]):
+            pooled = pooled + self._conv3(frames, m.conv2_w, m.conv2_b).mean(axis=1)
+
+        # h2 bên trong s+2..e-2 đã cache
+        inner = [k % S for k in range(s + 2, e - 1)]
+        if inner:
+            pooled = pooled + self.p2[inner].sum(axis=0)
+        return m.classify(pooled / L)
+
+    def step(self, frame):
+        """push() + logits()."""
+        self.push(frame)
+        return self.logits()
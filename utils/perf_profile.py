@@ -0,0 +1,110 @@
+# utils/perf_profile.py
+"""
+Profile hiệu năng theo máy (tạo bằng `python autotune.py`): số thread, interop thread,
+backend và batch size tốt nhất cho hai kiểu tải:
+  - "realtime": một cửa sổ mỗi lần (trang Recognition), tối ưu độ trễ batch 1
+  - "batch": nhiều cửa sổ (batch_recognize.py, recognition_service.py), tối ưu throughput
+
+File JSON nằm ở PERF_PROFILE_DIR/<hostname>.json, chỉ được áp dụng nếu khớp máy hiện tại.
+"""
+import json
+import logging
+import os
+import platform
+import socket
+
+import torch
+
+from configs.recognition_config import PERF_PROFILE_DIR, APPLY_PERF_PROFILE, INFERENCE_BACKEND
+
+logger = logging.getLogger(__name__)
+
+WORKLOADS = ("realtime", "batch")
+
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def host_info():
+    """Thông tin nhận diện máy; profile đo trên máy khác (hoặc torch khác) không được dùng."""
+    return {
+        "hostname": socket.gethostname(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+    }
+
+
+def profile_path(root=PERF_PROFILE_DIR):
+    return os.path.join(root, f"{socket.gethostname()}.json")
+
+
+def save_profile(profile, path=None):
+    path = path or profile_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"host": host_info(), **profile}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_profile(path=None):
+    """Profile của máy hiện tại, None nếu chưa có hoặc được đo trên máy / phiên bản torch khác."""
+    path = path or profile_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Không đọc được profile {path}: {e}")
+        return None
+    host, current = profile.get("host", {}), host_info()
+    if any(host.get(k) != current[k] for k in ("cpu", "cpu_count", "torch")):
+        logger.warning(f"Profile {path} được đo trên máy/phiên bản khác, bỏ qua")
+        return None
+    return profile
+
+
+def apply_threads(num_threads=None, interop_threads=None):
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    if interop_threads and torch.get_num_interop_threads() != interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            # Chỉ đặt được trước khi PyTorch chạy tác vụ song song đầu tiên trong process
+            logger.warning("Không đổi được số interop thread (PyTorch đã khởi động thread pool)")
+
+
+def apply_profile(workload="realtime", path=None, enabled=APPLY_PERF_PROFILE):
+    """
+    Áp dụng số thread của profile cho `workload` và trả về cấu hình đã chọn
+    ({"backend", "num_threads", "interop_threads", "batch_size", ...}); {} nếu không có profile.
+    Gọi trước khi load model.
+    """
+    if workload not in WORKLOADS:
+        raise ValueError(f"workload phải là một trong {WORKLOADS}")
+    profile = load_profile(path) if enabled else None
+    settings = (profile or {}).get(workload) or {}
+    if settings:
+        apply_threads(settings.get("num_threads"), settings.get("interop_threads"))
+        logger.info(f"Áp dụng profile {workload}: {settings}")
+    return settings
+
+
+def profile_backend(settings, default=INFERENCE_BACKEND):
+    """Backend trong profile nếu là backend tạo được từ checkpoint, không thì `default`."""
+    from utils.inference_backends import BACKENDS
+
+    backend = settings.get("backend")
+    return backend if backend in BACKENDS else default
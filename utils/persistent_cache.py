@@ -0,0 +1,143 @@
+# utils/persistent_cache.py
+"""
+Cache key -> giá trị JSON có TTL: LRU trong bộ nhớ đứng trước một bảng SQLite (giữ qua restart,
+dùng chung giữa các worker trên cùng máy). Dùng cho cache viết lại truy vấn trong rag_service.py.
+
+Mỗi entry thuộc một `namespace` (ví dụ hash của prompt template); đổi namespace là tự động
+không dùng lại entry cũ (purge(keep_namespace=...) để xóa hẳn). `max_entries` giới hạn LRU trong bộ nhớ,
+`max_stored` giới hạn bảng SQLite (xóa dòng cũ nhất theo `created`).
+Đếm hit (bộ nhớ / SQLite), miss, hết hạn để theo dõi qua stats().
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """NFC + casefold + gộp khoảng trắng: "Ký hiệu  XIN chào " == "ký hiệu xin chào"."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text).casefold()).strip()
+
+
+def text_hash(*parts):
+    """sha256 rút gọn của các chuỗi (ví dụ prompt template + tên model)."""
+    return hashlib.sha256("\0".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+
+
+class PersistentCache:
+    def __init__(self, path, table="cache", ttl=None, max_entries=1024, max_stored=None):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Tên bảng không hợp lệ: {table}")
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_stored = max_stored
+        self._memory = OrderedDict()     # (namespace, key) -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "stores": 0}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        with self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {table} (namespace TEXT NOT NULL, key TEXT NOT NULL, "
+                             f"value TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (namespace, key))")
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_created ON {table}(created)")
+
+    def _expires_at(self, created):
+        return created + self.ttl if self.ttl else float("inf")
+
+    def _remember(self, item, value, expires_at):
+        self._memory[item] = (value, expires_at)
+        self._memory.move_to_end(item)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, namespace, key, default=None):
+        item = (namespace, key)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(item)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(item)
+                    self.counters["memory_hits"] += 1
+                    return entry[0]
+                del self._memory[item]
+            row = self._db.execute(f"SELECT value, created FROM {self.table} WHERE namespace = ? AND key = ?",
+                                   item).fetchone()
+            if row is not None and self._expires_at(row[1]) > now:
+                value = json.loads(row[0])
+                self._remember(item, value, self._expires_at(row[1]))
+                self.counters["disk_hits"] += 1
+                return value
+            if row is not None or entry is not None:
+                self.counters["expired"] += 1
+                with self._db:
+                    self._db.execute(f"DELETE FROM {self.table} WHERE namespace = ? AND key = ?", item)
+            self.counters["misses"] += 1
+            return default
+
+    def set(self, namespace, key, value):
+        item = (namespace, key)
+        now = time.time()
+        with self._lock:
+            with self._db:
+                self._db.execute(f"INSERT OR REPLACE INTO {self.table} (namespace, key, value, created) "
+                                 f"VALUES (?, ?, ?, ?)", (*item, json.dumps(value, ensure_ascii=False), now))
+                if self.max_stored:
+                    # Giữ tối đa max_stored dòng mới nhất
+                    self._db.execute(f"DELETE FROM {self.table} WHERE rowid IN (SELECT rowid FROM {self.table} "
+                                     f"ORDER BY created DESC LIMIT -1 OFFSET ?)", (self.max_stored,))
+            self._remember(item, value, self._expires_at(now))
+            self.counters["stores"] += 1
+
+    def get_or_compute(self, namespace, key, compute):
+        """Giá trị trong cache, không có thì gọi compute() rồi lưu (None / chuỗi rỗng không được lưu)."""
+        value = self.get(namespace, key)
+        if value is None:
+            value = compute()
+            if value not in (None, ""):
+                self.set(namespace, key, value)
+        return value
+
+    def purge(self, keep_namespace=None):
+        """Xóa entry hết hạn (và entry khác `keep_namespace` nếu có). Trả về số dòng đã xóa."""
+        with self._lock:
+            conditions, params = [], []
+            if self.ttl:
+                conditions.append("created <= ?")
+                params.append(time.time() - self.ttl)
+            if keep_namespace is not None:
+                conditions.append("namespace != ?")
+                params.append(keep_namespace)
+                for item in [i for i in self._memory if i[0] != keep_namespace]:
+                    del self._memory[item]
+            if not conditions:
+                return 0
+            with self._db:
+                return self._db.execute(f"DELETE FROM {self.table} WHERE " + " OR ".join(conditions),
+                                        params).rowcount
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            stored = self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            memory = len(self._memory)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        return {**counters, "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": memory, "stored_entries": stored}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
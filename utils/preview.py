@@ -0,0 +1,51 @@
+# utils/preview.py
+import time
+
+import cv2
+
+from configs.recognition_config import PREVIEW_MAX_WIDTH, PREVIEW_JPEG_QUALITY, PREVIEW_MAX_FPS
+
+
+class PreviewRenderer:
+    """
+    Hiển thị preview camera lên một placeholder Streamlit với chi phí cố định:
+    thu nhỏ frame, tự encode JPEG (Streamlit gửi nguyên bytes, không encode lại)
+    và giới hạn số frame/giây, độc lập với tốc độ nhận diện.
+    """
+
+    def __init__(self, placeholder, max_width=PREVIEW_MAX_WIDTH,
+                 jpeg_quality=PREVIEW_JPEG_QUALITY, max_fps=PREVIEW_MAX_FPS):
+        self.placeholder = placeholder
+        self.max_width = max_width
+        self.encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self._last = 0.0
+        self.rendered = 0
+        self.skipped = 0
+
+    def due(self, now=None):
+        now = time.perf_counter() if now is None else now
+        return now - self._last >= self.min_interval
+
+    def encode(self, frame):
+        """Thu nhỏ (giữ tỉ lệ) + encode JPEG, trả về bytes."""
+        h, w = frame.shape[:2]
+        if self.max_width and w > self.max_width:
+            scale = self.max_width / w
+            frame = cv2.resize(frame, (self.max_width, int(round(h * scale))),
+                               interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode(".jpg", frame, self.encode_params)
+        if not ok:
+            raise RuntimeError("Không encode được frame preview")
+        return buf.tobytes()
+
+    def render(self, frame):
+        """Hiển thị frame (BGR) nếu đã tới lượt, trả về True nếu đã hiển thị."""
+        now = time.perf_counter()
+        if not self.due(now):
+            self.skipped += 1
+            return False
+        self._last = now
+        self.placeholder.image(self.encode(frame))
+        self.rendered += 1
+        return True
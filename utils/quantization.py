@@ -0,0 +1,182 @@
+# utils/quantization.py
+"""
+Lượng tử hóa sau huấn luyện cho SSTCN_Attention (CPU):
+  - int8 dynamic cho các projection attention tay và fc (nn.Linear)
+  - int8 static cho temporal_conv1/temporal_conv2 (+ReLU), calibration trên cửa sổ keypoints ghi sẵn
+  - bf16 autocast (không cần artifact riêng, xem Bf16Backend trong utils/inference_backends.py)
+
+Artifact là TorchScript (trace + freeze) kèm metadata, trang Recognition nạp qua load_backend().
+"""
+import copy
+import json
+import zipfile
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import torch.ao.quantization as tq
+
+from sstcn_attention_model import SSTCN_AttentionInference
+from configs.recognition_config import SEQ_LEN, NUM_JOINTS
+
+QUANTIZED_FORMAT = "sstcn_attention_int8"
+META_FILE = "meta.json"
+
+
+def default_engine():
+    """Engine lượng tử hóa tốt nhất có trên máy (x86 > fbgemm > onednn > qnnpack)."""
+    for engine in ("x86", "fbgemm", "onednn", "qnnpack"):
+        if engine in torch.backends.quantized.supported_engines:
+            return engine
+    raise RuntimeError("PyTorch build này không hỗ trợ lượng tử hóa")
+
+
+class QuantTemporal(nn.Module):
+    """temporal conv1 + ReLU + conv2 + ReLU giữa QuantStub/DeQuantStub (BN đã gộp vào conv)."""
+
+    def __init__(self, conv1, conv2):
+        super().__init__()
+        self.quant = tq.QuantStub()
+        self.conv1 = conv1
+        self.relu1 = nn.ReLU()
+        self.conv2 = conv2
+        self.relu2 = nn.ReLU()
+        self.dequant = tq.DeQuantStub()
+
+    def forward(self, x):
+        x = self.relu1(self.conv1(self.quant(x)))
+        return self.dequant(self.relu2(self.conv2(x)))
+
+
+class QuantizableSSTCN(nn.Module):
+    """
+    SSTCN_Attention viết lại cho lượng tử hóa eager-mode (chỉ dùng cho suy luận).
+    Spatial conv 3->128 giữ fp32 (rất nhỏ); attention in/out projection của mỗi tay
+    và fc là nn.Linear để quantize_dynamic; phần temporal nằm trong QuantTemporal.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        model = copy.deepcopy(model).eval()
+        if not isinstance(model, SSTCN_AttentionInference):
+            inference = SSTCN_AttentionInference(num_classes=model.fc.out_features)
+            inference.load_state_dict(model.state_dict())
+            model = inference.eval()
+        model.fuse(fold=not model.fused)
+
+        C = model.spatial_conv.in_channels
+        self.register_buffer("spatial_weight", model.spatial_conv.weight.detach().view(-1, C).t().contiguous())
+        self.register_buffer("spatial_bias", model.spatial_conv.bias.detach().clone())
+        self.hand_slice = model.hand_slice
+        self.num_heads = model.num_heads
+
+        def linear(weight, bias):
+            layer = nn.Linear(weight.shape[1], weight.shape[0])
+            layer.weight.data.copy_(weight)
+            layer.bias.data.copy_(bias)
+            return layer
+
+        self.in_proj = nn.ModuleList()
+        self.out_proj = nn.ModuleList()
+        for attn in (model.left_hand_attn.attn, model.right_hand_attn.attn):
+            self.in_proj.append(linear(attn.in_proj_weight.detach(), attn.in_proj_bias.detach()))
+            self.out_proj.append(linear(attn.out_proj.weight.detach(), attn.out_proj.bias.detach()))
+        self.temporal = QuantTemporal(model.temporal_conv1, model.temporal_conv2)
+        self.fc = model.fc
+
+    def _attention(self, tokens, in_proj, out_proj):
+        """tokens: [N, K, E] -> [N, K, E] (multi-head self-attention, projection có thể là int8 dynamic)."""
+        N, K, E = tokens.shape
+        H = self.num_heads
+        d = E // H
+        q, k, v = in_proj(tokens).view(N, K, 3, H, d).permute(2, 0, 3, 1, 4).unbind(0)
+        attn = torch.matmul(q, k.transpose(-1, -2)).mul_(d ** -0.5).softmax(dim=-1)
+        out = torch.matmul(attn, v).transpose(1, 2).reshape(N, K, E)
+        return out_proj(out)
+
+    def forward(self, x):
+        B, C, T, J = x.shape
+        x = x.permute(0, 2, 3, 1).reshape(-1, C)                                 # [B*T*J, C]
+        y = F.relu(torch.addmm(self.spatial_bias, x, self.spatial_weight)).view(B * T, J, -1)
+
+        hand = self.hand_slice
+        K = (hand.stop - hand.start) // 2
+        left = self._attention(y[:, hand.start:hand.start + K], self.in_proj[0], self.out_proj[0])
+        right = self._attention(y[:, hand.start + K:hand.stop], self.in_proj[1], self.out_proj[1])
+        y = torch.cat([y[:, :hand.start], left, right, y[:, hand.stop:]], dim=1)
+
+        # [B, E, T, J] channels-last cho conv int8
+        x = y.view(B, T, J, -1).permute(0, 3, 1, 2)
+        x = self.temporal(x)
+        return self.fc(x.mean(dim=(2, 3)))
+
+
+def quantize_model(model, calibration=None, dynamic=True, static=True, engine=None, batch_size=32):
+    """
+    Trả về QuantizableSSTCN đã lượng tử hóa từ `model` (SSTCN_Attention, không sửa model gốc).
+    `calibration`: tensor/ndarray cửa sổ [W, 3, T, 75] dùng để calibrate conv khi static=True.
+    """
+    engine = engine or default_engine()
+    torch.backends.quantized.engine = engine
+    qmodel = QuantizableSSTCN(model).eval()
+
+    if static:
+        if calibration is None or len(calibration) == 0:
+            raise ValueError("Static int8 cần cửa sổ calibration")
+        calibration = torch.as_tensor(calibration, dtype=torch.float32)
+        tq.fuse_modules(qmodel.temporal, [["conv1", "relu1"], ["conv2", "relu2"]], inplace=True)
+        qmodel.temporal.qconfig = tq.get_default_qconfig(engine)
+        tq.prepare(qmodel.temporal, inplace=True)
+        with torch.inference_mode():
+            for i in range(0, len(calibration), batch_size):
+                qmodel(calibration[i:i + batch_size])
+        tq.convert(qmodel.temporal, inplace=True)
+
+    if dynamic:
+        qmodel.in_proj = tq.quantize_dynamic(qmodel.in_proj, {nn.Linear}, dtype=torch.qint8)
+        qmodel.out_proj = tq.quantize_dynamic(qmodel.out_proj, {nn.Linear}, dtype=torch.qint8)
+        qmodel.fc = tq.quantize_dynamic(nn.Sequential(qmodel.fc), {nn.Linear}, dtype=torch.qint8)[0]
+    qmodel.engine = engine
+    return qmodel
+
+
+def save_quantized(qmodel, path, seq_len=SEQ_LEN, num_joints=NUM_JOINTS, **meta):
+    """Trace + freeze rồi lưu TorchScript, metadata (engine, num_classes, ...) nằm trong meta.json."""
+    example = torch.rand(2, 3, seq_len, num_joints)
+    with torch.no_grad():
+        script = torch.jit.freeze(torch.jit.trace(qmodel.eval(), example, check_trace=False))
+    meta = {
+        "format": QUANTIZED_FORMAT,
+        "engine": getattr(qmodel, "engine", torch.backends.quantized.engine),
+        "num_classes": qmodel.fc.out_features,
+        "seq_len": seq_len,
+        "num_joints": num_joints,
+        **meta,
+    }
+    torch.jit.save(script, path, _extra_files={META_FILE: json.dumps(meta)})
+    return path
+
+
+def read_meta(path):
+    """metadata của artifact TorchScript (đọc thẳng từ file zip, không nạp model)."""
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            if name.endswith(f"/extra/{META_FILE}"):
+                return json.loads(archive.read(name))
+    return {}
+
+
+def is_quantized_artifact(path):
+    try:
+        return read_meta(path).get("format") == QUANTIZED_FORMAT
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+
+def load_quantized(path):
+    """(TorchScript module, metadata). Đặt lại engine lượng tử hóa đã dùng khi export trước khi nạp."""
+    meta = read_meta(path)
+    engine = meta.get("engine")
+    if engine and engine in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = engine
+    return torch.jit.load(path, map_location="cpu"), meta
@@ -0,0 +1,298 @@
+# utils/realtime_pipeline.py
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from configs.recognition_config import FRAME_SKIP
+from utils.keypoints import KeypointExtractor
+from utils.latency import LatencyTracker
+
+
+def put_latest(q, item):
+    """Đưa item vào queue có giới hạn; nếu đầy thì bỏ phần tử cũ nhất. Trả về số phần tử bị bỏ."""
+    dropped = 0
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                q.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                pass
+
+
+# Đánh dấu nguồn file đã hết (không bao giờ bị bỏ khỏi queue)
+_EOS = object()
+
+
+class StageStats:
+    """Đếm số item, thời gian xử lý và số item bị bỏ của một stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.busy = 0.0
+            self.dropped = 0
+            self.started = time.perf_counter()
+
+    def record(self, elapsed, dropped=0):
+        with self._lock:
+            self.count += 1
+            self.busy += elapsed
+            self.dropped += dropped
+
+    def snapshot(self):
+        with self._lock:
+            wall = max(time.perf_counter() - self.started, 1e-9)
+            return {
+                "count": self.count,
+                "fps": self.count / wall,                                  # throughput thực tế
+                "avg_ms": 1000.0 * self.busy / self.count if self.count else 0.0,
+                "max_fps": self.count / self.busy if self.busy else 0.0,  # trần nếu stage chạy một mình
+                "dropped": self.dropped,
+            }
+
+
+class RecognitionPipeline:
+    """
+    Chạy capture / MediaPipe / model trên 3 thread riêng, nối bằng queue có giới hạn.
+    Frame cũ bị bỏ khi stage sau không theo kịp, nên độ trễ end-to-end bị chặn
+    bởi stage chậm nhất chứ không phải tổng các stage.
+
+    Thread chính (Streamlit) chỉ đọc kết quả mới nhất qua `wait_output()`.
+    Độ trễ từng bước (capture, color, holistic, extract, inference) được ghi vào `self.latency`.
+
+    `cap` là cv2.VideoCapture hoặc một FrameSource (utils/frame_sources.py). Nguồn có
+    `provides_keypoints=True` bỏ qua MediaPipe; nguồn có `is_live=False` kết thúc pipeline
+    khi hết dữ liệu. `drop_stale=False` không bỏ frame nào và dự đoán đúng theo stride
+    (dùng cho benchmark lặp lại được).
+    """
+
+    STAGES = ("capture", "landmark", "inference")
+
+    def __init__(self, cap, holistic, recognizer, frame_skip=FRAME_SKIP,
+                 frame_queue_size=1, keypoint_queue_size=None, latency=None,
+                 drop_stale=True, log_predictions=False):
+        self.cap = cap
+        self.holistic = holistic
+        self.recognizer = recognizer
+        self.frame_skip = max(1, frame_skip)
+        self.drop_stale = drop_stale
+
+        # Frame: chỉ giữ frame mới nhất cho MediaPipe
+        self.frame_q = queue.Queue(maxsize=frame_queue_size)
+        # Keypoints: giữ tối đa một cửa sổ, model đọc hết một lượt rồi mới dự đoán
+        self.keypoint_q = queue.Queue(maxsize=keypoint_queue_size or recognizer.seq_len)
+
+        self.stats = {name: StageStats(name) for name in self.STAGES}
+        self.latency = latency or LatencyTracker()
+        self.error = None
+        self.finished = False       # nguồn file đã chạy hết
+        # [(thời điểm từ lúc start, số frame đã nhận, pred, prob)] nếu log_predictions
+        self.predictions = [] if log_predictions else None
+
+        self._stop = threading.Event()
+        self._threads = []
+        self._output = None
+        self._output_seq = 0
+        self._output_cond = threading.Condition()
+        self._started_at = 0.0
+
+    # --- Điều khiển ---
+    def start(self):
+        self._stop.clear()
+        self.finished = False
+        for s in self.stats.values():
+            s.reset()
+        self._started_at = time.perf_counter()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._landmark_loop, name="landmark", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        with self._output_cond:
+            self._output_cond.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def join(self, timeout=None):
+        """Chờ nguồn file chạy hết (hoặc pipeline bị dừng)."""
+        self._stop.wait(timeout)
+        self.stop()
+
+    @property
+    def running(self):
+        return not self._stop.is_set()
+
+    def stage_stats(self):
+        """Throughput của từng stage: {stage: {count, fps, avg_ms, max_fps, dropped}}."""
+        return {name: s.snapshot() for name, s in self.stats.items()}
+
+    # --- Queue ---
+    def _put_blocking(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _put(self, q, item):
+        """Đưa item sang stage sau; trả về số item cũ bị bỏ."""
+        if self.drop_stale:
+            return put_latest(q, item)
+        self._put_blocking(q, item)
+        return 0
+
+    # --- Kết quả cho thread chính ---
+    def _publish(self, output):
+        with self._output_cond:
+            self._output = output
+            self._output_seq += 1
+            self._output_cond.notify_all()
+
+    def wait_output(self, last_seq=0, timeout=1.0):
+        """
+        Chờ kết quả mới hơn `last_seq`.
+        Trả về (seq, output) với output = {frame, pred, prob, progress, predicted},
+        hoặc (last_seq, None) khi hết giờ/dừng.
+        """
+        with self._output_cond:
+            self._output_cond.wait_for(
+                lambda: self._output_seq > last_seq or self._stop.is_set(), timeout)
+            if self._output_seq > last_seq:
+                return self._output_seq, self._output
+            return last_seq, None
+
+    # --- Các stage ---
+    def _capture_loop(self):
+        stats = self.stats["capture"]
+        # Nguồn keypoints ghi sẵn: read() trả về keypoints, đưa thẳng cho model
+        direct = getattr(self.cap, "provides_keypoints", False)
+        frame_count = 0
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            ret, frame = self.cap.read()
+            t1 = time.perf_counter()
+            if not ret:
+                if getattr(self.cap, "is_live", True):
+                    self.error = "Không thể mở webcam!"
+                    self._stop.set()
+                else:
+                    self._put_blocking(self.keypoint_q if direct else self.frame_q, _EOS)
+                break
+
+            if not direct:
+                frame_count += 1
+                if frame_count % self.frame_skip != 0:
+                    continue
+
+            self.latency.record("capture", t1 - t0)
+            if direct:
+                dropped = self._put(self.keypoint_q, (None, np.asarray(frame, dtype=np.float32)))
+            else:
+                dropped = self._put(self.frame_q, frame)
+            stats.record(time.perf_counter() - t0, dropped)
+
+    def _landmark_loop(self):
+        stats = self.stats["landmark"]
+        extractor = KeypointExtractor()
+        while not self._stop.is_set():
+            try:
+                frame = self.frame_q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if frame is _EOS:
+                self._put_blocking(self.keypoint_q, _EOS)
+                break
+
+            t0 = time.perf_counter()
+            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            t1 = time.perf_counter()
+            results = self.holistic.process(image)
+            t2 = time.perf_counter()
+            keypoints, _ = extractor.extract(results)
+
+            # Buffer của extractor bị ghi đè ở frame sau -> copy trước khi đưa sang thread khác
+            keypoints = keypoints.copy()
+            t3 = time.perf_counter()
+            self.latency.record("color", t1 - t0)
+            self.latency.record("holistic", t2 - t1)
+            self.latency.record("extract", t3 - t2)
+
+            dropped = self._put(self.keypoint_q, (frame, keypoints))
+            stats.record(time.perf_counter() - t0, dropped)
+
+    def _predict(self):
+        self.recognizer.predict()
+        if self.predictions is not None:
+            self.predictions.append((time.perf_counter() - self._started_at, self.recognizer.count,
+                                     self.recognizer.pred, self.recognizer.prob))
+
+    def _inference_loop(self):
+        stats = self.stats["inference"]
+        recognizer = self.recognizer
+        while not self._stop.is_set():
+            try:
+                item = self.keypoint_q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            t0 = time.perf_counter()
+            # Ghi hết keypoints đang chờ vào buffer, chỉ dự đoán một lần trên cửa sổ mới nhất
+            batch = [item]
+            while batch[-1] is not _EOS:
+                try:
+                    batch.append(self.keypoint_q.get_nowait())
+                except queue.Empty:
+                    break
+            end_of_stream = batch[-1] is _EOS
+            if end_of_stream:
+                batch.pop()
+
+            predicted = False
+            for _, keypoints in batch:
+                recognizer.append(keypoints)
+                # Không bỏ frame -> dự đoán đúng tại từng mốc stride
+                if not self.drop_stale and recognizer.due:
+                    self._predict()
+                    predicted = True
+            if recognizer.due:
+                self._predict()
+                predicted = True
+            self.latency.record("inference", time.perf_counter() - t0)
+
+            if batch:
+                self._publish({
+                    "frame": batch[-1][0],
+                    "pred": recognizer.pred,
+                    "prob": recognizer.prob,
+                    "progress": recognizer.progress,
+                    "predicted": predicted,
+                })
+                elapsed = time.perf_counter() - t0
+                for _ in batch:
+                    stats.record(elapsed / len(batch))
+
+            if end_of_stream:
+                self.finished = True
+                self._stop.set()
+                with self._output_cond:
+                    self._output_cond.notify_all()
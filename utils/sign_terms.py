@@ -0,0 +1,147 @@
+# utils/sign_terms.py
+"""
+Khớp truy vấn với tên một ký hiệu đã biết (không phân biệt dấu / hoa thường), để search tool trả thẳng
+tài liệu của ký hiệu đó mà không qua rewrite LLM, retrieval dense + sparse và rerank.
+
+Chỉ mục dựng từ data/sign_terms_updated_video.json (cùng nội dung với các chunk "sign_term" trong corpus),
+thêm tên trong SIGN_DICT và mã không dấu trong SIGN_DICT_NO_ACCENT ("A1" = "Ă", "So 5" = "Số 5").
+Chỉ trả kết quả khi truy vấn, sau khi bỏ từ đệm ("ký hiệu", "cách làm", "là gì", ...), trùng đúng một
+ký hiệu: trùng nguyên văn (có dấu), hoặc bỏ dấu mà chỉ ra đúng một ký hiệu ("Năm" / "Nằm" khi bỏ dấu
+đều là "nam" -> không chắc chắn, để đường chậm xử lý).
+"""
+import json
+import re
+import unicodedata
+
+from utils.sign_dict import SIGN_DICT, SIGN_DICT_NO_ACCENT
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+# Từ đệm (dạng không dấu) được bỏ ở đầu / cuối truy vấn, cụm dài thử trước
+PREFIXES = tuple(tuple(p.split()) for p in sorted([
+    "cho toi xem", "cho toi biet", "cho minh xem", "cho minh biet", "huong dan", "huong dan toi", "day toi",
+    "chi toi", "tra cuu", "lam sao de", "lam the nao de", "cach lam", "cach the hien",
+    "cach bieu dien", "cach ra dau", "cach", "the hien", "bieu dien", "ngon ngu ky hieu",
+    "ky hieu", "ki hieu", "dau hieu", "video", "hinh anh",
+], key=lambda p: -len(p.split())))
+# Động từ / danh từ thường ("làm bạn", "tìm bạn" không gọi tên ký hiệu "Bạn"): chỉ bỏ khi
+# ngay sau là một từ đệm khác ("xem ký hiệu ...", "làm ký hiệu ...")
+LEAD_WORDS = ("xem", "tim", "lam", "tu", "chu", "so")
+# Chữ cái hay được gọi kèm "chữ" / "chữ cái" (có hoặc không dấu): "chữ A", "chu ă", "chu cai a1"
+LETTER_TYPE = "Chữ cái"
+LETTER_PREFIXES = ("chữ", "chữ cái", "chu", "chu cai")
+SUFFIXES = tuple(tuple(p.split()) for p in sorted([
+    "nhu the nao", "the nao", "ra sao", "la gi", "lam sao", "nhe", "vay", "voi", "di",
+    "trong ngon ngu ky hieu", "bang ngon ngu ky hieu", "bang tay", "trong vsl",
+], key=lambda p: -len(p.split())))
+
+
+def exact_key(text):
+    """NFC + casefold, bỏ dấu câu, gộp khoảng trắng: "Tên là gì?" -> "tên là gì"."""
+    text = _NON_WORD.sub(" ", unicodedata.normalize("NFC", text).casefold())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def plain_key(text):
+    """exact_key bỏ dấu tiếng Việt: "Bác sĩ" -> "bac si", "Đêm" -> "dem"."""
+    text = unicodedata.normalize("NFD", exact_key(text)).replace("đ", "d")
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def term_document(entry):
+    """Tài liệu của một ký hiệu, cùng định dạng chunk "sign_term" trong corpus (docs_chroma.pkl)."""
+    return {
+        "page_content": (f"Sign: {entry['term']}\nDescription: {entry['description']}\n"
+                         f"Type: {entry['type']}\nLesson: {entry['lesson']}\n"),
+        "metadata": {"chunk_id": entry["term"], "category": "sign_term", "lesson": entry["lesson"],
+                     "Image": entry.get("image", ""), "Video": entry.get("videos", "")},
+    }
+
+
+def _strip_positions(words, patterns, lead_words=(), reverse=False):
+    """
+    Các vị trí cắt khi bỏ lần lượt từ đệm ở đầu (hoặc cuối nếu `reverse`), vị trí gốc đứng đầu.
+    Từ trong `lead_words` chỉ được bỏ cùng với từ đệm ngay sau nó.
+    """
+    words = words[::-1] if reverse else words
+    patterns = [p[::-1] for p in patterns] if reverse else patterns
+
+    def match_at(i):
+        return next((p for p in patterns if tuple(words[i:i + len(p)]) == p), None)
+
+    positions, i = [0], 0
+    while True:
+        pattern = match_at(i)
+        if pattern is not None:
+            i += len(pattern)
+        elif i < len(words) and words[i] in lead_words and match_at(i + 1) is not None:
+            i += 1 + len(match_at(i + 1))
+        else:
+            return [len(words) - p for p in positions] if reverse else positions
+        positions.append(i)
+
+
+class SignTermIndex:
+    """Chỉ mục thuật ngữ trong bộ nhớ: key có dấu -> ký hiệu, key không dấu -> tập ký hiệu."""
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self._exact = {}
+        self._plain = {}
+        for i, entry in enumerate(self.entries):
+            self.add_alias(entry["term"], i)
+            if entry.get("type") == LETTER_TYPE:
+                for prefix in LETTER_PREFIXES:
+                    self.add_alias(f"{prefix} {entry['term']}", i)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            index = cls(json.load(f))
+        # Tên trong SIGN_DICT (có thể khác cách viết, ví dụ "Khỏe" / "Khoẻ") và mã không dấu
+        for class_id, name in SIGN_DICT.items():
+            i = index.find(name)
+            if i is None:
+                continue
+            index.add_alias(name, i)
+            if class_id in SIGN_DICT_NO_ACCENT:
+                code = SIGN_DICT_NO_ACCENT[class_id]
+                index.add_alias(code, i, exact=False)
+                if index.entries[i].get("type") == LETTER_TYPE:
+                    for prefix in LETTER_PREFIXES:
+                        index.add_alias(f"{prefix} {code}", i, exact=False)
+        return index
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add_alias(self, name, i, exact=True):
+        if exact:
+            self._exact.setdefault(exact_key(name), i)
+        self._plain.setdefault(plain_key(name), set()).add(i)
+
+    def find(self, name):
+        """Chỉ số ký hiệu trùng `name` (nguyên văn, hoặc bỏ dấu mà duy nhất), None nếu không chắc chắn."""
+        i = self._exact.get(exact_key(name))
+        if i is not None:
+            return i
+        candidates = self._plain.get(plain_key(name), ())
+        return next(iter(candidates)) if len(candidates) == 1 else None
+
+    def match(self, query):
+        """Entry của ký hiệu mà truy vấn gọi tên (bỏ từ đệm ở đầu / cuối), None nếu không khớp chắc chắn."""
+        words = exact_key(query).split()
+        plain = plain_key(query).split()
+        if not words or len(words) != len(plain):
+            return None
+        starts = _strip_positions(plain, PREFIXES, LEAD_WORDS)
+        ends = _strip_positions(plain, SUFFIXES, reverse=True)
+        # Bỏ ít từ đệm nhất trước: cả câu "Làm gì" là một ký hiệu, không bỏ "làm"
+        for start in starts:
+            for end in ends:
+                if start < end:
+                    i = self.find(" ".join(words[start:end]))
+                    if i is not None:
+                        return self.entries[i]
+        return None
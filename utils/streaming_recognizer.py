@@ -0,0 +1,171 @@
+# utils/streaming_recognizer.py
+import numpy as np
+
+from configs.recognition_config import (SEQ_LEN, NUM_JOINTS, THRESHOLD, PREDICT_STRIDE,
+                                        UNKNOWN_CLASS, DEVICE, INCREMENTAL_INFERENCE,
+                                        EARLY_EXIT, EARLY_EXIT_MIN_FRAMES, PRESENCE_AWARE)
+from utils.numpy_model import NumpySSTCN, NumpyStream, softmax
+
+
+class StreamingRecognizer:
+    """
+    Nhận diện ký hiệu theo cửa sổ trượt.
+    Keypoints được ghi vào ring buffer (SEQ_LEN, NUM_JOINTS, 3) cấp phát sẵn,
+    cứ mỗi `stride` frame thì dự đoán lại trên SEQ_LEN frame gần nhất.
+    Không phụ thuộc Streamlit, dùng được cho cả webcam lẫn công cụ offline.
+
+    Với `incremental=True` (và model là SSTCN_Attention, hoặc backend "eager" bọc nó)
+    mỗi frame được đưa vào SSTCNStream ngay khi tới, nên mỗi lần dự đoán chỉ tốn
+    phần temporal ở biên cửa sổ.
+
+    Với `early_exit=True` model được chạy cả khi cửa sổ mới có >= `min_frames` frame
+    (cửa sổ ngắn, không padding) nên kết quả đủ tự tin hiện ra trước khi đủ seq_len frame.
+    `decided_at` là số frame lúc có dự đoán vượt threshold đầu tiên (None nếu chưa có).
+
+    Model là NumpySSTCN (utils/numpy_model.py) thì chạy hoàn toàn bằng NumPy (suy luận tăng dần
+    bằng NumpyStream), module này không import torch.
+
+    Với `skip_empty=True`, cửa sổ không có frame nào có pose hoặc tay (keypoints toàn 0)
+    không chạy model mà trả về UNKNOWN ngay (`skipped` đếm số lần bỏ qua).
+    """
+
+    def __init__(self, model, seq_len=SEQ_LEN, num_joints=NUM_JOINTS, stride=PREDICT_STRIDE,
+                 threshold=THRESHOLD, unknown_class=UNKNOWN_CLASS, device=DEVICE,
+                 incremental=INCREMENTAL_INFERENCE, early_exit=EARLY_EXIT,
+                 min_frames=EARLY_EXIT_MIN_FRAMES, skip_empty=PRESENCE_AWARE):
+        if stride < 1:
+            raise ValueError(f"stride phải >= 1, nhận được {stride}")
+        self.model = model
+        self.seq_len = seq_len
+        self.num_joints = num_joints
+        self.stride = stride
+        self.threshold = threshold
+        self.unknown_class = unknown_class
+        self.device = device
+        self.early_exit = early_exit
+        self.min_frames = max(1, min(min_frames, seq_len))
+        self.skip_empty = skip_empty
+
+        # Ring buffer: frame mới nhất nằm ở vị trí (head - 1)
+        self.buffer = np.zeros((seq_len, num_joints, 3), dtype=np.float32)
+        # Frame nào trong ring buffer có ít nhất một keypoint khác 0 (pose hoặc tay)
+        self.present = np.zeros(seq_len, dtype=bool)
+        self.skipped = 0
+        # Input model [1, 3, T, J] dùng lại mỗi lần dự đoán (chia sẻ bộ nhớ với tensor)
+        self._window = np.zeros((1, 3, seq_len, num_joints), dtype=np.float32)
+        self.stream = None
+        self._numpy = isinstance(model, NumpySSTCN)
+        if self._numpy:
+            self._input = self._window
+            if incremental:
+                self.stream = NumpyStream(model, seq_len=seq_len)
+        else:
+            # torch chỉ được import khi model là PyTorch (runtime NumPy chạy không cần torch)
+            import torch
+            from sstcn_attention_model import SSTCN_Attention, SSTCNStream
+
+            self._input = torch.from_numpy(self._window)
+            module = getattr(model, "module", model)
+            if incremental and isinstance(module, SSTCN_Attention):
+                self.stream = SSTCNStream(module, seq_len=seq_len)
+        self.reset()
+
+    def reset(self):
+        """Xóa trạng thái (ví dụ khi bật lại camera)."""
+        self.buffer.fill(0.0)
+        self.present.fill(False)
+        self.head = 0
+        self.count = 0
+        self._last_pred_count = None
+        self.pred = self.unknown_class
+        self.prob = 0.0
+        self.decided_at = None
+        if self.stream is not None:
+            self.stream.reset()
+
+    @property
+    def progress(self):
+        """Số frame hiện có trong cửa sổ (tối đa seq_len)."""
+        return min(self.count, self.seq_len)
+
+    @property
+    def is_full(self):
+        return self.count >= self.seq_len
+
+    @property
+    def due(self):
+        """
+        True nếu cửa sổ đã đầy (hoặc đủ `min_frames` khi early exit) và đã qua ít nhất
+        `stride` frame kể từ lần dự đoán trước. Lúc cửa sổ vừa đầy luôn dự đoán.
+        """
+        if self.count < self.seq_len:
+            if not self.early_exit or self.count < self.min_frames:
+                return False
+        elif self.count == self.seq_len:
+            return self._last_pred_count != self.count
+        return self._last_pred_count is None or self.count - self._last_pred_count >= self.stride
+
+    def append(self, keypoints):
+        """Ghi keypoints của một frame ((225,) hoặc (75, 3)) vào ring buffer, không dự đoán."""
+        self.buffer[self.head] = np.reshape(keypoints, (self.num_joints, 3))
+        self.present[self.head] = self.buffer[self.head].any()
+        if self.stream is not None:
+            # [J, 3] -> [C, J]
+            frame = self.buffer[self.head].T
+            self.stream.push(frame if self._numpy else self._input.new_tensor(frame).to(self.device))
+        self.head = (self.head + 1) % self.seq_len
+        self.count += 1
+
+    def push(self, keypoints):
+        """
+        Thêm keypoints của một frame.
+        Trả về (pred, prob) nếu frame này kích hoạt dự đoán, ngược lại None.
+        """
+        self.append(keypoints)
+        if not self.due:
+            return None
+        return self.predict()
+
+    def window(self):
+        """Sắp lại ring buffer theo thứ tự thời gian vào input [1, 3, T, J] (không cấp phát mới)."""
+        n = self.seq_len - self.head
+        # buffer[head:] là phần cũ nhất, buffer[:head] là phần mới nhất
+        self._window[0, :, :n] = self.buffer[self.head:].transpose(2, 0, 1)
+        self._window[0, :, n:] = self.buffer[:self.head].transpose(2, 0, 1)
+        return self._window
+
+    def _logits(self):
+        if self.stream is not None:
+            return self.stream.logits()
+        self.window()
+        # Cửa sổ chưa đầy: frame hợp lệ nằm ở cuối _window
+        x = self._input[:, :, self.seq_len - self.progress:]
+        return self.model(x if self._numpy else x.to(self.device))
+
+    def predict(self):
+        """Chạy model trên cửa sổ hiện tại (có thể chưa đủ seq_len frame), áp dụng threshold."""
+        self._last_pred_count = self.count
+        if self.skip_empty and not self.present.any():
+            self.skipped += 1
+            self.pred, self.prob = self.unknown_class, 0.0
+            return self.pred, self.prob
+        if self._numpy:
+            probs = softmax(self._logits())[0]
+            pred_idx = int(probs.argmax())
+            max_prob = float(probs[pred_idx])
+        else:
+            import torch
+
+            with torch.no_grad():
+                probs = torch.softmax(self._logits(), dim=1)
+                max_prob, pred_idx = (v.item() for v in torch.max(probs, dim=1))
+
+        if max_prob >= self.threshold:
+            self.pred = pred_idx
+            self.prob = max_prob
+            if self.decided_at is None:
+                self.decided_at = self.count
+        else:
+            self.pred = self.unknown_class
+            self.prob = 0.0
+        return self.pred, self.prob
@@ -0,0 +1,112 @@
+# utils/tensor_file.py
+"""
+Định dạng checkpoint memory-map được, tương thích safetensors:
+
+    [8 byte little-endian: độ dài header N][N byte JSON header][dữ liệu tensor]
+
+Header: {"<tên>": {"dtype": "F32", "shape": [...], "data_offsets": [begin, end]}, ...,
+         "__metadata__": {"<khóa>": "<chuỗi>"}}
+Offset tính từ đầu vùng dữ liệu, các tensor nằm liền nhau (không có khoảng trống).
+
+Đọc bằng np.memmap (copy-on-write): không unpickle, các process cùng đọc một file
+dùng chung trang bộ nhớ qua page cache của hệ điều hành.
+"""
+import json
+import os
+import struct
+import uuid
+
+import numpy as np
+import torch
+
+HEADER_ALIGN = 8
+MAX_HEADER_BYTES = 100 * 1024 * 1024
+
+_DTYPES = {
+    "F64": np.float64, "F32": np.float32, "F16": np.float16,
+    "I64": np.int64, "I32": np.int32, "I16": np.int16, "I8": np.int8,
+    "U8": np.uint8, "BOOL": np.bool_,
+}
+_DTYPE_NAMES = {np.dtype(v): k for k, v in _DTYPES.items()}
+
+
+def save_tensors(tensors, path, metadata=None):
+    """Ghi dict {tên: tensor} (+ metadata chuỗi) ra `path` (ghi file tạm rồi rename)."""
+    header = {}
+    arrays = {name: np.ascontiguousarray(t.detach().cpu().numpy()) for name, t in tensors.items()}
+    offset = 0
+    # Kiểu rộng trước: mọi tensor tự căn lề theo itemsize mà không cần chèn khoảng trống
+    for name in sorted(arrays, key=lambda n: (-arrays[n].dtype.itemsize, n)):
+        array = arrays[name]
+        if array.dtype not in _DTYPE_NAMES:
+            raise TypeError(f"dtype không hỗ trợ cho {name}: {array.dtype}")
+        header[name] = {"dtype": _DTYPE_NAMES[array.dtype], "shape": list(array.shape),
+                        "data_offsets": [offset, offset + array.nbytes]}
+        offset += array.nbytes
+    if metadata:
+        header["__metadata__"] = {str(k): str(v) for k, v in metadata.items()}
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    # Pad header bằng dấu cách để vùng dữ liệu bắt đầu ở offset chia hết cho HEADER_ALIGN
+    header_bytes += b" " * (-(8 + len(header_bytes)) % HEADER_ALIGN)
+
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name in header:
+            if name != "__metadata__":
+                f.write(arrays[name].tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_header(path):
+    """(header dict không gồm __metadata__, metadata, offset bắt đầu vùng dữ liệu)."""
+    with open(path, "rb") as f:
+        raw = f.read(8)
+        if len(raw) != 8:
+            raise ValueError(f"File quá ngắn: {path}")
+        (length,) = struct.unpack("<Q", raw)
+        if length > MAX_HEADER_BYTES:
+            raise ValueError(f"Header không hợp lệ ({length} byte): {path}")
+        header = json.loads(f.read(length))
+    metadata = header.pop("__metadata__", {})
+    return header, metadata, 8 + length
+
+
+def read_metadata(path):
+    return read_header(path)[1]
+
+
+def is_tensor_file(path):
+    """True nếu `path` có header đúng định dạng (không đọc vùng dữ liệu)."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read(9)
+        if len(raw) < 9 or raw[8:9] != b"{":
+            return False
+        read_header(path)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def load_tensors(path):
+    """
+    (dict {tên: torch.Tensor}, metadata). Các tensor là view trên memory-map copy-on-write:
+    chưa ghi thì dùng chung trang với page cache, ghi vào thì chỉ trang đó bị copy riêng.
+    """
+    header, metadata, data_start = read_header(path)
+    size = os.path.getsize(path)
+    buffer = np.memmap(path, dtype=np.uint8, mode="c", offset=data_start, shape=(size - data_start,)) \
+        if size > data_start else np.zeros(0, dtype=np.uint8)
+
+    tensors = {}
+    for name, info in header.items():
+        begin, end = info["data_offsets"]
+        if not 0 <= begin <= end <= len(buffer):
+            raise ValueError(f"data_offsets ngoài file cho {name}: {info['data_offsets']}")
+        array = buffer[begin:end].view(_DTYPES[info["dtype"]]).reshape(info["shape"])
+        tensors[name] = torch.from_numpy(array)
+    return tensors, metadata
@@ -0,0 +1,60 @@
+# utils/video_keypoints.py
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from configs.recognition_config import FRAME_SKIP, NUM_JOINTS
+from utils.keypoints import KeypointExtractor
+
+HOLISTIC_SETTINGS = dict(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+
+def create_holistic(**settings):
+    """Tạo MediaPipe Holistic với cấu hình giống trang Recognition."""
+    return mp.solutions.holistic.Holistic(**{**HOLISTIC_SETTINGS, **settings})
+
+
+def extract_video_keypoints(path, holistic, frame_skip=FRAME_SKIP, cache=None, settings=None):
+    """
+    Đọc video bằng OpenCV, trả về keypoints (T, 75, 3) float32 của các frame được giữ lại.
+    Nếu có `cache` (KeypointCache) thì dùng lại kết quả đã trích xuất, không chạy Holistic lại.
+    `settings` là cấu hình Holistic đã dùng để tạo `holistic` (mặc định HOLISTIC_SETTINGS).
+    """
+    if cache is None:
+        return _extract(path, holistic, frame_skip)
+
+    key = cache.make_key(path, {**(settings or HOLISTIC_SETTINGS), "frame_skip": frame_skip})
+    keypoints = cache.get(key)
+    if keypoints is None:
+        keypoints = _extract(path, holistic, frame_skip)
+        cache.put(key, keypoints, source=path)
+    return keypoints
+
+
+def _extract(path, holistic, frame_skip):
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        raise IOError(f"Không mở được video: {path}")
+
+    # Holistic ở chế độ tracking: reset để frame đầu video không bị seed từ landmarks của video trước
+    holistic.reset()
+    extractor = KeypointExtractor()
+    frames = []
+    frame_count = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame_count += 1
+            if frame_count % frame_skip != 0:
+                continue
+            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            keypoints, _ = extractor.extract(holistic.process(image))
+            frames.append(keypoints.copy())
+    finally:
+        cap.release()
+
+    if not frames:
+        return np.zeros((0, NUM_JOINTS, 3), dtype=np.float32)
+    return np.stack(frames)
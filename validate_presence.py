@@ -0,0 +1,110 @@
+# validate_presence.py
+"""
+Kiểm tra chế độ presence-aware (bỏ qua attention của tay vắng mặt, bỏ qua cửa sổ rỗng)
+so với đường tính đầy đủ trên keypoints ghi sẵn (.npy/.npz, file hoặc thư mục):
+max|logits lệch|, tỉ lệ trùng dự đoán (top-1 và sau threshold), thời gian và tỉ lệ frame vắng tay.
+
+    python validate_presence.py data/keypoint_cache
+    python validate_presence.py --synthetic --random-weights
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+
+from configs.recognition_config import (MODEL_PATH, SEQ_LEN, NUM_JOINTS, PREDICT_STRIDE, THRESHOLD,
+                                        UNKNOWN_CLASS, KEYPOINT_CACHE_DIR)
+from sstcn_attention_model import SSTCN_AttentionInference, L_HAND_START, L_HAND_END, R_HAND_START, R_HAND_END
+from utils.keypoint_windows import load_windows
+from utils.model_loader import load_model, create_random_model
+
+
+def synthetic_windows(n, seed=0):
+    """Cửa sổ ngẫu nhiên với tay trái/phải/cả người vắng mặt ở một số đoạn frame."""
+    rng = np.random.default_rng(seed)
+    windows = rng.random((n, 3, SEQ_LEN, NUM_JOINTS), dtype=np.float32)
+    for w in windows:
+        for start, end in ((L_HAND_START, L_HAND_END), (R_HAND_START, R_HAND_END)):
+            a, b = sorted(rng.integers(0, SEQ_LEN + 1, size=2))
+            w[:, a:b, start:end] = 0
+    windows[rng.random(n) < 0.1] = 0
+    return windows
+
+
+def thresholded(logits, threshold):
+    prob, pred = torch.softmax(logits, dim=1).max(dim=1)
+    return torch.where(prob >= threshold, pred, torch.full_like(pred, UNKNOWN_CLASS))
+
+
+def run(model, windows, batch_size):
+    outputs = []
+    t0 = time.perf_counter()
+    with torch.inference_mode():
+        for i in range(0, len(windows), batch_size):
+            outputs.append(model(windows[i:i + batch_size]))
+    return torch.cat(outputs), time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="*", default=[KEYPOINT_CACHE_DIR])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--random-weights", action="store_true")
+    parser.add_argument("--synthetic", action="store_true", help="Dùng cửa sổ tổng hợp thay cho dữ liệu ghi sẵn")
+    parser.add_argument("--stride", type=int, default=PREDICT_STRIDE)
+    parser.add_argument("--max-windows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--atol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    if args.random_weights or not os.path.exists(args.model):
+        print(f"[presence] Không dùng {args.model} -> trọng số ngẫu nhiên")
+        model = create_random_model()
+    else:
+        model = load_model(args.model)
+    if not isinstance(model, SSTCN_AttentionInference):
+        parser.error("Cần SSTCN_AttentionInference (OPTIMIZED_MODEL = True)")
+
+    windows = synthetic_windows(256) if args.synthetic else \
+        load_windows(args.inputs, SEQ_LEN, args.stride, max_windows=args.max_windows)
+    if len(windows) == 0:
+        parser.error("Không có cửa sổ ghi sẵn nào (dùng --synthetic để thử với dữ liệu tổng hợp).")
+    windows = torch.from_numpy(np.ascontiguousarray(windows))
+
+    # Tỉ lệ frame vắng từng tay / cửa sổ rỗng hoàn toàn
+    left_absent = windows[:, :, :, L_HAND_START:L_HAND_END].eq(0).all(dim=1).all(dim=2)
+    right_absent = windows[:, :, :, R_HAND_START:R_HAND_END].eq(0).all(dim=1).all(dim=2)
+    empty = windows.flatten(1).eq(0).all(dim=1)
+    print(f"[presence] {len(windows)} cửa sổ: vắng tay trái {left_absent.float().mean():.1%} frame, "
+          f"tay phải {right_absent.float().mean():.1%} frame, {int(empty.sum())} cửa sổ rỗng")
+
+    model.presence_aware = False
+    full, t_full = run(model, windows, args.batch_size)
+    model.presence_aware = True
+    fast, t_fast = run(model, windows[~empty], args.batch_size)
+
+    diff = (full[~empty] - fast).abs().max().item() if len(fast) else 0.0
+    top1 = (full[~empty].argmax(dim=1) == fast.argmax(dim=1)).float().mean().item() if len(fast) else 1.0
+    pred_full = thresholded(full, args.threshold)
+    pred_fast = torch.full_like(pred_full, UNKNOWN_CLASS)
+    if len(fast):
+        pred_fast[~empty] = thresholded(fast, args.threshold)
+    agree = (pred_full == pred_fast).float().mean().item()
+    empty_changed = int((pred_full[empty] != UNKNOWN_CLASS).sum())
+
+    print(f"[presence] max|logits lệch| (cửa sổ không rỗng) = {diff:.2e}, top-1 trùng {top1:.1%}")
+    print(f"[presence] dự đoán sau threshold trùng {agree:.1%} "
+          f"({empty_changed} cửa sổ rỗng đường đầy đủ không ra UNKNOWN)")
+    print(f"[presence] thời gian: đầy đủ {t_full:.2f}s, presence-aware {t_fast:.2f}s "
+          f"({t_full / max(t_fast, 1e-9):.2f}x)")
+    if diff > args.atol:
+        print(f"[presence] Lệch vượt atol={args.atol:g}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()